@@ -0,0 +1,493 @@
+"""End-to-end API benchmark that runs offline and writes a comparable baseline.
+
+Starts uvicorn against the benchmark database with a fake SMTP server (the
+outbox really delivers the verification emails) and a local JWKS stand-in
+for Google's signing keys (GOOGLE_JWKS_FILE), then drives the main user flows
+with --concurrency clients:
+
+    register -> verify-email -> login -> google-login -> application PUT
+    (base64 PDF CV and JPEG picture per user) -> filtered admin listings
+
+Every scenario reports throughput and p50/p95/p99 latency, plus the peak RSS of
+the server process so far. Payloads come from a fixed --seed, so two runs with
+the same arguments send the same requests.
+
+    python benchmarks/bench_api.py --users 100 --output baseline.json
+    python benchmarks/bench_api.py --users 100 --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import os
+import platform
+import random
+import socketserver
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import common
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+from PIL import Image
+from sqlalchemy import insert
+
+from database.db import Base
+from database.models import Role, User
+from database.session import engine
+from services.password_hashing import hash_password
+from services.security import create_email_verification_token
+
+PORT = 8767
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "benchmark-admin"
+PASSWORD = "benchmark-password"
+CITIES = ("Podgorica", "Bar", "Niksic", "Budva", "Herceg Novi")
+EDUCATION = ("BSc", "MSc", "PhD", "High school")
+GOOGLE_CLIENT_ID = "benchmark"
+GOOGLE_KEY_ID = "benchmark"
+
+
+def google_signing_key():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    return pem, {"keys": [{**public, "kid": GOOGLE_KEY_ID, "use": "sig"}]}
+
+
+def write_google_jwks(jwks: dict) -> str:
+    path = os.path.join(tempfile.gettempdir(), "amplitudo-benchmark-jwks.json")
+    with open(path, "w") as file:
+        json.dump(jwks, file)
+    return path
+
+
+def google_token(pem: bytes, email: str, audience: str = GOOGLE_CLIENT_ID) -> str:
+    now = int(time.time())
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": audience,
+        "sub": email,
+        "email": email,
+        "name": email.split("@")[0],
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": GOOGLE_KEY_ID})
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.wfile.write(b"220 benchmark ESMTP\r\n")
+        in_data = False
+        for line in self.rfile:
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    with self.server.lock:
+                        self.server.messages += 1
+                    self.wfile.write(b"250 OK\r\n")
+                continue
+            command = line[:4].upper()
+            if command == b"DATA":
+                in_data = True
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeSMTPHandler)
+        self.lock = threading.Lock()
+        self.messages = 0
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+
+def make_pdf(rng: random.Random, size: int) -> bytes:
+    from PyPDF2 import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(595, 842)
+    writer.add_attachment("cv.txt", rng.randbytes(size))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def make_jpeg(rng: random.Random, side: int) -> bytes:
+    output = io.BytesIO()
+    Image.frombytes("RGB", (side, side), rng.randbytes(side * side * 3)).save(
+        output, "JPEG", quality=85
+    )
+    return output.getvalue()
+
+
+def application_payload(rng: random.Random, index: int, args) -> dict:
+    return {
+        "full_name": f"Applicant {index}",
+        "birth_date": f"199{index % 10}-0{index % 9 + 1}-1{index % 10}",
+        "city": CITIES[index % len(CITIES)],
+        "country": "Montenegro",
+        "gender": ("male", "female", "other")[index % 3],
+        "education": EDUCATION[index % len(EDUCATION)],
+        "cv_files": [
+            base64.b64encode(make_pdf(rng, args.cv_kb * 1024)).decode(),
+        ],
+        "profile_picture": base64.b64encode(make_jpeg(rng, args.image_px)).decode(),
+    }
+
+
+def listing_paths(count: int) -> list[str]:
+    paths = []
+    for index in range(count):
+        city = CITIES[index % len(CITIES)]
+        paths.append(
+            (
+                "/api/application-form/?limit=20",
+                f"/api/application-form/?limit=20&city={city}",
+                f"/api/application-form/?limit=10&full_name=Applicant {index % 9}",
+                f"/api/application-form/?limit=20&education=MSc&page={index % 3 + 1}",
+                "/api/users/?limit=20",
+            )[index % 5]
+        )
+    return paths
+
+
+def seed():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Role), [{"id": 1, "name": "admin"}, {"id": 2, "name": "user"}]
+        )
+        connection.execute(
+            insert(User),
+            [
+                {
+                    "email": ADMIN_EMAIL,
+                    "password": hash_password(ADMIN_PASSWORD),
+                    "full_name": "Admin",
+                    "role_id": 1,
+                    "is_verified": True,
+                }
+            ],
+        )
+
+
+def start_server(smtp_port: int, jwks_file: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SMTP_SERVER": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_STARTTLS": "False",
+        "EMAIL_USER": "benchmark@example.com",
+        "EMAIL_PASSWORD": "",
+        "EMAIL_OUTBOX_ENABLED": "True",
+        "EMAIL_OUTBOX_POLL_INTERVAL": "0.2",
+        "VERIFICATION_URL": "http://localhost/verify-email?token=",
+        "GOOGLE_CLIENT_ID": GOOGLE_CLIENT_ID,
+        "GOOGLE_JWKS_FILE": jwks_file,
+        # Every client shares 127.0.0.1, which the login limits would throttle.
+        "RATE_LIMIT_ENABLED": "False",
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(PORT),
+            "--log-level",
+            "warning",
+        ],
+        cwd=common.SRC_DIR,
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/docs")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def peak_rss_mb(pid: int):
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    index = max(int(round(len(latencies) * fraction)) - 1, 0)
+    return latencies[min(index, len(latencies) - 1)] * 1000
+
+
+async def run_scenario(client: httpx.AsyncClient, requests: list, concurrency: int):
+    """Send (method, path, kwargs) requests and return latencies and results."""
+    latencies = []
+    errors = 0
+    results = [None] * len(requests)
+    queue = asyncio.Queue()
+    for item in enumerate(requests):
+        queue.put_nowait(item)
+
+    async def client_loop():
+        nonlocal errors
+        while not queue.empty():
+            index, (method, path, kwargs) = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                results[index] = response
+            await response.aclose()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    stats = {
+        "requests": len(requests),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(requests) / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+    return stats, results
+
+
+async def run_suite(args, server_pid: int, pem: bytes) -> dict:
+    rng = random.Random(args.seed)
+    emails = [f"user{index}@example.com" for index in range(args.users)]
+    payloads = [application_payload(rng, index, args) for index in range(args.users)]
+    scenarios = {}
+
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{PORT}",
+        limits=httpx.Limits(max_connections=args.concurrency),
+        timeout=120,
+    ) as client:
+
+        async def measure(name: str, requests: list) -> list:
+            stats, results = await run_scenario(client, requests, args.concurrency)
+            stats["server_peak_rss_mb"] = peak_rss_mb(server_pid)
+            scenarios[name] = stats
+            print(f"{name}: {stats}", file=sys.stderr)
+            return results
+
+        response = await client.post(
+            "/api/authenticate/login",
+            json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD},
+        )
+        response.raise_for_status()
+        admin = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        await measure(
+            "register",
+            [
+                (
+                    "POST",
+                    "/api/authenticate/register",
+                    {"json": {"email": email, "password": PASSWORD}},
+                )
+                for email in emails
+            ],
+        )
+        await measure(
+            "verify-email",
+            [
+                (
+                    "GET",
+                    "/api/authenticate/verify-email",
+                    {"params": {"token": create_email_verification_token(email)}},
+                )
+                for email in emails
+            ],
+        )
+        logins = await measure(
+            "login",
+            [
+                (
+                    "POST",
+                    "/api/authenticate/login",
+                    {"json": {"email": email, "password": PASSWORD}},
+                )
+                for email in emails
+            ],
+        )
+        await measure(
+            "google-login",
+            [
+                (
+                    "POST",
+                    "/api/authenticate/google-login",
+                    {"json": {"token": google_token(pem, f"google{index}@x.com")}},
+                )
+                for index in range(args.users)
+            ],
+        )
+        await measure(
+            "application-put",
+            [
+                (
+                    "PUT",
+                    "/api/application-form/",
+                    {
+                        "json": payload,
+                        "headers": {
+                            "Authorization": f"Bearer {login.json()['access_token']}"
+                        },
+                    },
+                )
+                for login, payload in zip(logins, payloads)
+                if login is not None
+            ],
+        )
+        await measure(
+            "admin-listing",
+            [
+                ("GET", path, {"headers": admin})
+                for path in listing_paths(args.listings)
+            ],
+        )
+
+    return scenarios
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=BENCHMARK_DIR,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(current: dict, baseline: dict):
+    rows = []
+    for name, stats in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        for metric in ("throughput", "p50_ms", "p95_ms", "p99_ms"):
+            old, new = before[metric], stats[metric]
+            change = (new - old) / old * 100 if old else 0
+            rows.append((name, metric, old, new, f"{change:+.1f}%"))
+    print(f"\nbaseline {baseline.get('revision')} vs current {current.get('revision')}")
+    if baseline.get("arguments") != current["arguments"]:
+        print("warning: the baseline was recorded with different arguments")
+    common.print_table(("scenario", "metric", "baseline", "current", "change"), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--listings", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--cv-kb", type=int, default=200)
+    parser.add_argument("--image-px", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    args = parser.parse_args()
+
+    seed()
+    pem, jwks = google_signing_key()
+    smtp = FakeSMTPServer()
+    smtp.start()
+    server = start_server(smtp.server_address[1], write_google_jwks(jwks))
+    try:
+        scenarios = asyncio.run(run_suite(args, server.pid, pem))
+        for _ in range(50):
+            if smtp.messages >= args.users:
+                break
+            time.sleep(0.2)
+    finally:
+        server.terminate()
+        server.wait()
+        smtp.shutdown()
+
+    result = {
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": engine.dialect.name,
+        "arguments": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "compare")
+        },
+        "emails_delivered": smtp.messages,
+        "scenarios": scenarios,
+    }
+
+    common.print_table(
+        ("scenario", "requests", "errors", "req/s", "p50", "p95", "p99", "peak MB"),
+        [
+            (
+                name,
+                stats["requests"],
+                stats["errors"],
+                stats["throughput"],
+                stats["p50_ms"],
+                stats["p95_ms"],
+                stats["p99_ms"],
+                stats["server_peak_rss_mb"],
+            )
+            for name, stats in scenarios.items()
+        ],
+    )
+    print(f"verification emails delivered: {smtp.messages}/{args.users}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            print_comparison(result, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Throughput and latency of the read endpoints with DB_ASYNC_MODE off and on.
+
+Seeds the benchmark database, starts uvicorn once per mode and fires
+concurrent requests at the listing, single-application and current-user
+endpoints. Caches are disabled so every request reaches the database.
+
+    python benchmarks/bench_async_db.py --concurrency 10 50 200 --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date
+
+import common
+import httpx
+from sqlalchemy import insert
+
+from database.db import Base
+from database.models import JobApplicant, Role, User
+from database.session import engine
+from services.security import create_access_token
+
+PORT = 8765
+PATHS = (
+    "/api/application-form/?limit=20",
+    "/api/application-form/single-application",
+    "/api/users/user",
+)
+
+
+def seed(rows: int):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Role), [{"id": 1, "name": "admin"}, {"id": 2, "name": "user"}]
+        )
+        connection.execute(
+            insert(User),
+            [
+                {
+                    "email": f"user{index}@example.com",
+                    "full_name": f"User {index}",
+                    "role_id": 1,
+                    "is_verified": True,
+                }
+                for index in range(1, rows + 1)
+            ],
+        )
+        connection.execute(
+            insert(JobApplicant),
+            [
+                {
+                    "full_name": f"User {index}",
+                    "birth_date": date(1990, 1, 1),
+                    "city": "Podgorica",
+                    "country": "Montenegro",
+                    "gender": "female",
+                    "education": "BSc",
+                    "user_id": index,
+                }
+                for index in range(1, rows + 1)
+            ],
+        )
+
+
+def start_server(async_mode: bool) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DB_ASYNC_MODE": str(async_mode),
+        "LISTING_CACHE_BACKEND": "none",
+        "AUTH_CACHE_ENABLED": "False",
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(PORT),
+            "--log-level",
+            "warning",
+        ],
+        cwd=common.SRC_DIR,
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/docs")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def run_load(concurrency: int, requests: int, token: str):
+    latencies = []
+    queue = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait(PATHS[index % len(PATHS)])
+
+    async def client_loop(client: httpx.AsyncClient):
+        while not queue.empty():
+            path = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{PORT}",
+        headers={"Authorization": f"Bearer {token}"},
+        limits=limits,
+        timeout=60,
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return (
+        requests / elapsed,
+        statistics.median(latencies) * 1000,
+        latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    token = create_access_token({"sub": "user1@example.com", "role": 1})
+
+    rows = []
+    for async_mode in (False, True):
+        server = start_server(async_mode)
+        try:
+            for concurrency in args.concurrency:
+                throughput, p50, p95 = asyncio.run(
+                    run_load(concurrency, args.requests, token)
+                )
+                rows.append(
+                    (
+                        "async" if async_mode else "sync",
+                        concurrency,
+                        f"{throughput:.0f}",
+                        f"{p50:.1f}",
+                        f"{p95:.1f}",
+                    )
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+    common.print_table(("mode", "concurrency", "req/s", "p50 ms", "p95 ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
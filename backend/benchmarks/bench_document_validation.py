@@ -0,0 +1,132 @@
+"""Document validation: PdfReader/docx.Document sniffing vs magic bytes + bounded checks.
+
+Builds a corpus of PDFs and DOCX files of increasing size and times classifying
+each file, then decoding, hashing and classifying a whole base64 submission
+sequentially and through the validation pool.
+
+    python benchmarks/bench_document_validation.py --sizes-mb 0.1 1 10 --files 4
+"""
+
+import argparse
+import base64
+import hashlib
+import io
+import os
+import statistics
+import time
+
+import common  # noqa: F401
+import docx
+from PyPDF2 import PdfReader
+from docx.shared import Inches
+from PIL import Image
+
+from services.document_validation import classify_document, map_documents
+from services.file_upload import _classify_document, _decode_document
+
+
+def make_pdf(size: int, pages: int = 20) -> bytes:
+    from PyPDF2 import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(595, 842)
+    writer.add_attachment("padding.bin", os.urandom(size))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def make_docx(size: int, paragraphs: int = 200) -> bytes:
+    document = docx.Document()
+    for index in range(paragraphs):
+        document.add_paragraph(f"Paragraph {index} " + "lorem ipsum " * 20)
+
+    side = max(int((size / 3) ** 0.5), 1)
+    picture = io.BytesIO()
+    Image.frombytes("RGB", (side, side), os.urandom(side * side * 3)).save(
+        picture, "PNG"
+    )
+    picture.seek(0)
+    document.add_picture(picture, width=Inches(4))
+
+    output = io.BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+def legacy_classify(document) -> str:
+    try:
+        PdfReader(document)
+        return "pdf"
+    except Exception:
+        document.seek(0)
+        docx.Document(document)
+        return "docx"
+
+
+def measure(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[0.1, 1, 10])
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = []
+    for size_mb in args.sizes_mb:
+        size = int(size_mb * 1024 * 1024)
+        corpus.append((f"pdf {size_mb} MB", make_pdf(size)))
+        corpus.append((f"docx {size_mb} MB", make_docx(size)))
+
+    rows = []
+    for name, data in corpus:
+        legacy = measure(lambda: legacy_classify(io.BytesIO(data)), args.repeat)
+        sniffed = measure(lambda: classify_document(io.BytesIO(data)), args.repeat)
+        rows.append(
+            (name, f"{legacy:.2f}", f"{sniffed:.2f}", f"{legacy / sniffed:.1f}x")
+        )
+    common.print_table(("file", "legacy ms", "sniff ms", "speedup"), rows)
+
+    submission = [base64.b64encode(data).decode() for _, data in corpus][: args.files]
+
+    def legacy_prepare(document_base64):
+        document_data = base64.b64decode(document_base64)
+        hashlib.sha256(document_data).hexdigest()
+        return legacy_classify(io.BytesIO(document_data))
+
+    def prepare(document_base64):
+        document_data, _ = _decode_document(document_base64)
+        return _classify_document(document_data)
+
+    rows = [
+        (
+            "legacy sequential",
+            measure(lambda: [legacy_prepare(doc) for doc in submission], args.repeat),
+        ),
+        (
+            "sniff sequential",
+            measure(lambda: [prepare(doc) for doc in submission], args.repeat),
+        ),
+        (
+            "sniff pool",
+            measure(lambda: map_documents(prepare, submission), args.repeat),
+        ),
+    ]
+    print()
+    print(f"submission of {len(submission)} files")
+    common.print_table(
+        ("mode", "median ms"), [(mode, f"{ms:.2f}") for mode, ms in rows]
+    )
+
+
+if __name__ == "__main__":
+    main()
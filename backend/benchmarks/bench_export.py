@@ -0,0 +1,151 @@
+"""Streaming applicant export vs paging through the listing.
+
+Seeds the benchmark database with --rows applicants (1M by default), then
+streams the whole table as CSV and NDJSON through export_applicants and
+reports time, throughput and peak Python memory. --paged-rows also times
+reading that many rows through the 100-row listing pages for comparison.
+
+    python benchmarks/bench_export.py --rows 1000000 --paged-rows 20000
+"""
+
+import argparse
+import time
+import tracemalloc
+from datetime import date, datetime
+
+import common
+from sqlalchemy import insert
+
+from database.db import Base
+from database.models import ApplicantDocument, JobApplicant, User
+from database.session import SessionLocal, engine
+from services.applicant_export import export_applicants
+from services.application_form import query_job_applicants
+
+SEED_BATCH = 20000
+CITIES = ("Podgorica", "Bar", "Niksic", "Budva", "Herceg Novi")
+
+
+def seed(rows: int):
+    tables = [User.__table__, JobApplicant.__table__, ApplicantDocument.__table__]
+    Base.metadata.drop_all(engine, tables=tables)
+    Base.metadata.create_all(engine, tables=tables)
+    with engine.begin() as connection:
+        for start in range(1, rows + 1, SEED_BATCH):
+            ids = range(start, min(start + SEED_BATCH, rows + 1))
+            connection.execute(
+                insert(User),
+                [
+                    {"id": index, "email": f"user{index}@example.com", "role_id": 2}
+                    for index in ids
+                ],
+            )
+            connection.execute(
+                insert(JobApplicant),
+                [
+                    {
+                        "id": index,
+                        "full_name": f"Applicant {index}",
+                        "birth_date": date(1990, 1, 1),
+                        "city": CITIES[index % len(CITIES)],
+                        "country": "Montenegro",
+                        "gender": "female",
+                        "education": "BSc",
+                        "user_id": index,
+                    }
+                    for index in ids
+                ],
+            )
+            connection.execute(
+                insert(ApplicantDocument),
+                [
+                    {
+                        "applicant_id": index,
+                        "path": f"static/uploads/documents/{index}.pdf",
+                        "content_type": "application/pdf",
+                        "position": 0,
+                        "uploaded_at": datetime(2024, 1, 1),
+                    }
+                    for index in ids
+                ],
+            )
+
+
+def run_export(file_format: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = 0
+    for chunk in export_applicants(SessionLocal, file_format):
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, size, peak
+
+
+def run_paged(rows: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    db = SessionLocal()
+    read = 0
+    page = 1
+    try:
+        while read < rows:
+            result = query_job_applicants(db, page=page, limit=100)
+            if not result["items"]:
+                break
+            read += len(result["items"])
+            page += 1
+            db.expunge_all()
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return read, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--paged-rows", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed(args.rows)
+    print(f"seeded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+    rows = []
+    for file_format in ("csv", "ndjson"):
+        elapsed, size, peak = run_export(file_format)
+        rows.append(
+            (
+                f"export {file_format}",
+                args.rows,
+                f"{elapsed:.1f}",
+                f"{args.rows / elapsed:.0f}",
+                f"{size / 1024 / 1024:.0f}",
+                f"{peak / 1024 / 1024:.1f}",
+            )
+        )
+
+    if args.paged_rows:
+        read, elapsed, peak = run_paged(args.paged_rows)
+        rows.append(
+            (
+                "listing pages",
+                read,
+                f"{elapsed:.1f}",
+                f"{read / elapsed:.0f}",
+                "-",
+                f"{peak / 1024 / 1024:.1f}",
+            )
+        )
+
+    common.print_table(
+        ("mode", "rows", "seconds", "rows/s", "output MB", "python peak MB"), rows
+    )
+
+
+if __name__ == "__main__":
+    main()
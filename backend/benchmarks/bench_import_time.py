@@ -0,0 +1,103 @@
+"""Worker startup cost: `import main` + create_app() measured with -X importtime.
+
+Runs a fresh interpreter --runs times and reports the median import time of
+main, the time spent in create_app(), peak RSS and the packages that take the
+most import time. Exits with status 1 when the median import time is over
+--budget-ms or when a dependency that should be imported lazily shows up.
+
+    python benchmarks/bench_import_time.py --runs 5 --budget-ms 600
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+import common
+
+IMPORT_BUDGET_MS = 600
+# Only imported by the code paths that need them (Google login, images, damaged PDFs).
+LAZY_MODULES = ("PIL", "PyPDF2", "docx")
+
+CHILD = """
+import resource, time
+import main
+start = time.perf_counter()
+main.create_app()
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def run_once():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=common.SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    create_app_seconds, max_rss_kb = result.stdout.split()
+    return modules, float(create_app_seconds), int(max_rss_kb)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    import_times = []
+    create_app_times = []
+    max_rss = []
+    packages = Counter()
+    for _ in range(args.runs):
+        modules, create_app_seconds, max_rss_kb = run_once()
+        import_times.append(modules["main"][1] / 1000)
+        create_app_times.append(create_app_seconds * 1000)
+        max_rss.append(max_rss_kb / 1024)
+        for name, (self_us, _) in modules.items():
+            packages[name.split(".")[0]] += self_us / 1000 / args.runs
+
+    import_ms = statistics.median(import_times)
+    common.print_table(
+        ("import main ms", "create_app ms", "peak RSS MB", "budget ms"),
+        [
+            (
+                f"{import_ms:.0f}",
+                f"{statistics.median(create_app_times):.1f}",
+                f"{statistics.median(max_rss):.0f}",
+                f"{args.budget_ms:.0f}",
+            )
+        ],
+    )
+    print()
+    common.print_table(
+        ("package", "self ms"),
+        [(name, f"{ms:.1f}") for name, ms in packages.most_common(args.top)],
+    )
+
+    failures = []
+    if import_ms > args.budget_ms:
+        failures.append(f"import main took {import_ms:.0f} ms (> {args.budget_ms} ms)")
+    eager = sorted(
+        name
+        for name in modules
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    )
+    if eager:
+        failures.append("imported at startup: " + ", ".join(eager))
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
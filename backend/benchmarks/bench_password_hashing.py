@@ -0,0 +1,63 @@
+"""Login throughput: bcrypt.verify on request threads vs the hashing process pool.
+
+python benchmarks/bench_password_hashing.py --requests 64
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import common  # noqa: F401
+from passlib.hash import bcrypt
+
+from services.password_hashing import PasswordHasher
+
+
+def run(verify, hashed, requests, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(
+            executor.map(lambda _: verify("password", hashed), range(requests))
+        )
+    elapsed = time.perf_counter() - started
+    assert all(results)
+    return requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=40)
+    args = parser.parse_args()
+
+    hashed = bcrypt.hash("password")
+    cores = os.cpu_count() or 1
+
+    rows = [
+        (
+            "request threads",
+            args.concurrency,
+            f"{run(bcrypt.verify, hashed, args.requests, args.concurrency):.1f}",
+        )
+    ]
+
+    workers = 1
+    while workers <= cores:
+        hasher = PasswordHasher(workers=workers, queue_size=args.requests, timeout=600)
+        hasher.verify("password", hashed)
+        rows.append(
+            (
+                f"process pool x{workers}",
+                args.concurrency,
+                f"{run(hasher.verify, hashed, args.requests, args.concurrency):.1f}",
+            )
+        )
+        hasher.shutdown()
+        workers *= 2
+
+    common.print_table(("mode", "concurrency", "logins/s"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Applicant search latency: plain ILIKE scan vs the n-gram index fallback.
+
+Runs against SQLite so it works without Postgres; on Postgres the same
+filters are served by the pg_trgm GIN indexes.
+
+    python benchmarks/bench_search.py --rows 100000
+"""
+
+import argparse
+import random
+import statistics
+import string
+import time
+from datetime import date
+
+import common  # noqa: F401
+from sqlalchemy import insert
+
+from database.db import Base
+from database.models import JobApplicant
+from database.session import SessionLocal, engine
+from services.search import apply_text_search, build_ngram_index
+
+CITIES = ["Podgorica", "Niksic", "Bar", "Budva", "Herceg Novi", "Pljevlja", "Cetinje"]
+EDUCATIONS = ["High school", "Bachelor", "Master", "PhD"]
+
+
+def random_name():
+    def word():
+        return random.choice(string.ascii_uppercase) + "".join(
+            random.choices(string.ascii_lowercase, k=random.randint(3, 9))
+        )
+
+    return f"{word()} {word()}ic"
+
+
+def populate(rows):
+    Base.metadata.drop_all(engine, tables=[JobApplicant.__table__])
+    Base.metadata.create_all(engine, tables=[JobApplicant.__table__])
+    names = []
+    with engine.begin() as connection:
+        for start in range(0, rows, 5000):
+            batch = [
+                {
+                    "full_name": random_name(),
+                    "birth_date": date(1990, 1, 1),
+                    "city": random.choice(CITIES),
+                    "country": "ME",
+                    "gender": "other",
+                    "education": random.choice(EDUCATIONS),
+                }
+                for _ in range(min(5000, rows - start))
+            ]
+            names.extend(row["full_name"] for row in batch)
+            connection.execute(insert(JobApplicant.__table__), batch)
+    return names
+
+
+def timed(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(42)
+    names = populate(args.rows)
+    terms = [name.split()[1][1:5] for name in random.sample(names, 5)]
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    build_ngram_index(db, JobApplicant.full_name)
+    print(f"n-gram index build: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    rows = []
+    for term in terms:
+
+        def scan():
+            return (
+                db.query(JobApplicant)
+                .filter(JobApplicant.full_name.ilike(f"%{term}%"))
+                .limit(10)
+                .all()
+            )
+
+        def indexed(fuzzy=False):
+            query, rank = apply_text_search(
+                db, db.query(JobApplicant), JobApplicant.full_name, term, fuzzy
+            )
+            if rank is not None:
+                query = query.order_by(rank.desc())
+            return query.limit(10).all()
+
+        rows.append(
+            (
+                term,
+                f"{timed(scan, args.repeat):.2f}",
+                f"{timed(indexed, args.repeat):.2f}",
+                f"{timed(lambda: indexed(True), args.repeat):.2f}",
+            )
+        )
+
+    common.print_table(("term", "ilike ms", "search ms", "fuzzy ms"), rows)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
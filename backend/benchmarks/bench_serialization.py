@@ -0,0 +1,170 @@
+"""Cost of rendering one 100-row applicant page: ORM entities vs column projection.
+
+The "orm" path is the previous listing: JobApplicant entities with a joined
+User, JobApplicantRead.from_orm, jsonable_encoder and json.dumps. The
+"projection" path is query_job_applicants plus orjson. Reports median
+milliseconds for loading and for serializing a page, and the Python memory
+allocated while doing it.
+
+    python benchmarks/bench_serialization.py --rows 10000 --iterations 200
+"""
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import date, datetime
+
+import common
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload, selectinload
+
+from database.db import Base
+from database.models import ApplicantDocument, JobApplicant, User
+from database.session import SessionLocal, engine
+from schemas.application_form import JobApplicantRead
+from services.application_form import query_job_applicants
+from services.json_response import dump_json
+from services.pagination import paginate
+
+PAGE_SIZE = 100
+
+
+def seed(rows: int):
+    tables = [User.__table__, JobApplicant.__table__, ApplicantDocument.__table__]
+    Base.metadata.drop_all(engine, tables=tables)
+    Base.metadata.create_all(engine, tables=tables)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(User),
+            [
+                {
+                    "id": index,
+                    "email": f"user{index}@example.com",
+                    "password": "$2b$12$" + "x" * 53,
+                    "full_name": f"User {index}",
+                    "photo": f"static/uploads/images/{index:064x}.png",
+                    "role_id": 2,
+                }
+                for index in range(1, rows + 1)
+            ],
+        )
+        connection.execute(
+            insert(JobApplicant),
+            [
+                {
+                    "id": index,
+                    "full_name": f"Applicant {index}",
+                    "birth_date": date(1990, 1, 1),
+                    "city": "Podgorica",
+                    "country": "Montenegro",
+                    "gender": "female",
+                    "education": "BSc",
+                    "profile_picture": f"static/uploads/images/{index:064x}.jpeg",
+                    "user_id": index,
+                }
+                for index in range(1, rows + 1)
+            ],
+        )
+        connection.execute(
+            insert(ApplicantDocument),
+            [
+                {
+                    "applicant_id": index,
+                    "path": f"static/uploads/documents/{index:064x}.pdf",
+                    "content_type": "application/pdf",
+                    "position": 0,
+                    "uploaded_at": datetime(2024, 1, 1),
+                }
+                for index in range(1, rows + 1)
+            ],
+        )
+
+
+def load_orm(db, page: int):
+    query = db.query(JobApplicant).options(
+        joinedload(JobApplicant.user), selectinload(JobApplicant.documents)
+    )
+    result = paginate(db, query, JobApplicant.id, page=page, limit=PAGE_SIZE)
+    result["items"] = [JobApplicantRead.from_orm(item) for item in result["items"]]
+    return result
+
+
+def render_orm(result) -> bytes:
+    return json.dumps(jsonable_encoder(result)).encode()
+
+
+def load_projection(db, page: int):
+    return query_job_applicants(db, page=page, limit=PAGE_SIZE)
+
+
+def run(load, render, pages: int, iterations: int):
+    load_times = []
+    render_times = []
+    allocated = []
+    db = SessionLocal()
+    try:
+        for iteration in range(iterations):
+            page = iteration % pages + 1
+            start = time.perf_counter()
+            result = load(db, page)
+            loaded = time.perf_counter()
+            body = render(result)
+            load_times.append(loaded - start)
+            render_times.append(time.perf_counter() - loaded)
+            db.expunge_all()
+
+        # Allocations are traced in a separate pass so tracing does not skew timings.
+        for iteration in range(min(iterations, 20)):
+            tracemalloc.start()
+            render(load(db, iteration % pages + 1))
+            allocated.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            db.expunge_all()
+    finally:
+        db.close()
+    return (
+        statistics.median(load_times) * 1000,
+        statistics.median(render_times) * 1000,
+        statistics.median(allocated) / 1024,
+        len(body),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    pages = max(args.rows // PAGE_SIZE, 1)
+
+    rows = []
+    for label, load, render in (
+        ("orm", load_orm, render_orm),
+        ("projection", load_projection, dump_json),
+    ):
+        # Warm up the mappers and statement caches before measuring.
+        run(load, render, pages, 3)
+        load_ms, render_ms, peak_kb, size = run(load, render, pages, args.iterations)
+        rows.append(
+            (
+                label,
+                f"{load_ms:.2f}",
+                f"{render_ms:.2f}",
+                f"{load_ms + render_ms:.2f}",
+                f"{peak_kb:.0f}",
+                size,
+            )
+        )
+
+    common.print_table(
+        ("path", "load ms", "serialize ms", "total ms", "peak KiB", "bytes"), rows
+    )
+
+
+if __name__ == "__main__":
+    main()
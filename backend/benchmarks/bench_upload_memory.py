@@ -0,0 +1,127 @@
+"""Peak memory of saving a CV: base64 JSON body vs streamed multipart upload.
+
+Each mode runs in a fresh subprocess so ru_maxrss is comparable.
+
+    python benchmarks/bench_upload_memory.py --size-mb 10
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+import common
+
+CHUNK_SIZE = 64 * 1024
+BOUNDARY = "benchmark-boundary"
+
+
+def make_pdf(size: int) -> bytes:
+    from PyPDF2 import PdfWriter
+
+    writer = PdfWriter()
+    writer.add_blank_page(595, 842)
+    writer.add_attachment("padding.bin", os.urandom(size))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def run_base64(pdf_path: str, db):
+    from services.file_upload import save_documents
+
+    with open(pdf_path, "rb") as file:
+        body = json.dumps({"cv_files": [base64.b64encode(file.read()).decode()]})
+
+    tracemalloc.start()
+    request_body = body.encode()
+    del body
+    payload = json.loads(request_body)
+    saved = save_documents(db, payload["cv_files"])
+    return saved, tracemalloc.get_traced_memory()[1]
+
+
+def run_stream(pdf_path: str, db):
+    from services.upload_stream import UploadReceiver
+
+    async def body():
+        yield (
+            f"--{BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="cv_files"; filename="cv.pdf"\r\n'
+            "Content-Type: application/pdf\r\n\r\n"
+        ).encode()
+        with open(pdf_path, "rb") as file:
+            while chunk := file.read(CHUNK_SIZE):
+                yield chunk
+        yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+    tracemalloc.start()
+    receiver = UploadReceiver(f"multipart/form-data; boundary={BOUNDARY}")
+    saved = asyncio.run(receiver.receive(body(), db))
+    return [result["path"] for result in saved], tracemalloc.get_traced_memory()[1]
+
+
+def child(mode: str, pdf_path: str):
+    from database.db import Base
+    from database.models import StoredFile
+    from database.session import SessionLocal, engine
+
+    Base.metadata.drop_all(engine, tables=[StoredFile.__table__])
+    Base.metadata.create_all(engine, tables=[StoredFile.__table__])
+    db = SessionLocal()
+
+    os.chdir(tempfile.mkdtemp())
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    saved, traced_peak = (run_base64 if mode == "base64" else run_stream)(pdf_path, db)
+    db.close()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"traced_peak": traced_peak, "rss_growth_kb": peak - baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=float, default=10)
+    parser.add_argument("--mode", choices=["base64", "stream"])
+    parser.add_argument("--pdf")
+    args = parser.parse_args()
+
+    if args.mode:
+        child(args.mode, args.pdf)
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as file:
+        file.write(make_pdf(int(args.size_mb * 1024 * 1024)))
+        pdf_path = file.name
+
+    rows = []
+    for mode in ("base64", "stream"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--pdf", pdf_path],
+            check=True,
+            capture_output=True,
+            text=True,
+            env={**os.environ, "UPLOAD_MAX_DOCUMENT_BYTES": str(2**40)},
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        rows.append(
+            (
+                mode,
+                f"{result['traced_peak'] / 1024 / 1024:.1f}",
+                f"{result['rss_growth_kb'] / 1024:.1f}",
+            )
+        )
+
+    os.remove(pdf_path)
+    print(f"file size: {args.size_mb} MB")
+    common.print_table(("mode", "python peak MB", "RSS growth MB"), rows)
+
+
+if __name__ == "__main__":
+    main()
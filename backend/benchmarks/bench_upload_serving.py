@@ -0,0 +1,161 @@
+"""Serving uploaded files through UploadResponse vs Starlette's StaticFiles.
+
+Writes a content-addressed PDF of --size-mb to static/uploads/documents, starts
+uvicorn once with the app and once with a plain StaticFiles mount, and fires
+concurrent full downloads, ETag revalidations and 64 KB range requests.
+
+    python benchmarks/bench_upload_serving.py --size-mb 1 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import common
+import httpx
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+PORT = 8766
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DOCUMENTS_DIR = os.path.join(common.SRC_DIR, "static", "uploads", "documents")
+
+
+def baseline_app():
+    return Starlette(
+        routes=[
+            Mount(
+                "/static",
+                app=StaticFiles(directory=os.path.join(common.SRC_DIR, "static")),
+            )
+        ]
+    )
+
+
+def write_document(size_mb: float) -> str:
+    data = b"%PDF-1.4\n" + os.urandom(int(size_mb * 1024 * 1024))
+    name = hashlib.sha256(data).hexdigest() + ".pdf"
+    os.makedirs(DOCUMENTS_DIR, exist_ok=True)
+    with open(os.path.join(DOCUMENTS_DIR, name), "wb") as file:
+        file.write(data)
+    return name
+
+
+def start_server(app: str, factory: bool) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            app,
+            *(["--factory"] if factory else []),
+            "--app-dir",
+            BENCHMARK_DIR,
+            "--port",
+            str(PORT),
+            "--log-level",
+            "warning",
+        ],
+        cwd=common.SRC_DIR,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/static/")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def run_load(path: str, headers: dict, concurrency: int, requests: int):
+    latencies = []
+    received = 0
+    remaining = requests
+
+    async def client_loop(client: httpx.AsyncClient):
+        nonlocal received, remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            if response.status_code >= 400:
+                response.raise_for_status()
+            received += len(response.content)
+            latencies.append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{PORT}",
+        limits=httpx.Limits(max_connections=concurrency),
+        timeout=60,
+    ) as client:
+        etag = (await client.get(path)).headers.get("etag")
+        if headers.get("If-None-Match") == "":
+            headers = {"If-None-Match": etag or '"none"'}
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return (
+        requests / elapsed,
+        received / elapsed / 1024 / 1024,
+        statistics.median(latencies) * 1000,
+        latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=float, default=1)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    name = write_document(args.size_mb)
+    path = f"/static/uploads/documents/{name}"
+    scenarios = (
+        ("full", {}),
+        ("revalidate", {"If-None-Match": ""}),
+        ("range 64KB", {"Range": "bytes=0-65535"}),
+    )
+
+    rows = []
+    try:
+        for label, app, factory in (
+            ("uploads", "main:app", False),
+            ("StaticFiles", "bench_upload_serving:baseline_app", True),
+        ):
+            server = start_server(app, factory)
+            try:
+                for scenario, headers in scenarios:
+                    throughput, mb_per_second, p50, p95 = asyncio.run(
+                        run_load(path, headers, args.concurrency, args.requests)
+                    )
+                    rows.append(
+                        (
+                            label,
+                            scenario,
+                            f"{throughput:.0f}",
+                            f"{mb_per_second:.0f}",
+                            f"{p50:.1f}",
+                            f"{p95:.1f}",
+                        )
+                    )
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        os.remove(os.path.join(DOCUMENTS_DIR, name))
+
+    common.print_table(("server", "request", "req/s", "MB/s", "p50 ms", "p95 ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Throughput, latency and memory of gunicorn with 1..N uvicorn workers.
+
+Seeds the same data as bench_async_db, starts `gunicorn -c gunicorn.conf.py`
+once per worker count (and a single plain uvicorn process for reference) and
+fires concurrent requests at the read endpoints. Memory is summed over the
+master and its workers: RSS counts shared copy-on-write pages once per
+process, PSS splits them between the processes that share them.
+
+    python benchmarks/bench_workers.py --workers 1 2 4 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import common
+import httpx
+from bench_async_db import PORT, run_load, seed
+
+from services.security import create_access_token
+
+
+def start_server(workers: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "WEB_WORKERS": str(workers),
+        "WEB_BIND": f"127.0.0.1:{PORT}",
+        "LISTING_CACHE_BACKEND": "none",
+        "AUTH_CACHE_ENABLED": "False",
+        "RATE_LIMIT_ENABLED": "False",
+    }
+    if workers:
+        command = ["gunicorn", "-c", "gunicorn.conf.py", "--log-level", "warning"]
+    else:
+        command = ["uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"]
+    server = subprocess.Popen(
+        [sys.executable, "-m", *command], cwd=common.SRC_DIR, env=env
+    )
+    for _ in range(100):
+        if len(process_tree(server.pid)) > workers:
+            try:
+                httpx.get(f"http://127.0.0.1:{PORT}/docs")
+                return server
+            except httpx.TransportError:
+                pass
+        time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def process_tree(pid: int) -> list[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as children:
+        return [pid, *map(int, children.read().split())]
+
+
+def memory_kb(pid: int) -> tuple[int, int]:
+    rss = pss = 0
+    for process in process_tree(pid):
+        with open(f"/proc/{process}/smaps_rollup") as smaps:
+            for line in smaps:
+                name, value = line.split(":", 1)
+                if name == "Rss":
+                    rss += int(value.split()[0])
+                elif name == "Pss":
+                    pss += int(value.split()[0])
+    return rss, pss
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    token = create_access_token({"sub": "user1@example.com", "role": 1})
+
+    rows = []
+    for workers in [0, *args.workers]:
+        server = start_server(workers)
+        try:
+            idle_rss, idle_pss = memory_kb(server.pid)
+            throughput, p50, p95 = asyncio.run(
+                run_load(args.concurrency, args.requests, token)
+            )
+            rss, pss = memory_kb(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+        rows.append(
+            (
+                f"gunicorn x{workers}" if workers else "uvicorn",
+                f"{throughput:.0f}",
+                f"{p50:.1f}",
+                f"{p95:.1f}",
+                f"{idle_rss / 1024:.0f}",
+                f"{idle_pss / 1024:.0f}",
+                f"{rss / 1024:.0f}",
+                f"{pss / 1024:.0f}",
+            )
+        )
+
+    print(f"{os.cpu_count()} CPUs, concurrency {args.concurrency}")
+    common.print_table(
+        (
+            "server",
+            "req/s",
+            "p50 ms",
+            "p95 ms",
+            "idle RSS MB",
+            "idle PSS MB",
+            "RSS MB",
+            "PSS MB",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+# Benchmarks create and drop tables, so never fall back to the app's DATABASE_URL.
+os.environ["DATABASE_URL"] = os.environ.get(
+    "BENCHMARK_DATABASE_URL",
+    "sqlite:///" + os.path.join(tempfile.gettempdir(), "amplitudo-benchmark.db"),
+)
+os.environ.setdefault("EMAIL_OUTBOX_ENABLED", "False")
+
+sys.path.insert(0, os.path.abspath(SRC_DIR))
+
+
+def print_table(headers, rows):
+    widths = [
+        max(len(str(value)) for value in column) for column in zip(headers, *rows)
+    ]
+    for row in [headers, *rows]:
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
@@ -0,0 +1,48 @@
+"""email outbox
+
+Revision ID: 3b1f6c2d9a47
+Revises: 585f31bbe361
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b1f6c2d9a47'
+down_revision: Union[str, None] = '585f31bbe361'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('email_outbox',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('to_email', sa.String(), nullable=False),
+    sa.Column('subject', sa.String(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('claimed_by', sa.String(), nullable=True),
+    sa.Column('claimed_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_email_outbox_id'), 'email_outbox', ['id'], unique=False)
+    op.create_index(op.f('ix_email_outbox_status'), 'email_outbox', ['status'], unique=False)
+    op.create_index(op.f('ix_email_outbox_next_attempt_at'), 'email_outbox', ['next_attempt_at'], unique=False)
+    op.create_index(op.f('ix_email_outbox_claimed_by'), 'email_outbox', ['claimed_by'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_email_outbox_claimed_by'), table_name='email_outbox')
+    op.drop_index(op.f('ix_email_outbox_next_attempt_at'), table_name='email_outbox')
+    op.drop_index(op.f('ix_email_outbox_status'), table_name='email_outbox')
+    op.drop_index(op.f('ix_email_outbox_id'), table_name='email_outbox')
+    op.drop_table('email_outbox')
@@ -0,0 +1,71 @@
+"""job applicant user unique
+
+Revision ID: 4a8e2f6c1d93
+Revises: 5d0b9f3e7a21
+Create Date: 2026-10-18 18:02:41.518203
+
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8e2f6c1d93'
+down_revision: Union[str, None] = '5d0b9f3e7a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+job_applicants = sa.table(
+    'job_applicants',
+    sa.column('id', sa.Integer()),
+    sa.column('user_id', sa.Integer()),
+    sa.column('profile_picture', sa.String()),
+    sa.column('cv_files', postgresql.JSON()),
+)
+stored_files = sa.table(
+    'stored_files',
+    sa.column('path', sa.String()),
+    sa.column('ref_count', sa.Integer()),
+    sa.column('updated_at', sa.DateTime()),
+)
+
+
+def upgrade() -> None:
+    # Concurrent submits could create several applications per user; keep the
+    # first one, which is the one the form kept updating, and release the
+    # file references of the others so the collector can remove their files.
+    connection = op.get_bind()
+    kept = (
+        sa.select(sa.func.min(job_applicants.c.id))
+        .where(job_applicants.c.user_id.isnot(None))
+        .group_by(job_applicants.c.user_id)
+    )
+    duplicate = sa.and_(
+        job_applicants.c.user_id.isnot(None), job_applicants.c.id.notin_(kept)
+    )
+
+    references = Counter()
+    for row in connection.execute(
+        sa.select(job_applicants.c.profile_picture, job_applicants.c.cv_files).where(duplicate)
+    ):
+        references.update({row.profile_picture, *(row.cv_files or [])} - {None})
+
+    now = datetime.utcnow()
+    for path, count in references.items():
+        connection.execute(
+            stored_files.update()
+            .where(stored_files.c.path == path)
+            .values(ref_count=stored_files.c.ref_count - count, updated_at=now)
+        )
+
+    connection.execute(job_applicants.delete().where(duplicate))
+    op.create_index(op.f('ix_job_applicants_user_id'), 'job_applicants', ['user_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_job_applicants_user_id'), table_name='job_applicants')
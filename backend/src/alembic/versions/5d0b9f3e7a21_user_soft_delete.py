@@ -0,0 +1,28 @@
+"""user soft delete
+
+Revision ID: 5d0b9f3e7a21
+Revises: c27d0e8f4a15
+Create Date: 2026-10-18 16:12:08.316254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0b9f3e7a21'
+down_revision: Union[str, None] = 'c27d0e8f4a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_users_deleted_at'), 'users', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_deleted_at'), table_name='users')
+    op.drop_column('users', 'deleted_at')
@@ -0,0 +1,48 @@
+"""trigram search indexes
+
+Revision ID: 9e4a7c1b52d8
+Revises: 3b1f6c2d9a47
+Create Date: 2026-10-18 11:02:17.530981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4a7c1b52d8'
+down_revision: Union[str, None] = '3b1f6c2d9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_users_full_name_trgm', 'users', 'full_name'),
+    ('ix_job_applicants_full_name_trgm', 'job_applicants', 'full_name'),
+    ('ix_job_applicants_city_trgm', 'job_applicants', 'city'),
+    ('ix_job_applicants_education_trgm', 'job_applicants', 'education'),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
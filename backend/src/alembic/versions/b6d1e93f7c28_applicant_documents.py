@@ -0,0 +1,120 @@
+"""applicant documents
+
+Revision ID: b6d1e93f7c28
+Revises: 4a8e2f6c1d93
+Create Date: 2026-10-18 18:47:13.204977
+
+"""
+from datetime import datetime
+from mimetypes import guess_type
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d1e93f7c28'
+down_revision: Union[str, None] = '4a8e2f6c1d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+job_applicants = sa.table(
+    'job_applicants',
+    sa.column('id', sa.Integer()),
+    sa.column('cv_files', postgresql.JSON()),
+)
+stored_files = sa.table(
+    'stored_files',
+    sa.column('path', sa.String()),
+    sa.column('sha256', sa.String()),
+    sa.column('size', sa.Integer()),
+    sa.column('created_at', sa.DateTime()),
+)
+applicant_documents = sa.table(
+    'applicant_documents',
+    sa.column('applicant_id', sa.Integer()),
+    sa.column('path', sa.String()),
+    sa.column('sha256', sa.String()),
+    sa.column('content_type', sa.String()),
+    sa.column('size', sa.Integer()),
+    sa.column('position', sa.Integer()),
+    sa.column('uploaded_at', sa.DateTime()),
+)
+
+
+def copy_documents(connection) -> None:
+    now = datetime.utcnow()
+    stored = {
+        row.path: row
+        for row in connection.execute(
+            sa.select(stored_files.c.path, stored_files.c.sha256, stored_files.c.size, stored_files.c.created_at)
+        )
+    }
+    applicants = connection.execute(
+        sa.select(job_applicants.c.id, job_applicants.c.cv_files).order_by(job_applicants.c.id)
+    )
+    rows = []
+    for applicant in applicants:
+        for position, path in enumerate(dict.fromkeys(applicant.cv_files or [])):
+            stored_file = stored.get(path)
+            rows.append({
+                'applicant_id': applicant.id,
+                'path': path,
+                'sha256': stored_file.sha256 if stored_file else None,
+                'content_type': guess_type(path)[0],
+                'size': stored_file.size if stored_file else None,
+                'position': position,
+                'uploaded_at': stored_file.created_at if stored_file else now,
+            })
+            if len(rows) >= BATCH_SIZE:
+                op.bulk_insert(applicant_documents, rows)
+                rows = []
+    if rows:
+        op.bulk_insert(applicant_documents, rows)
+
+
+def upgrade() -> None:
+    op.create_table('applicant_documents',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('applicant_id', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('content_type', sa.String(), nullable=True),
+    sa.Column('size', sa.Integer(), nullable=True),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('uploaded_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['applicant_id'], ['job_applicants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_applicant_documents_id'), 'applicant_documents', ['id'], unique=False)
+    op.create_index(op.f('ix_applicant_documents_sha256'), 'applicant_documents', ['sha256'], unique=False)
+    op.create_index('ix_applicant_documents_applicant_id_path', 'applicant_documents', ['applicant_id', 'path'], unique=True)
+
+    # Reference counts stay as they are: every path moves from the JSON
+    # array to exactly one row.
+    copy_documents(op.get_bind())
+    op.drop_column('job_applicants', 'cv_files')
+
+
+def downgrade() -> None:
+    op.add_column('job_applicants', sa.Column('cv_files', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+    connection = op.get_bind()
+    documents = {}
+    for row in connection.execute(
+        sa.select(applicant_documents.c.applicant_id, applicant_documents.c.path)
+        .order_by(applicant_documents.c.applicant_id, applicant_documents.c.position)
+    ):
+        documents.setdefault(row.applicant_id, []).append(row.path)
+    for applicant_id, paths in documents.items():
+        connection.execute(
+            job_applicants.update().where(job_applicants.c.id == applicant_id).values(cv_files=paths)
+        )
+
+    op.drop_index('ix_applicant_documents_applicant_id_path', table_name='applicant_documents')
+    op.drop_index(op.f('ix_applicant_documents_sha256'), table_name='applicant_documents')
+    op.drop_index(op.f('ix_applicant_documents_id'), table_name='applicant_documents')
+    op.drop_table('applicant_documents')
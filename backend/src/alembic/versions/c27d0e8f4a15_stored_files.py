@@ -0,0 +1,44 @@
+"""stored files
+
+Revision ID: c27d0e8f4a15
+Revises: 9e4a7c1b52d8
+Create Date: 2026-10-18 13:40:52.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c27d0e8f4a15'
+down_revision: Union[str, None] = '9e4a7c1b52d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stored_files',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stored_files_id'), 'stored_files', ['id'], unique=False)
+    op.create_index('ix_stored_files_kind_sha256', 'stored_files', ['kind', 'sha256'], unique=True)
+    op.create_index(op.f('ix_stored_files_path'), 'stored_files', ['path'], unique=True)
+    op.create_index(op.f('ix_stored_files_ref_count'), 'stored_files', ['ref_count'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_stored_files_ref_count'), table_name='stored_files')
+    op.drop_index(op.f('ix_stored_files_path'), table_name='stored_files')
+    op.drop_index('ix_stored_files_kind_sha256', table_name='stored_files')
+    op.drop_index(op.f('ix_stored_files_id'), table_name='stored_files')
+    op.drop_table('stored_files')
@@ -3,3 +3,136 @@ from decouple import config
 SECRET_KEY = config("SECRET_KEY")
 ALGORITHM = config("ALGORITHM")
 DATABASE_URL = config("DATABASE_URL")
+DB_ASYNC_MODE = config("DB_ASYNC_MODE", default=False, cast=bool)
+ASYNC_DATABASE_URL = config("ASYNC_DATABASE_URL", default="")
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=5, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=10, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30, cast=float)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=1800, cast=int)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=True, cast=bool)
+DB_STATEMENT_TIMEOUT_MS = config("DB_STATEMENT_TIMEOUT_MS", default=0, cast=int)
+DB_POOL_SLOW_CHECKOUT_MS = config("DB_POOL_SLOW_CHECKOUT_MS", default=100, cast=float)
+DB_POOL_LOG_INTERVAL = config("DB_POOL_LOG_INTERVAL", default=0, cast=float)
+
+SQL_INSTRUMENTATION_ENABLED = config(
+    "SQL_INSTRUMENTATION_ENABLED", default=False, cast=bool
+)
+SQL_REPEATED_STATEMENT_THRESHOLD = config(
+    "SQL_REPEATED_STATEMENT_THRESHOLD", default=5, cast=int
+)
+
+CORS_ORIGINS = config(
+    "CORS_ORIGINS",
+    default="http://localhost:3000",
+    cast=lambda value: [origin.strip() for origin in value.split(",") if origin],
+)
+GOOGLE_CLIENT_ID = config("GOOGLE_CLIENT_ID", default=None)
+GOOGLE_JWKS_URL = config(
+    "GOOGLE_JWKS_URL", default="https://www.googleapis.com/oauth2/v3/certs"
+)
+GOOGLE_JWKS_FILE = config("GOOGLE_JWKS_FILE", default=None)
+GOOGLE_KEYS_DEFAULT_MAX_AGE = config(
+    "GOOGLE_KEYS_DEFAULT_MAX_AGE", default=3600, cast=float
+)
+GOOGLE_KEYS_REFRESH_MARGIN = config(
+    "GOOGLE_KEYS_REFRESH_MARGIN", default=300, cast=float
+)
+GOOGLE_KEYS_FETCH_TIMEOUT = config("GOOGLE_KEYS_FETCH_TIMEOUT", default=5, cast=float)
+LOGIN_URL = config("LOGIN_URL", default="")
+VERIFICATION_URL = config("VERIFICATION_URL", default="")
+
+WEB_BIND = config("WEB_BIND", default="0.0.0.0:8000")
+WEB_WORKERS = config("WEB_WORKERS", default=0, cast=int)
+WEB_TIMEOUT = config("WEB_TIMEOUT", default=60, cast=int)
+WEB_GRACEFUL_TIMEOUT = config("WEB_GRACEFUL_TIMEOUT", default=30, cast=int)
+WEB_KEEPALIVE = config("WEB_KEEPALIVE", default=5, cast=int)
+WEB_MAX_REQUESTS = config("WEB_MAX_REQUESTS", default=10000, cast=int)
+WEB_MAX_REQUESTS_JITTER = config("WEB_MAX_REQUESTS_JITTER", default=1000, cast=int)
+
+SMTP_SERVER = config("SMTP_SERVER", default=None)
+SMTP_PORT = config("SMTP_PORT", default=None)
+EMAIL_USER = config("EMAIL_USER", default=None)
+EMAIL_PASSWORD = config("EMAIL_PASSWORD", default=None)
+SMTP_TIMEOUT = config("SMTP_TIMEOUT", default=10, cast=float)
+SMTP_STARTTLS = config("SMTP_STARTTLS", default=True, cast=bool)
+SMTP_POOL_SIZE = config("SMTP_POOL_SIZE", default=2, cast=int)
+SMTP_MAX_IDLE_SECONDS = config("SMTP_MAX_IDLE_SECONDS", default=60, cast=float)
+
+EMAIL_OUTBOX_ENABLED = config("EMAIL_OUTBOX_ENABLED", default=True, cast=bool)
+EMAIL_OUTBOX_WORKERS = config("EMAIL_OUTBOX_WORKERS", default=2, cast=int)
+EMAIL_OUTBOX_BATCH_SIZE = config("EMAIL_OUTBOX_BATCH_SIZE", default=50, cast=int)
+EMAIL_OUTBOX_POLL_INTERVAL = config("EMAIL_OUTBOX_POLL_INTERVAL", default=2, cast=float)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config("EMAIL_OUTBOX_MAX_ATTEMPTS", default=6, cast=int)
+EMAIL_OUTBOX_BACKOFF_SECONDS = config(
+    "EMAIL_OUTBOX_BACKOFF_SECONDS", default=30, cast=float
+)
+EMAIL_OUTBOX_LEASE_SECONDS = config(
+    "EMAIL_OUTBOX_LEASE_SECONDS", default=300, cast=float
+)
+
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", default=0, cast=int)
+PASSWORD_HASH_QUEUE_SIZE = config("PASSWORD_HASH_QUEUE_SIZE", default=64, cast=int)
+PASSWORD_HASH_TIMEOUT = config("PASSWORD_HASH_TIMEOUT", default=10, cast=float)
+
+USER_IMPORT_BATCH_SIZE = config("USER_IMPORT_BATCH_SIZE", default=500, cast=int)
+USER_IMPORT_MAX_BYTES = config(
+    "USER_IMPORT_MAX_BYTES", default=20 * 1024 * 1024, cast=int
+)
+
+USER_BULK_DELETE_MAX_IDS = config("USER_BULK_DELETE_MAX_IDS", default=10000, cast=int)
+USER_PURGE_INTERVAL = config("USER_PURGE_INTERVAL", default=60, cast=float)
+USER_PURGE_BATCH_SIZE = config("USER_PURGE_BATCH_SIZE", default=500, cast=int)
+
+EXPORT_BATCH_SIZE = config("EXPORT_BATCH_SIZE", default=1000, cast=int)
+
+AUTH_CACHE_ENABLED = config("AUTH_CACHE_ENABLED", default=True, cast=bool)
+AUTH_TOKEN_CACHE_SIZE = config("AUTH_TOKEN_CACHE_SIZE", default=10000, cast=int)
+AUTH_USER_CACHE_SIZE = config("AUTH_USER_CACHE_SIZE", default=5000, cast=int)
+AUTH_USER_CACHE_TTL = config("AUTH_USER_CACHE_TTL", default=60, cast=float)
+
+RATE_LIMIT_ENABLED = config("RATE_LIMIT_ENABLED", default=True, cast=bool)
+RATE_LIMIT_BACKEND = config("RATE_LIMIT_BACKEND", default="memory")
+RATE_LIMIT_URL = config("RATE_LIMIT_URL", default="redis://localhost:6379/0")
+RATE_LIMIT_IP_BURST = config("RATE_LIMIT_IP_BURST", default=20, cast=int)
+RATE_LIMIT_IP_PER_MINUTE = config("RATE_LIMIT_IP_PER_MINUTE", default=30, cast=float)
+RATE_LIMIT_EMAIL_BURST = config("RATE_LIMIT_EMAIL_BURST", default=5, cast=int)
+RATE_LIMIT_EMAIL_PER_MINUTE = config(
+    "RATE_LIMIT_EMAIL_PER_MINUTE", default=5, cast=float
+)
+RATE_LIMIT_MAX_KEYS = config("RATE_LIMIT_MAX_KEYS", default=100000, cast=int)
+
+LISTING_CACHE_BACKEND = config("LISTING_CACHE_BACKEND", default="memory")
+LISTING_CACHE_URL = config("LISTING_CACHE_URL", default="redis://localhost:6379/0")
+LISTING_CACHE_TTL = config("LISTING_CACHE_TTL", default=60, cast=float)
+LISTING_CACHE_MAX_BYTES = config(
+    "LISTING_CACHE_MAX_BYTES", default=64 * 1024 * 1024, cast=int
+)
+
+UPLOAD_MAX_DOCUMENT_BYTES = config(
+    "UPLOAD_MAX_DOCUMENT_BYTES", default=10 * 1024 * 1024, cast=int
+)
+UPLOAD_MAX_IMAGE_BYTES = config(
+    "UPLOAD_MAX_IMAGE_BYTES", default=5 * 1024 * 1024, cast=int
+)
+UPLOAD_MAX_FILES = config("UPLOAD_MAX_FILES", default=10, cast=int)
+UPLOAD_PRECOMPRESS = config("UPLOAD_PRECOMPRESS", default=False, cast=bool)
+
+FILE_STORE_GC_INTERVAL = config("FILE_STORE_GC_INTERVAL", default=600, cast=float)
+FILE_STORE_GC_GRACE_SECONDS = config(
+    "FILE_STORE_GC_GRACE_SECONDS", default=24 * 3600, cast=float
+)
+
+IMAGE_VARIANT_SIZES = config(
+    "IMAGE_VARIANT_SIZES",
+    default="64,256,1024",
+    cast=lambda v: [int(s) for s in v.split(",")],
+)
+IMAGE_ONDEMAND_SIZES = config(
+    "IMAGE_ONDEMAND_SIZES",
+    default="32,64,128,256,512,1024,2048",
+    cast=lambda v: [int(s) for s in v.split(",")],
+)
+IMAGE_MAX_PIXELS = config("IMAGE_MAX_PIXELS", default=40_000_000, cast=int)
+IMAGE_WORKERS = config("IMAGE_WORKERS", default=2, cast=int)
+
+DOCUMENT_VALIDATION_WORKERS = config("DOCUMENT_VALIDATION_WORKERS", default=4, cast=int)
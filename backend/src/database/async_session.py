@@ -0,0 +1,59 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from config import ASYNC_DATABASE_URL, DATABASE_URL
+from database.engine import engine_options
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+_engine = None
+_session_factory = None
+
+
+def async_database_url(url: str) -> str:
+    url = make_url(url)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def get_async_engine():
+    global _engine
+    if _engine is None:
+        url = ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+        _engine = create_async_engine(url, **engine_options(url, is_async=True))
+    return _engine
+
+
+def async_engine_or_none():
+    return _engine
+
+
+def AsyncSessionLocal():
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = async_sessionmaker(
+            bind=get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _session_factory()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    global _engine, _session_factory
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _session_factory = None
+
+
+def reset_async_engine():
+    # In a forked worker: forget the parent's engine without closing its connections.
+    global _engine, _session_factory
+    if _engine is not None:
+        _engine.sync_engine.dispose(close=False)
+    _engine = None
+    _session_factory = None
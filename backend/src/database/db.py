@@ -1,15 +1,49 @@
-import os
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
+import threading
+
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-load_dotenv()
+from database.engine import create_db_engine
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+Base = declarative_base()
 
-engine = create_engine(DATABASE_URL)
+_engine = None
+_engine_lock = threading.Lock()
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+def get_engine():
+    # Created on first use (the app does it at startup), not at import time.
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_db_engine()
+                _session_factory.configure(bind=_engine)
+    return _engine
+
+
+def engine_or_none():
+    return _engine
+
+
+def dispose_engine(close: bool = True):
+    # close=False in a forked child: drop the parent's pool without closing
+    # connections the parent still uses.
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose(close=close)
+        _engine = None
+
+
+def SessionLocal():
+    if _engine is None:
+        get_engine()
+    return _session_factory()
+
+
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
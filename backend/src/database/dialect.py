@@ -0,0 +1,10 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session, table):
+    if db.bind.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    if db.bind.dialect.name == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upserts are not supported on {db.bind.dialect.name}")
@@ -0,0 +1,168 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from config import (
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_LOG_INTERVAL,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_SLOW_CHECKOUT_MS,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_TIMEOUT_MS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PoolWaitStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (
+                    self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0
+                ),
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+class InstrumentedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record_timeout()
+            logger.error("Database pool exhausted: %s", self.status())
+            raise
+
+        wait = time.perf_counter() - start
+        self.wait_stats.record(wait)
+        if wait * 1000 >= DB_POOL_SLOW_CHECKOUT_MS:
+            logger.warning(
+                "Waited %.0f ms for a database connection: %s",
+                wait * 1000,
+                self.status(),
+            )
+        return connection
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite" and make_url(url).database in (None, "", ":memory:"):
+        return {}
+
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if backend == "postgresql" and DB_STATEMENT_TIMEOUT_MS:
+        if is_async:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+            }
+    return options
+
+
+def create_db_engine(url: str = DATABASE_URL, **overrides):
+    options = engine_options(url)
+    if "poolclass" in overrides:
+        options = {
+            key: value
+            for key, value in options.items()
+            if key in ("connect_args", "pool_pre_ping")
+        }
+    options.update(overrides)
+    return create_engine(url, **options)
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            }
+        )
+    if isinstance(pool, InstrumentedPoolMixin):
+        stats.update(pool.wait_stats.snapshot())
+    return stats
+
+
+class PoolStatsLogger:
+    def __init__(self, engines, interval: float = DB_POOL_LOG_INTERVAL):
+        self.engines = engines
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(
+                target=self._run, name="db-pool-stats", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(10)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for name, get_engine in self.engines.items():
+                engine = get_engine()
+                if engine is not None:
+                    logger.info("Database pool %s: %s", name, pool_stats(engine))
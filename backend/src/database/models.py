@@ -1,7 +1,16 @@
-from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, Date
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Integer,
+    String,
+    ForeignKey,
+    Date,
+    DateTime,
+    Index,
+    Text,
+)
 from sqlalchemy.orm import relationship
 from database.db import Base
-from sqlalchemy.dialects.postgresql import JSON
 
 
 class Role(Base):
@@ -22,9 +31,19 @@ class User(Base):
     photo = Column(String, nullable=True)
     is_verified = Column(Boolean, default=False)
     role_id = Column(Integer, ForeignKey("roles.id"))
+    deleted_at = Column(DateTime, nullable=True, index=True)
     role = relationship("Role", back_populates="users")
     job_applicant = relationship("JobApplicant", back_populates="user", uselist=False)
 
+    __table_args__ = (
+        Index(
+            "ix_users_full_name_trgm",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+    )
+
 
 class JobApplicant(Base):
     __tablename__ = "job_applicants"
@@ -36,7 +55,85 @@ class JobApplicant(Base):
     country = Column(String)
     gender = Column(String)
     education = Column(String)
-    cv_files = Column(JSON, default=[])
     profile_picture = Column(String)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, index=True)
     user = relationship("User", back_populates="job_applicant")
+    documents = relationship(
+        "ApplicantDocument",
+        order_by="ApplicantDocument.position",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    __table_args__ = tuple(
+        Index(
+            f"ix_job_applicants_{column}_trgm",
+            column,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+        for column in ("full_name", "city", "education")
+    )
+
+    @property
+    def cv_files(self) -> list[str]:
+        return [document.path for document in self.documents]
+
+
+class ApplicantDocument(Base):
+    __tablename__ = "applicant_documents"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    applicant_id = Column(
+        Integer, ForeignKey("job_applicants.id", ondelete="CASCADE"), nullable=False
+    )
+    path = Column(String, nullable=False)
+    sha256 = Column(String(64), nullable=True, index=True)
+    content_type = Column(String, nullable=True)
+    size = Column(Integer, nullable=True)
+    position = Column(Integer, nullable=False, default=0)
+    uploaded_at = Column(DateTime, nullable=False)
+
+    # Also the index for loading an applicant's documents.
+    __table_args__ = (
+        Index(
+            "ix_applicant_documents_applicant_id_path",
+            "applicant_id",
+            "path",
+            unique=True,
+        ),
+    )
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default="pending", index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, index=True)
+    claimed_by = Column(String, nullable=True, index=True)
+    claimed_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+
+class StoredFile(Base):
+    __tablename__ = "stored_files"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    sha256 = Column(String(64), nullable=False)
+    kind = Column(String, nullable=False)
+    path = Column(String, nullable=False, unique=True, index=True)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0, index=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_stored_files_kind_sha256", "kind", "sha256", unique=True),
+    )
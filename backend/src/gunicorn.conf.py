@@ -0,0 +1,52 @@
+# Production server: gunicorn -c gunicorn.conf.py (run from src/).
+import gc
+import multiprocessing
+
+import config
+from config import (
+    WEB_BIND,
+    WEB_GRACEFUL_TIMEOUT,
+    WEB_KEEPALIVE,
+    WEB_MAX_REQUESTS,
+    WEB_MAX_REQUESTS_JITTER,
+    WEB_TIMEOUT,
+    WEB_WORKERS,
+)
+
+wsgi_app = "main:create_app()"
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = WEB_BIND
+workers = WEB_WORKERS or multiprocessing.cpu_count()
+
+# Every worker starts its own bcrypt process pool; split the cores between the
+# workers instead of giving each of them one process per core. Runs before the
+# app (and services.password_hashing) is imported.
+if not config.PASSWORD_HASH_WORKERS:
+    config.PASSWORD_HASH_WORKERS = max(1, multiprocessing.cpu_count() // workers)
+
+# Import and build the app once in the master; workers share those pages
+# copy-on-write. Nothing opens database connections at import time.
+preload_app = True
+
+# Recycle workers after a jittered number of requests to cap memory growth.
+max_requests = WEB_MAX_REQUESTS
+max_requests_jitter = WEB_MAX_REQUESTS_JITTER
+
+timeout = WEB_TIMEOUT
+graceful_timeout = WEB_GRACEFUL_TIMEOUT
+keepalive = WEB_KEEPALIVE
+
+
+def pre_fork(server, worker):
+    # Keep the collector from touching (and so copying) the preloaded objects.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from database.async_session import reset_async_engine
+    from database.db import dispose_engine
+
+    # Each worker creates its own engines; never share pooled connections
+    # inherited from the master.
+    dispose_engine(close=False)
+    reset_async_engine()
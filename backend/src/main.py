@@ -1,21 +1,99 @@
+import config
 from fastapi import FastAPI
 from routers.authentication import authentication_router
-from routers.users import users_router
-from routers.application_form import appl_router
+from routers.users import users_router, users_async_router
+from routers.application_form import appl_router, appl_async_router
+from routers.metrics import metrics_router
+from routers.images import images_router
+from routers.uploads import uploads_router
+from database.session import SessionLocal, engine_or_none, get_engine
+from database.db import dispose_engine
+from database.async_session import async_engine_or_none, dispose_async_engine
+from database.engine import PoolStatsLogger
+from services.sql_instrumentation import SQLInstrumentationMiddleware
+from services.rate_limit import RateLimitMiddleware
+from services.email_outbox import start_outbox_worker, stop_outbox_worker
+from services.password_hashing import password_hasher
+from services.file_store import start_file_collector, stop_file_collector
+from services.image_pipeline import shutdown_image_workers
+from services.users import start_user_purger, stop_user_purger
+from services.google_keys import (
+    start_google_key_refresher,
+    stop_google_key_refresher,
+)
+from services.document_validation import shutdown_document_workers
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-app = FastAPI()
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-app.mount("/static", StaticFiles(directory="static", html=True), name="static")
+def create_app(settings=config) -> FastAPI:
+    """Build the application; `settings` is anything with config's attributes."""
+    app = FastAPI()
+
+    pool_stats_logger = PoolStatsLogger(
+        {"sync": engine_or_none, "async": async_engine_or_none}
+    )
+
+    # Added first so CORS headers are also set on 429 responses.
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["Server-Timing", "Retry-After"],
+    )
+    app.add_middleware(SQLInstrumentationMiddleware)
+
+    if settings.DB_ASYNC_MODE:
+        app.include_router(appl_async_router, prefix="/api/application-form")
+        app.include_router(users_async_router, prefix="/api/users")
+
+    app.include_router(authentication_router, prefix="/api/authenticate")
+    app.include_router(appl_router, prefix="/api/application-form")
+    app.include_router(users_router, prefix="/api/users")
+    app.include_router(metrics_router, prefix="/api/metrics")
+    app.include_router(images_router, prefix="/api/images")
+    # Must come before the /static mount, which would otherwise serve uploads.
+    app.include_router(uploads_router, prefix="/static/uploads")
+    app.mount("/static", StaticFiles(directory="static", html=True), name="static")
+
+    @app.on_event("startup")
+    def start_background_workers():
+        get_engine()
+        if settings.EMAIL_OUTBOX_ENABLED:
+            start_outbox_worker(SessionLocal)
+        start_file_collector(SessionLocal)
+        start_user_purger(SessionLocal)
+        if settings.GOOGLE_CLIENT_ID:
+            start_google_key_refresher()
+        pool_stats_logger.start()
+
+    @app.on_event("shutdown")
+    def stop_background_workers():
+        stop_outbox_worker()
+        stop_file_collector()
+        stop_user_purger()
+        stop_google_key_refresher()
+        pool_stats_logger.stop()
+        shutdown_image_workers()
+        shutdown_document_workers()
+        password_hasher.shutdown()
+        dispose_engine()
+
+    @app.on_event("shutdown")
+    async def close_async_engine():
+        await dispose_async_engine()
+
+    return app
+
 
-app.include_router(authentication_router, prefix="/api/authenticate")
-app.include_router(appl_router, prefix="/api/application-form")
-app.include_router(users_router, prefix="/api/users")
+def __getattr__(name):
+    # `uvicorn main:app` builds the default app on first access, so
+    # `uvicorn main:create_app --factory` does not build a second one.
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
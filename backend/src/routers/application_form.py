@@ -1,14 +1,34 @@
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from database.models import User, JobApplicant
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from database.models import User
 from fastapi.params import Query
-from services.security import get_current_user
-from schemas.application_form import JobApplicantCreate, JobApplicantRead
-from database.session import get_db
+from fastapi.responses import StreamingResponse
+from services.security import (
+    admin_required,
+    get_current_user,
+    get_current_user_async,
+)
+from schemas.application_form import (
+    ApplicantDocumentRead,
+    ApplicantDocumentsAdd,
+    JobApplicantCreate,
+    JobApplicantRead,
+)
+from database.session import SessionLocal, get_db
+from database.async_session import get_async_db
+from services.upload_stream import UploadReceiver
+from services.json_response import JSONBytesResponse
+from services.applicant_export import EXPORT_MEDIA_TYPES, export_applicants
 from services.application_form import (
+    add_applicant_documents,
     create_or_update_job_applicant,
     get_job_applicant_by_id,
+    get_job_applicant_by_id_async,
+    get_job_applicants,
+    get_job_applicants_async,
+    remove_applicant_documents,
 )
 
 appl_router = APIRouter()
@@ -25,56 +45,148 @@ def create_job(
     )
 
 
-@appl_router.get("/")
-def get_applicants(
+@appl_router.post("/documents", response_model=List[ApplicantDocumentRead])
+def add_documents(
+    documents: ApplicantDocumentsAdd,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return add_applicant_documents(
+        db=db, cv_files=documents.cv_files, current_user=current_user
+    )
+
+
+@appl_router.delete("/documents", response_model=List[ApplicantDocumentRead])
+def remove_documents(
+    path: List[str] = Query(..., description="Paths of the documents to remove"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return remove_applicant_documents(db=db, paths=path, current_user=current_user)
+
+
+@appl_router.post("/uploads")
+async def upload_files(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        raise HTTPException(status_code=415, detail="Expected multipart/form-data")
+
+    files = await UploadReceiver(content_type).receive(request.stream(), db)
+    return {"files": files}
+
+
+def applicant_listing_filters(
     page: int = Query(1, gt=0, description="Page number"),
     limit: int = Query(10, gt=0, le=100, description="Number of items per page"),
     full_name: Optional[str] = Query(None, description="Filter by full name"),
     city: Optional[str] = Query(None, description="Filter by city"),
     education: Optional[str] = Query(None, description="Filter by education"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
+    cursor: Optional[str] = Query(
+        None, description="Cursor from a previous page's next_cursor"
+    ),
+    include_total: bool = Query(True, description="Include total_count"),
+    estimate_total: bool = Query(
+        False, description="Use the planner's row estimate for total_count"
+    ),
+    fuzzy: bool = Query(
+        False, description="Typo-tolerant matching ordered by relevance"
+    ),
+) -> dict:
+    return {
+        "page": page,
+        "limit": limit,
+        "full_name": full_name,
+        "city": city,
+        "education": education,
+        "cursor": cursor,
+        "include_total": include_total,
+        "estimate_total": estimate_total,
+        "fuzzy": fuzzy,
+    }
+
+
+def check_can_list_applicants(current_user: User):
     if current_user.role_id != 1:
         raise HTTPException(
             status_code=403, detail="You are not authorized to view job applicants"
         )
 
-    query = db.query(JobApplicant).options(joinedload(JobApplicant.user))
 
-    if full_name:
-        query = query.filter(JobApplicant.full_name.ilike(f"%{full_name}%"))
-    if city:
-        query = query.filter(JobApplicant.city.ilike(f"%{city}%"))
-    if education:
-        query = query.filter(JobApplicant.education.ilike(f"%{education}%"))
+def check_applicant_owner(job_applicant, current_user: User):
+    if job_applicant is not None and job_applicant["user_id"] != current_user.id:
+        raise HTTPException(
+            status_code=403, detail="Job applicant not found or unauthorized"
+        )
+    return JSONBytesResponse(job_applicant)
 
-    total_count = query.count()
 
-    applicants = query.offset((page - 1) * limit).limit(limit).all()
+@appl_router.get("/", response_class=JSONBytesResponse)
+def get_applicants(
+    filters: dict = Depends(applicant_listing_filters),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    check_can_list_applicants(current_user)
+    return JSONBytesResponse(get_job_applicants(db, **filters))
 
-    total_pages = (total_count + limit - 1) // limit
 
-    return {
-        "total_count": total_count,
-        "total_pages": total_pages,
-        "page": page,
-        "page_size": limit,
-        "items": applicants,
-    }
+@appl_router.get("/export", dependencies=[Depends(admin_required)])
+def export_applicants_handler(
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    full_name: Optional[str] = Query(None, description="Filter by full name"),
+    city: Optional[str] = Query(None, description="Filter by city"),
+    education: Optional[str] = Query(None, description="Filter by education"),
+):
+    return StreamingResponse(
+        export_applicants(
+            SessionLocal,
+            format,
+            full_name=full_name,
+            city=city,
+            education=education,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="applicants.{format}"'},
+    )
 
 
-@appl_router.get("/single-application", response_model=Optional[JobApplicantRead])
+@appl_router.get(
+    "/single-application",
+    response_model=Optional[JobApplicantRead],
+    response_class=JSONBytesResponse,
+)
 def get_applicant_by_id(
     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    job_applicant_id = current_user.id
-    db_job_applicant = get_job_applicant_by_id(db=db, job_applicant_id=job_applicant_id)
-    if db_job_applicant is None:
-        return None
-    if db_job_applicant.user_id != current_user.id:
-        raise HTTPException(
-            status_code=403, detail="Job applicant not found or unauthorized"
-        )
+    job_applicant = get_job_applicant_by_id(db=db, job_applicant_id=current_user.id)
+    return check_applicant_owner(job_applicant, current_user)
+
+
+# Registered ahead of appl_router when DB_ASYNC_MODE is set, so these handlers
+# answer the read-heavy paths without holding a threadpool thread.
+appl_async_router = APIRouter()
 
-    return JobApplicantRead.from_orm(db_job_applicant)
+
+@appl_async_router.get("/", include_in_schema=False)
+async def get_applicants_async(
+    filters: dict = Depends(applicant_listing_filters),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    check_can_list_applicants(current_user)
+    return JSONBytesResponse(await get_job_applicants_async(db, **filters))
+
+
+@appl_async_router.get("/single-application", include_in_schema=False)
+async def get_applicant_by_id_async(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    job_applicant = await get_job_applicant_by_id_async(
+        db=db, job_applicant_id=current_user.id
+    )
+    return check_applicant_owner(job_applicant, current_user)
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+import tempfile
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from database.models import User
 from services.security import admin_required, verify_email_token
-from database.session import get_db
-from fastapi.responses import HTMLResponse
+from services.auth_cache import invalidate_user
+from database.session import SessionLocal, get_db
+from fastapi.responses import HTMLResponse, StreamingResponse
 from schemas.authentication import Token, LoginRequest, GoogleLoginRequest
 from schemas.users import UserCreate, UserOut
+from services.user_import import import_format, import_users
+from services.google_keys import verify_google_token
+from config import LOGIN_URL, USER_IMPORT_MAX_BYTES
 from services.authentication import (
     create_user,
     login_user,
@@ -13,24 +19,16 @@ from services.authentication import (
     create_user_token,
     create_user_by_admin,
 )
-from google.oauth2 import id_token
-from google.auth.transport import requests
-import os
 
 authentication_router = APIRouter()
 
-GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
-LOGIN_URL = os.getenv("LOGIN_URL")
-
 
 @authentication_router.post("/google-login", response_model=Token)
 def google_login(
     google_login_request: GoogleLoginRequest, db: Session = Depends(get_db)
 ):
     try:
-        idinfo = id_token.verify_oauth2_token(
-            google_login_request.token, requests.Request(), GOOGLE_CLIENT_ID
-        )
+        idinfo = verify_google_token(google_login_request.token)
 
         email = idinfo.get("email")
         full_name = idinfo.get("name")
@@ -63,6 +61,30 @@ def register_user_by_admin(user_create: UserCreate, db: Session = Depends(get_db
     return db_user
 
 
+@authentication_router.post(
+    "/admin/import-users", dependencies=[Depends(admin_required)]
+)
+async def import_users_by_admin(request: Request, format: Optional[str] = None):
+    file_format = import_format(request.headers.get("content-type", ""), format)
+
+    file = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > USER_IMPORT_MAX_BYTES:
+            file.close()
+            raise HTTPException(
+                status_code=413, detail=f"Import exceeds {USER_IMPORT_MAX_BYTES} bytes"
+            )
+        file.write(chunk)
+    file.seek(0)
+
+    return StreamingResponse(
+        import_users(SessionLocal, file, file_format),
+        media_type="application/x-ndjson",
+    )
+
+
 @authentication_router.post("/login", response_model=Token)
 def login(login_request: LoginRequest, db: Session = Depends(get_db)):
     token = login_user(db, login_request.email, login_request.password)
@@ -83,6 +105,7 @@ def verify_email(token: str, db: Session = Depends(get_db)):
 
     user.is_verified = True
     db.commit()
+    invalidate_user(email)
 
     return HTMLResponse(
         content=f"""
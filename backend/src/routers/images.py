@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from services.image_pipeline import VARIANT_FORMATS, find_source_image, get_variant
+
+images_router = APIRouter()
+
+
+@images_router.get("/{name}/{size}.{image_format}")
+async def get_image_variant(name: str, size: int, image_format: str):
+    if image_format not in VARIANT_FORMATS:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    source_path = find_source_image(name)
+    if source_path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    try:
+        variant = await run_in_threadpool(get_variant, source_path, size, image_format)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Image not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return FileResponse(
+        variant,
+        media_type=f"image/{image_format}",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
@@ -0,0 +1,69 @@
+from typing import Optional
+from fastapi import APIRouter, Body, Depends
+from sqlalchemy.orm import Session
+from services.security import admin_required
+from database.session import get_db, get_engine
+from database.async_session import async_engine_or_none
+from database.engine import pool_stats
+from services.email_outbox import get_outbox_status
+from services.password_hashing import password_hasher
+from services.auth_cache import auth_cache_stats
+from services.cache import listing_cache_stats
+from services.rate_limit import rate_limit_stats
+from services.google_keys import google_keys
+from services.sql_instrumentation import sql_instrumentation
+
+metrics_router = APIRouter(dependencies=[Depends(admin_required)])
+
+
+@metrics_router.get("/email-outbox")
+def email_outbox_status(db: Session = Depends(get_db)):
+    return get_outbox_status(db)
+
+
+@metrics_router.get("/password-hashing")
+def password_hashing_status():
+    return password_hasher.stats()
+
+
+@metrics_router.get("/auth-cache")
+def auth_cache_status():
+    return auth_cache_stats()
+
+
+@metrics_router.get("/listing-cache")
+def listing_cache_status():
+    return listing_cache_stats()
+
+
+@metrics_router.get("/rate-limit")
+def rate_limit_status():
+    return rate_limit_stats()
+
+
+@metrics_router.get("/google-keys")
+def google_keys_status():
+    return google_keys.stats()
+
+
+@metrics_router.get("/db-pool")
+def db_pool_status():
+    async_engine = async_engine_or_none()
+    return {
+        "sync": pool_stats(get_engine()),
+        "async": pool_stats(async_engine) if async_engine is not None else None,
+    }
+
+
+@metrics_router.get("/sql-instrumentation")
+def sql_instrumentation_status():
+    return sql_instrumentation.stats()
+
+
+@metrics_router.put("/sql-instrumentation")
+def update_sql_instrumentation(
+    enabled: Optional[bool] = Body(None),
+    repeated_statement_threshold: Optional[int] = Body(None, gt=1),
+):
+    sql_instrumentation.update(enabled, repeated_statement_threshold)
+    return sql_instrumentation.stats()
@@ -0,0 +1,16 @@
+import os
+
+from fastapi import APIRouter, HTTPException, Request
+from services.upload_serving import UploadResponse, upload_path
+
+uploads_router = APIRouter()
+
+
+@uploads_router.api_route(
+    "/{kind}/{filename}", methods=["GET", "HEAD"], include_in_schema=False
+)
+async def serve_upload(kind: str, filename: str, request: Request):
+    file_path = upload_path(kind, filename)
+    if file_path is None or not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="File not found")
+    return UploadResponse(file_path, request.scope)
@@ -1,28 +1,49 @@
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Response, status
 from fastapi.params import Query
 from sqlalchemy.orm import Session
 from typing import Optional
-from schemas.users import UpdateUser, UserOut
-from services.security import get_current_user
+from schemas.users import BulkDeleteResult, BulkDeleteUsers, UpdateUser, UserOut
+from services.security import get_current_user, get_current_user_async
 from database.models import User
 from services.security import admin_required
 from database.session import get_db
-from services.users import get_all_unfinished_users, delete_user, update_user_data
+from services.json_response import JSONBytesResponse
+from services.users import (
+    get_all_unfinished_users,
+    delete_user,
+    delete_users,
+    soft_delete_users,
+    update_user_data,
+)
 
 users_router = APIRouter()
 
 
-@users_router.get("/", dependencies=[Depends(admin_required)])
+@users_router.get(
+    "/", response_class=JSONBytesResponse, dependencies=[Depends(admin_required)]
+)
 def get_unfinished_users(
     page: int = Query(1, gt=0, description="Page number"),
     limit: int = Query(10, gt=0, le=100, description="Number of items per page"),
     full_name: Optional[str] = Query(None, description="Filter by full name"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from a previous page's next_cursor"
+    ),
+    include_total: bool = Query(True, description="Include total_count"),
+    estimate_total: bool = Query(
+        False, description="Use the planner's row estimate for total_count"
+    ),
+    fuzzy: bool = Query(
+        False, description="Typo-tolerant matching ordered by relevance"
+    ),
     db: Session = Depends(get_db),
 ):
-    users = get_all_unfinished_users(db, page, limit, full_name)
+    users = get_all_unfinished_users(
+        db, page, limit, full_name, cursor, include_total, estimate_total, fuzzy
+    )
     if not users:
         raise HTTPException(status_code=404, detail="No users found")
-    return users
+    return JSONBytesResponse(users)
 
 
 @users_router.delete("/{user_id}/delete", dependencies=[Depends(admin_required)])
@@ -33,12 +54,24 @@ def delete_user_handler(user_id: int, db: Session = Depends(get_db)):
     return user
 
 
-@users_router.get("/user")
-def get_user(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+@users_router.post(
+    "/bulk-delete",
+    response_model=BulkDeleteResult,
+    dependencies=[Depends(admin_required)],
+)
+def bulk_delete_users_handler(
+    payload: BulkDeleteUsers, response: Response, db: Session = Depends(get_db)
 ):
-    user = db.query(User).filter(User.id == current_user.id).first()
-    return UserOut(full_name=user.full_name, photo=user.photo)
+    user_ids = list(set(payload.user_ids))
+    if payload.soft:
+        response.status_code = status.HTTP_202_ACCEPTED
+        return BulkDeleteResult(deleted=soft_delete_users(db, user_ids), soft=True)
+    return BulkDeleteResult(deleted=delete_users(db, user_ids), soft=False)
+
+
+@users_router.get("/user")
+def get_user(current_user: User = Depends(get_current_user)):
+    return UserOut(full_name=current_user.full_name, photo=current_user.photo)
 
 
 @users_router.put("/update-user")
@@ -51,3 +84,12 @@ def update_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return UserOut(full_name=user.full_name, photo=user.photo)
+
+
+# Registered ahead of users_router when DB_ASYNC_MODE is set.
+users_async_router = APIRouter()
+
+
+@users_async_router.get("/user", include_in_schema=False)
+async def get_user_async(current_user: User = Depends(get_current_user_async)):
+    return UserOut(full_name=current_user.full_name, photo=current_user.photo)
@@ -1,7 +1,8 @@
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import date
+from pydantic import BaseModel, validator
+from typing import Dict, List, Optional
+from datetime import date, datetime
 from enum import Enum
+from services.image_pipeline import variant_urls
 
 
 class GenderEnum(str, Enum):
@@ -15,6 +16,11 @@ class UserRead(BaseModel):
     full_name: Optional[str] = None
     email: str
     photo: Optional[str] = None
+    photo_variants: Optional[Dict[str, Dict[str, str]]] = None
+
+    @validator("photo_variants", always=True)
+    def build_photo_variants(cls, value, values):
+        return variant_urls(values.get("photo"))
 
     class Config:
         orm_mode = True
@@ -44,9 +50,29 @@ class JobApplicantRead(BaseModel):
     education: str
     cv_files: Optional[List[str]] = []
     profile_picture: Optional[str] = None
+    profile_picture_variants: Optional[Dict[str, Dict[str, str]]] = None
     user_id: int
     user: Optional[UserRead]
 
+    @validator("profile_picture_variants", always=True)
+    def build_profile_picture_variants(cls, value, values):
+        return variant_urls(values.get("profile_picture"))
+
+    class Config:
+        orm_mode = True
+
+
+class ApplicantDocumentsAdd(BaseModel):
+    cv_files: List[str]
+
+
+class ApplicantDocumentRead(BaseModel):
+    path: str
+    sha256: Optional[str] = None
+    content_type: Optional[str] = None
+    size: Optional[int] = None
+    uploaded_at: datetime
+
     class Config:
         orm_mode = True
 
@@ -1,5 +1,7 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import Dict, Optional
+from pydantic import BaseModel, conlist, validator
+from config import USER_BULK_DELETE_MAX_IDS
+from services.image_pipeline import variant_urls
 
 
 class UserCreate(BaseModel):
@@ -15,6 +17,11 @@ class UserOut(BaseModel):
     full_name: Optional[str] = None
     email: Optional[str] = None
     photo: Optional[str] = None
+    photo_variants: Optional[Dict[str, Dict[str, str]]] = None
+
+    @validator("photo_variants", always=True)
+    def build_photo_variants(cls, value, values):
+        return variant_urls(values.get("photo"))
 
     class Config:
         orm_mode = True
@@ -29,3 +36,13 @@ class UpdateUser(BaseModel):
     full_name: Optional[str] = None
     photo: Optional[str] = None
     password: Optional[str] = None
+
+
+class BulkDeleteUsers(BaseModel):
+    user_ids: conlist(int, min_items=1, max_items=USER_BULK_DELETE_MAX_IDS)
+    soft: bool = False
+
+
+class BulkDeleteResult(BaseModel):
+    deleted: int
+    soft: bool
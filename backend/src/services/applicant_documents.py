@@ -0,0 +1,128 @@
+from datetime import datetime
+from mimetypes import guess_type
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from database.dialect import dialect_insert
+from database.models import ApplicantDocument, StoredFile
+from services.file_store import acquire_files, release_files
+
+
+def documents_query(applicant_ids):
+    return (
+        select(ApplicantDocument.applicant_id, ApplicantDocument.path)
+        .where(ApplicantDocument.applicant_id.in_(applicant_ids))
+        .order_by(ApplicantDocument.applicant_id, ApplicantDocument.position)
+    )
+
+
+def group_documents(rows) -> dict[int, list[str]]:
+    documents = {}
+    for row in rows:
+        documents.setdefault(row.applicant_id, []).append(row.path)
+    return documents
+
+
+def load_documents(db: Session, applicant_ids) -> dict[int, list[str]]:
+    """Document paths per applicant id, for a whole page in one query."""
+    applicant_ids = list(applicant_ids)
+    if not applicant_ids:
+        return {}
+    return group_documents(db.execute(documents_query(applicant_ids)))
+
+
+def document_metadata(db: Session, applicant_id: int) -> list[dict]:
+    rows = db.execute(
+        select(
+            ApplicantDocument.path,
+            ApplicantDocument.sha256,
+            ApplicantDocument.content_type,
+            ApplicantDocument.size,
+            ApplicantDocument.uploaded_at,
+        )
+        .where(ApplicantDocument.applicant_id == applicant_id)
+        .order_by(ApplicantDocument.position)
+    ).all()
+    return [dict(row._mapping) for row in rows]
+
+
+def add_documents(db: Session, applicant_id: int, paths: list[str]) -> list[str]:
+    """Append the paths the applicant does not have yet; return the added ones."""
+    paths = list(dict.fromkeys(path for path in paths if path))
+    if not paths:
+        return []
+
+    stored_files = {
+        row.path: row
+        for row in db.execute(
+            select(StoredFile.path, StoredFile.sha256, StoredFile.size).where(
+                StoredFile.path.in_(paths)
+            )
+        )
+    }
+    last_position = db.scalar(
+        select(func.max(ApplicantDocument.position)).where(
+            ApplicantDocument.applicant_id == applicant_id
+        )
+    )
+    first_position = 0 if last_position is None else last_position + 1
+    now = datetime.utcnow()
+    rows = []
+    for offset, path in enumerate(paths):
+        stored_file = stored_files.get(path)
+        rows.append(
+            {
+                "applicant_id": applicant_id,
+                "path": path,
+                "sha256": stored_file.sha256 if stored_file else None,
+                "content_type": guess_type(path)[0],
+                "size": stored_file.size if stored_file else None,
+                "position": first_position + offset,
+                "uploaded_at": now,
+            }
+        )
+
+    added = list(
+        db.scalars(
+            dialect_insert(db, ApplicantDocument.__table__)
+            .on_conflict_do_nothing(index_elements=["applicant_id", "path"])
+            .returning(ApplicantDocument.path),
+            rows,
+        )
+    )
+    acquire_files(db, added)
+    return added
+
+
+def remove_documents(db: Session, applicant_id: int, paths: list[str]) -> list[str]:
+    """Delete the given paths from the applicant; return the removed ones."""
+    paths = [path for path in paths if path]
+    if not paths:
+        return []
+    removed = list(
+        db.scalars(
+            delete(ApplicantDocument)
+            .where(
+                ApplicantDocument.applicant_id == applicant_id,
+                ApplicantDocument.path.in_(paths),
+            )
+            .returning(ApplicantDocument.path)
+            .execution_options(synchronize_session=False)
+        )
+    )
+    release_files(db, removed)
+    return removed
+
+
+def replace_documents(db: Session, applicant_id: int, paths: list[str]) -> list[str]:
+    # Only the rows that change are written; kept documents keep their order
+    # and new ones are appended.
+    existing = load_documents(db, [applicant_id]).get(applicant_id, [])
+    incoming = set(paths)
+    remove_documents(
+        db, applicant_id, [path for path in existing if path not in incoming]
+    )
+    kept = [path for path in existing if path in incoming]
+    new_paths = [path for path in paths if path not in kept]
+    return kept + add_documents(db, applicant_id, new_paths)
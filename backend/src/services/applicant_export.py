@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+
+from sqlalchemy import select
+
+from config import EXPORT_BATCH_SIZE
+from database.models import JobApplicant, User
+from services.applicant_documents import load_documents
+from services.search import apply_text_search
+
+EXPORT_COLUMNS = (
+    JobApplicant.id,
+    JobApplicant.full_name,
+    JobApplicant.birth_date,
+    JobApplicant.city,
+    JobApplicant.country,
+    JobApplicant.gender,
+    JobApplicant.education,
+    JobApplicant.profile_picture,
+    JobApplicant.user_id,
+    User.email,
+)
+# cv_files comes from applicant_documents, loaded once per batch of rows.
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS] + ["cv_files"]
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def export_query(db, full_name: str = None, city: str = None, education: str = None):
+    query = (
+        select(*EXPORT_COLUMNS)
+        .join(User, User.id == JobApplicant.user_id)
+        .where(User.deleted_at.is_(None))
+    )
+    for column, term in (
+        (JobApplicant.full_name, full_name),
+        (JobApplicant.city, city),
+        (JobApplicant.education, education),
+    ):
+        if term:
+            query, _ = apply_text_search(db, query, column, term)
+    return query.order_by(JobApplicant.id).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return json.dumps(value)
+    return value
+
+
+def _json_value(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def export_applicants(session_factory, file_format: str, **filters):
+    # The response outlives the request's dependencies, so the export owns its
+    # session and closes it when the client has read everything or disconnects.
+    db = session_factory()
+    try:
+        result = db.execute(export_query(db, **filters))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if file_format == "csv" else None
+        if writer:
+            writer.writerow(EXPORT_FIELDS)
+
+        for partition in result.partitions():
+            documents = load_documents(db, (row.id for row in partition))
+            for row in partition:
+                values = (*row, documents.get(row.id, []))
+                if writer:
+                    writer.writerow([_csv_value(value) for value in values])
+                else:
+                    buffer.write(
+                        json.dumps(
+                            {
+                                field: _json_value(value)
+                                for field, value in zip(EXPORT_FIELDS, values)
+                            }
+                        )
+                    )
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
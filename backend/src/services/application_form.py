@@ -1,80 +1,270 @@
+from types import SimpleNamespace
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from database.models import User
 from services.file_upload import save_documents
 from services.file_upload import save_image
+from services.file_store import replace_file_references
 from database.models import JobApplicant
+from database.dialect import dialect_insert
+from services.applicant_documents import (
+    add_documents,
+    document_metadata,
+    documents_query,
+    group_documents,
+    load_documents,
+    remove_documents,
+    replace_documents,
+)
 from schemas.application_form import JobApplicantCreate, JobApplicantRead
+from services.image_pipeline import variant_urls
+from services.pagination import paginate
+from services.cache import (
+    APPLICANTS_LISTING,
+    USERS_LISTING,
+    cached_listing,
+    cached_listing_async,
+    invalidate_listings,
+)
+from services.search import (
+    apply_text_search,
+    combine_ranks,
+    invalidate_search_indexes,
+)
+
+
+# Columns of JobApplicantRead; listings select only these instead of full
+# JobApplicant and User entities (which would also load password hashes).
+APPLICANT_COLUMNS = (
+    JobApplicant.id,
+    JobApplicant.full_name,
+    JobApplicant.birth_date,
+    JobApplicant.city,
+    JobApplicant.country,
+    JobApplicant.gender,
+    JobApplicant.education,
+    JobApplicant.profile_picture,
+    JobApplicant.user_id,
+    User.full_name.label("user_full_name"),
+    User.email.label("user_email"),
+    User.photo.label("user_photo"),
+)
+
+
+def applicant_row(row, cv_files: list[str]) -> dict:
+    return {
+        "id": row.id,
+        "full_name": row.full_name,
+        "birth_date": row.birth_date,
+        "city": row.city,
+        "country": row.country,
+        "gender": row.gender,
+        "education": row.education,
+        "cv_files": cv_files,
+        "profile_picture": row.profile_picture,
+        "profile_picture_variants": variant_urls(row.profile_picture),
+        "user_id": row.user_id,
+        "user": None
+        if row.user_email is None
+        else {
+            "full_name": row.user_full_name,
+            "email": row.user_email,
+            "photo": row.user_photo,
+            "photo_variants": variant_urls(row.user_photo),
+        },
+    }
 
 
 def document_exist(string: str) -> bool:
     return string.startswith("static/uploads/documents/")
 
 
+def resolve_cv_files(db: Session, cv_files: list[str]) -> list[str]:
+    cv_files = cv_files or []
+    # All base64 CVs of a submission are saved in one call, so they are
+    # validated concurrently.
+    encoded = [cv_file for cv_file in cv_files if not document_exist(cv_file)]
+    saved = iter(save_documents(db, encoded))
+    resolved = [
+        cv_file if document_exist(cv_file) else next(saved) for cv_file in cv_files
+    ]
+    return list(dict.fromkeys(resolved))
+
+
+# Form fields always written by the upsert; profile_picture is only written
+# when the form carries one.
+APPLICANT_FIELDS = ("full_name", "birth_date", "city", "country", "gender", "education")
+
+
+def previous_profile_picture(db: Session, user_id: int):
+    return (
+        db.query(JobApplicant.profile_picture)
+        .filter(JobApplicant.user_id == user_id)
+        .with_for_update()
+        .scalar()
+    )
+
+
 def create_or_update_job_applicant(
     db: Session, job_applicant: JobApplicantCreate, current_user: User
 ):
-    db_job_applicant = (
-        db.query(JobApplicant).filter(JobApplicant.user_id == current_user.id).first()
+    values = {field: getattr(job_applicant, field) for field in APPLICANT_FIELDS}
+    if job_applicant.profile_picture:
+        values["profile_picture"] = save_image(db, job_applicant.profile_picture)
+
+    # The reference count only moves when the form replaces the picture, and
+    # only then is the previous one read (locked until the commit).
+    changes_picture = "profile_picture" in values
+    old_picture = (
+        previous_profile_picture(db, current_user.id) if changes_picture else None
     )
 
-    if db_job_applicant:
-        db_job_applicant.full_name = job_applicant.full_name
-        db_job_applicant.birth_date = job_applicant.birth_date
-        db_job_applicant.city = job_applicant.city
-        db_job_applicant.country = job_applicant.country
-        db_job_applicant.gender = job_applicant.gender
-        db_job_applicant.education = job_applicant.education
-
-        if job_applicant.profile_picture:
-            db_job_applicant.profile_picture = save_image(job_applicant.profile_picture)
-
-        if job_applicant.cv_files:
-            existing_files = set(db_job_applicant.cv_files or [])
-
-            incoming_files = set()
-            for cv_file in job_applicant.cv_files:
-                if document_exist(cv_file):
-                    incoming_files.add(cv_file)
-                else:
-                    saved_file = save_documents([cv_file])
-                    incoming_files.update(saved_file)
-
-            files_to_remove = existing_files - incoming_files
-
-            db_job_applicant.cv_files = [
-                f for f in db_job_applicant.cv_files if f not in files_to_remove
-            ]
-
-            db_job_applicant.cv_files.extend(incoming_files - existing_files)
-
-        db.flush()
-        db.commit()
-        db.refresh(db_job_applicant)
-        return JobApplicantRead.from_orm(db_job_applicant)
-
-    db_job_applicant = JobApplicant(
-        full_name=job_applicant.full_name,
-        birth_date=job_applicant.birth_date,
-        city=job_applicant.city,
-        country=job_applicant.country,
-        gender=job_applicant.gender,
-        education=job_applicant.education,
-        profile_picture=save_image(job_applicant.profile_picture),
-        cv_files=save_documents(job_applicant.cv_files),
-        user_id=current_user.id,
+    # One statement inserts or updates the row and reads it back.
+    statement = dialect_insert(db, JobApplicant.__table__).values(
+        {"profile_picture": None, **values, "user_id": current_user.id}
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={field: statement.excluded[field] for field in values},
+    ).returning(
+        JobApplicant.id,
+        *(getattr(JobApplicant, field) for field in APPLICANT_FIELDS),
+        JobApplicant.profile_picture,
+        JobApplicant.user_id,
     )
+    row = db.execute(statement).one()
 
-    db.add(db_job_applicant)
+    if changes_picture:
+        replace_file_references(db, [old_picture], [row.profile_picture])
+    if job_applicant.cv_files:
+        cv_files = replace_documents(
+            db, row.id, resolve_cv_files(db, job_applicant.cv_files)
+        )
+    else:
+        cv_files = load_documents(db, [row.id]).get(row.id, [])
     db.commit()
-    db.refresh(db_job_applicant)
-    return JobApplicantRead.from_orm(db_job_applicant)
+    invalidate_search_indexes(JobApplicant.__tablename__)
+    invalidate_listings(APPLICANTS_LISTING, USERS_LISTING)
+    return JobApplicantRead(
+        **applicant_row(
+            SimpleNamespace(
+                **row._mapping,
+                user_full_name=current_user.full_name,
+                user_email=current_user.email,
+                user_photo=current_user.photo,
+            ),
+            cv_files,
+        )
+    )
+
 
+def get_job_applicants(db: Session, **filters):
+    return cached_listing(
+        APPLICANTS_LISTING, filters, lambda: query_job_applicants(db, **filters)
+    )
 
-def get_job_applicants(db: Session, skip: int = 0, limit: int = 10):
-    return db.query(JobApplicant).offset(skip).limit(limit).all()
 
+def query_job_applicants(
+    db: Session,
+    page: int = 1,
+    limit: int = 10,
+    full_name: str = None,
+    city: str = None,
+    education: str = None,
+    cursor: str = None,
+    include_total: bool = True,
+    estimate_total: bool = False,
+    fuzzy: bool = False,
+):
+    query = (
+        db.query(*APPLICANT_COLUMNS)
+        .outerjoin(User, User.id == JobApplicant.user_id)
+        .filter(User.deleted_at.is_(None))
+    )
 
-def get_job_applicant_by_id(db: Session, job_applicant_id: int):
+    ranks = []
+    for column, term in (
+        (JobApplicant.full_name, full_name),
+        (JobApplicant.city, city),
+        (JobApplicant.education, education),
+    ):
+        if term:
+            query, rank = apply_text_search(db, query, column, term, fuzzy)
+            ranks.append(rank)
+
+    result = paginate(
+        db,
+        query,
+        JobApplicant.id,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        estimate_total=estimate_total,
+        rank=combine_ranks(ranks),
+    )
+    documents = load_documents(db, (row.id for row in result["items"]))
+    result["items"] = [
+        applicant_row(row, documents.get(row.id, [])) for row in result["items"]
+    ]
+    return result
+
+
+def job_applicant_query(job_applicant_id: int):
     return (
-        db.query(JobApplicant).filter(JobApplicant.user_id == job_applicant_id).first()
+        select(*APPLICANT_COLUMNS)
+        .outerjoin(User, User.id == JobApplicant.user_id)
+        .where(JobApplicant.user_id == job_applicant_id)
+        .limit(1)
+    )
+
+
+def get_job_applicant_by_id(db: Session, job_applicant_id: int):
+    row = db.execute(job_applicant_query(job_applicant_id)).first()
+    if row is None:
+        return None
+    return applicant_row(row, load_documents(db, [row.id]).get(row.id, []))
+
+
+async def get_job_applicants_async(db: AsyncSession, **filters):
+    async def compute():
+        return await db.run_sync(
+            lambda session: query_job_applicants(session, **filters)
+        )
+
+    return await cached_listing_async(APPLICANTS_LISTING, filters, compute)
+
+
+async def get_job_applicant_by_id_async(db: AsyncSession, job_applicant_id: int):
+    row = (await db.execute(job_applicant_query(job_applicant_id))).first()
+    if row is None:
+        return None
+    documents = group_documents(await db.execute(documents_query([row.id])))
+    return applicant_row(row, documents.get(row.id, []))
+
+
+def current_applicant_id(db: Session, current_user: User) -> int:
+    applicant_id = db.scalar(
+        select(JobApplicant.id).where(JobApplicant.user_id == current_user.id)
     )
+    if applicant_id is None:
+        raise HTTPException(status_code=404, detail="Job applicant not found")
+    return applicant_id
+
+
+def add_applicant_documents(db: Session, cv_files: list[str], current_user: User):
+    applicant_id = current_applicant_id(db, current_user)
+    add_documents(db, applicant_id, resolve_cv_files(db, cv_files))
+    db.commit()
+    invalidate_listings(APPLICANTS_LISTING)
+    return document_metadata(db, applicant_id)
+
+
+def remove_applicant_documents(db: Session, paths: list[str], current_user: User):
+    applicant_id = current_applicant_id(db, current_user)
+    remove_documents(db, applicant_id, paths)
+    db.commit()
+    invalidate_listings(APPLICANTS_LISTING)
+    return document_metadata(db, applicant_id)
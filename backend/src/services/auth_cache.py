@@ -0,0 +1,122 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from config import (
+    AUTH_CACHE_ENABLED,
+    AUTH_TOKEN_CACHE_SIZE,
+    AUTH_USER_CACHE_SIZE,
+    AUTH_USER_CACHE_TTL,
+)
+from database.models import User
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, expires_at: float = None):
+        if self.ttl is not None:
+            ttl_expiry = time.time() + self.ttl
+            expires_at = (
+                ttl_expiry if expires_at is None else min(expires_at, ttl_expiry)
+            )
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else None,
+            }
+
+
+token_cache = TTLCache(AUTH_TOKEN_CACHE_SIZE)
+user_cache = TTLCache(AUTH_USER_CACHE_SIZE, AUTH_USER_CACHE_TTL)
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def get_cached_payload(token: str):
+    if not AUTH_CACHE_ENABLED:
+        return None
+    return token_cache.get(token_digest(token))
+
+
+def cache_payload(token: str, payload: dict):
+    if not AUTH_CACHE_ENABLED or "exp" not in payload:
+        return
+    token_cache.set(token_digest(token), payload, expires_at=float(payload["exp"]))
+
+
+def get_cached_user(email: str):
+    if not AUTH_CACHE_ENABLED:
+        return None
+    values = user_cache.get(email)
+    if values is None:
+        return None
+    return User(**values)
+
+
+def cache_user(user: User):
+    if not AUTH_CACHE_ENABLED:
+        return
+    values = {
+        column.key: getattr(user, column.key) for column in User.__table__.columns
+    }
+    user_cache.set(user.email, values)
+
+
+def invalidate_user(email: str):
+    user_cache.delete(email)
+
+
+def auth_cache_stats() -> dict:
+    return {
+        "enabled": AUTH_CACHE_ENABLED,
+        "tokens": token_cache.stats(),
+        "users": user_cache.stats(),
+    }
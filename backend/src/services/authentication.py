@@ -1,16 +1,45 @@
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from services.email_settings import send_verification_email
+from services.email_settings import queue_verification_email
+from services.email_outbox import notify_outbox_worker
 from database.models import User
 from schemas.users import UserCreate
 from schemas.authentication import Token
 from services.security import create_access_token, create_email_verification_token
-from passlib.hash import bcrypt
+from services.password_hashing import hash_password, verify_password
 from services.file_upload import save_image
+from services.file_store import acquire_files
 from fastapi import HTTPException
+from services.search import invalidate_search_indexes
+from services.cache import USERS_LISTING, invalidate_listings
+
+
+def ensure_email_available(db: Session, email: str):
+    existing = db.query(User.deleted_at).filter(User.email == email).first()
+    if existing is None:
+        return
+    if existing.deleted_at is not None:
+        # Soft-deleted users keep their email until the purger removes them.
+        raise HTTPException(
+            status_code=409,
+            detail="This email belongs to a deleted account, try again later.",
+        )
+    raise HTTPException(status_code=400, detail="Email already registered")
+
+
+def commit_new_user(db: Session, email: str):
+    try:
+        db.commit()
+    except IntegrityError:
+        # Registered by a concurrent request since the check.
+        db.rollback()
+        ensure_email_available(db, email)
+        raise
 
 
 def create_user(db: Session, user_create: UserCreate):
-    hashed_password = bcrypt.hash(user_create.password)
+    ensure_email_available(db, user_create.email)
+    hashed_password = hash_password(user_create.password)
     user_data = {
         "email": user_create.email,
         "password": hashed_password,
@@ -21,19 +50,24 @@ def create_user(db: Session, user_create: UserCreate):
         user_data["full_name"] = user_create.full_name
 
     if user_create.photo:
-        user_data["photo"] = save_image(user_create.photo)
+        user_data["photo"] = save_image(db, user_create.photo)
 
     db_user = User(**user_data)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    acquire_files(db, [db_user.photo])
     token = create_email_verification_token(user_create.email)
-    send_verification_email(user_create.email, token)
+    queue_verification_email(db, user_create.email, token)
+    commit_new_user(db, user_create.email)
+    invalidate_search_indexes(User.__tablename__)
+    invalidate_listings(USERS_LISTING)
+    db.refresh(db_user)
+    notify_outbox_worker()
     return db_user
 
 
 def create_user_by_admin(db: Session, user_create: UserCreate):
-    hashed_password = bcrypt.hash(user_create.password)
+    ensure_email_available(db, user_create.email)
+    hashed_password = hash_password(user_create.password)
     user_data = {
         "email": user_create.email,
         "password": hashed_password,
@@ -45,18 +79,21 @@ def create_user_by_admin(db: Session, user_create: UserCreate):
         user_data["full_name"] = user_create.full_name
 
     if user_create.photo:
-        user_data["photo"] = save_image(user_create.photo)
+        user_data["photo"] = save_image(db, user_create.photo)
 
     db_user = User(**user_data)
     db.add(db_user)
-    db.commit()
+    acquire_files(db, [db_user.photo])
+    commit_new_user(db, user_create.email)
+    invalidate_search_indexes(User.__tablename__)
+    invalidate_listings(USERS_LISTING)
 
     return db_user
 
 
 def login_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
-    if user and bcrypt.verify(password, user.password):
+    user = db.query(User).filter(User.email == email, User.deleted_at.is_(None)).first()
+    if user and user.password and verify_password(password, user.password):
         if not user.is_verified:
             raise HTTPException(
                 status_code=400,
@@ -83,6 +120,10 @@ def get_or_create_google_user(db: Session, email: str, full_name: str):
         user = User(**user_data)
         db.add(user)
         db.commit()
+        invalidate_search_indexes(User.__tablename__)
+        invalidate_listings(USERS_LISTING)
         db.refresh(user)
+    elif user.deleted_at is not None:
+        raise HTTPException(status_code=401, detail="User not found.")
 
     return user
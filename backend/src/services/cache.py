@@ -0,0 +1,233 @@
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from starlette.concurrency import run_in_threadpool
+
+from config import (
+    LISTING_CACHE_BACKEND,
+    LISTING_CACHE_MAX_BYTES,
+    LISTING_CACHE_TTL,
+    LISTING_CACHE_URL,
+)
+from services.json_response import dump_json
+
+logger = logging.getLogger(__name__)
+
+APPLICANTS_LISTING = "applicants"
+USERS_LISTING = "users"
+
+
+class MemoryCache:
+    def __init__(self, max_bytes: int = LISTING_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.memory_bytes = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (value, expires_at)
+            self.memory_bytes += len(value)
+            while self.memory_bytes > self.max_bytes and self._data:
+                self._remove(next(iter(self._data)))
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def _remove(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.memory_bytes -= len(entry[0])
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._data),
+                "memory_bytes": self.memory_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class RedisCache:
+    def __init__(self, url: str = LISTING_CACHE_URL, client=None):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def get(self, key: str):
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float = None):
+        self.client.set(key, value, px=math.ceil(ttl * 1000) if ttl else None)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+    def get_counter(self, key: str) -> int:
+        value = self.client.get(key)
+        return int(value) if value is not None else 0
+
+    def info(self) -> dict:
+        # Only the listing pages; the Redis database may be shared with the
+        # rate limiter.
+        keys = [
+            key
+            for key in self.client.scan_iter(match="listing:*", count=1000)
+            if not key.endswith(b":version")
+        ]
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.strlen(key)
+        return {
+            "backend": "redis",
+            "entries": len(keys),
+            "memory_bytes": sum(pipe.execute()) if keys else 0,
+        }
+
+
+class ListingCache:
+    def __init__(self, backend, ttl: float = LISTING_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.backend_errors = 0
+
+    def _backend_failed(self, action: str):
+        # Fail open: listings are answered from the database and writes are
+        # already committed when invalidating, so an unavailable cache must
+        # not turn them into errors.
+        logger.warning("Listing cache %s failed", action, exc_info=True)
+        with self._lock:
+            self.backend_errors += 1
+
+    def _key(self, namespace: str, params: dict) -> str:
+        version = self.backend.get_counter(f"listing:{namespace}:version")
+        signature = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.sha256(signature.encode()).hexdigest()
+        return f"listing:{namespace}:{version}:{digest}"
+
+    def lookup(self, namespace: str, params: dict):
+        """Return (key, cached bytes or None); key is None when the backend failed."""
+        try:
+            key = self._key(namespace, params)
+            cached = self.backend.get(key)
+        except Exception:
+            self._backend_failed("read")
+            return None, None
+        with self._lock:
+            if cached is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return key, cached
+
+    def store(self, key: str, content) -> bytes:
+        body = dump_json(content)
+        if key is not None:
+            try:
+                self.backend.set(key, body, self.ttl)
+            except Exception:
+                self._backend_failed("write")
+        return body
+
+    def get_or_compute(self, namespace: str, params: dict, compute):
+        key, cached = self.lookup(namespace, params)
+        if cached is not None:
+            return cached
+        return self.store(key, compute())
+
+    def invalidate(self, *namespaces: str):
+        for namespace in namespaces:
+            try:
+                self.backend.incr(f"listing:{namespace}:version")
+            except Exception:
+                self._backend_failed("invalidation")
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "backend_errors": self.backend_errors,
+                "hit_ratio": self.hits / lookups if lookups else None,
+            }
+        try:
+            stats.update(self.backend.info())
+        except Exception:
+            self._backend_failed("info")
+        return stats
+
+
+def create_listing_cache():
+    if LISTING_CACHE_BACKEND == "none":
+        return None
+    if LISTING_CACHE_BACKEND == "redis":
+        return ListingCache(RedisCache())
+    return ListingCache(MemoryCache())
+
+
+listing_cache = create_listing_cache()
+
+
+def cached_listing(namespace: str, params: dict, compute):
+    if listing_cache is None:
+        return dump_json(compute())
+    return listing_cache.get_or_compute(namespace, params, compute)
+
+
+async def cached_listing_async(namespace: str, params: dict, compute):
+    # Cache round-trips and JSON encoding block, so they run in the threadpool;
+    # only the awaited compute() touches the database.
+    if listing_cache is None:
+        return await run_in_threadpool(dump_json, await compute())
+    key, cached = await run_in_threadpool(listing_cache.lookup, namespace, params)
+    if cached is not None:
+        return cached
+    return await run_in_threadpool(listing_cache.store, key, await compute())
+
+
+def invalidate_listings(*namespaces: str):
+    if listing_cache is not None:
+        listing_cache.invalidate(*namespaces)
+
+
+def listing_cache_stats() -> dict:
+    if listing_cache is None:
+        return {"backend": "none"}
+    return listing_cache.stats()
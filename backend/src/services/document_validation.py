@@ -0,0 +1,129 @@
+import io
+import multiprocessing
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import DOCUMENT_VALIDATION_WORKERS
+
+PDF_HEADER = b"%PDF-"
+ZIP_HEADER = b"PK\x03\x04"
+PDF_SEARCH_BYTES = 1024
+DOCX_MAIN_PART = "word/document.xml"
+DOCX_CONTENT_TYPES = "[Content_Types].xml"
+DOCX_MAIN_CONTENT_TYPE = (
+    b"application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"
+)
+MAX_CONTENT_TYPES_BYTES = 1024 * 1024
+MAX_MAIN_PART_BYTES = 256 * 1024 * 1024
+
+STARTXREF = re.compile(rb"startxref\s+(\d+)\s+%%EOF", re.DOTALL)
+XREF_SECTION = re.compile(rb"\s*(xref|\d+\s+\d+\s+obj)")
+
+UNSUPPORTED_DOCUMENT = "Unsupported file format. Only PDF and DOCX are allowed."
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _file_size(document) -> int:
+    document.seek(0, io.SEEK_END)
+    return document.tell()
+
+
+def _has_valid_trailer(document, size: int) -> bool:
+    document.seek(max(size - PDF_SEARCH_BYTES, 0))
+    tail = document.read(PDF_SEARCH_BYTES)
+    matches = STARTXREF.findall(tail)
+    if not matches:
+        return False
+
+    offset = int(matches[-1])
+    if offset >= size:
+        return False
+    document.seek(offset)
+    return XREF_SECTION.match(document.read(64)) is not None
+
+
+def _validate_pdf(document, size: int):
+    if _has_valid_trailer(document, size):
+        return
+
+    # Damaged cross-reference tables are common and PyPDF2 can rebuild them,
+    # so only walk the whole file when the cheap trailer check fails.
+    from PyPDF2 import PdfReader
+
+    document.seek(0)
+    try:
+        PdfReader(document)
+    except Exception as e:
+        raise ValueError(f"Invalid PDF file. {str(e)}")
+
+
+def _validate_docx(document):
+    try:
+        with zipfile.ZipFile(document) as archive:
+            names = set(archive.namelist())
+            if DOCX_MAIN_PART not in names or DOCX_CONTENT_TYPES not in names:
+                raise ValueError(UNSUPPORTED_DOCUMENT)
+
+            main_part = archive.getinfo(DOCX_MAIN_PART)
+            if main_part.file_size > MAX_MAIN_PART_BYTES:
+                raise ValueError("DOCX document part is too large.")
+
+            content_types = archive.getinfo(DOCX_CONTENT_TYPES)
+            if content_types.file_size > MAX_CONTENT_TYPES_BYTES:
+                raise ValueError(UNSUPPORTED_DOCUMENT)
+            if DOCX_MAIN_CONTENT_TYPE not in archive.read(content_types):
+                raise ValueError(UNSUPPORTED_DOCUMENT)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Invalid DOCX file. {str(e)}")
+
+
+def classify_document(document) -> str:
+    size = _file_size(document)
+    document.seek(0)
+    head = document.read(PDF_SEARCH_BYTES)
+
+    if head.startswith(ZIP_HEADER):
+        _validate_docx(document)
+        return "docx"
+    if PDF_HEADER in head:
+        _validate_pdf(document, size)
+        return "pdf"
+    raise ValueError(UNSUPPORTED_DOCUMENT)
+
+
+def map_documents(function, documents: list) -> list:
+    # Validation is pure Python and holds the GIL, so several documents are
+    # only checked in parallel in separate processes. ``function`` must be a
+    # module level function and ``documents`` picklable.
+    if len(documents) <= 1 or DOCUMENT_VALIDATION_WORKERS <= 1:
+        return [function(document) for document in documents]
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=DOCUMENT_VALIDATION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        executor = _executor
+    try:
+        return list(executor.map(function, documents))
+    except (BrokenProcessPool, RuntimeError):
+        with _executor_lock:
+            if _executor is executor:
+                _executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        return [function(document) for document in documents]
+
+
+def shutdown_document_workers():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
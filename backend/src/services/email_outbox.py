@@ -0,0 +1,426 @@
+import logging
+import random
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from config import (
+    EMAIL_OUTBOX_BACKOFF_SECONDS,
+    EMAIL_OUTBOX_BATCH_SIZE,
+    EMAIL_OUTBOX_LEASE_SECONDS,
+    EMAIL_OUTBOX_MAX_ATTEMPTS,
+    EMAIL_OUTBOX_POLL_INTERVAL,
+    EMAIL_OUTBOX_WORKERS,
+    EMAIL_PASSWORD,
+    EMAIL_USER,
+    SMTP_MAX_IDLE_SECONDS,
+    SMTP_POOL_SIZE,
+    SMTP_PORT,
+    SMTP_SERVER,
+    SMTP_STARTTLS,
+    SMTP_TIMEOUT,
+)
+from database.models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF_SECONDS = 3600
+
+
+def enqueue_email(db: Session, to_email: str, subject: str, body: str) -> EmailOutbox:
+    now = datetime.utcnow()
+    message = EmailOutbox(
+        to_email=to_email,
+        subject=subject,
+        body=body,
+        status="pending",
+        attempts=0,
+        next_attempt_at=now,
+        created_at=now,
+    )
+    db.add(message)
+    return message
+
+
+def build_message(outbox_message: EmailOutbox) -> MIMEMultipart:
+    message = MIMEMultipart()
+    message["From"] = EMAIL_USER
+    message["To"] = outbox_message.to_email
+    message["Subject"] = outbox_message.subject
+    message.attach(MIMEText(outbox_message.body, "plain"))
+    return message
+
+
+class SMTPConnectionPool:
+    def __init__(
+        self,
+        host=None,
+        port=None,
+        username=None,
+        password=None,
+        starttls=SMTP_STARTTLS,
+        timeout=SMTP_TIMEOUT,
+        max_idle=SMTP_POOL_SIZE,
+        max_idle_seconds=SMTP_MAX_IDLE_SECONDS,
+    ):
+        self.host = host or SMTP_SERVER
+        self.port = int(port or SMTP_PORT or 25)
+        self.username = username if username is not None else EMAIL_USER
+        self.password = password if password is not None else EMAIL_PASSWORD
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_idle_seconds = max_idle_seconds
+        self._idle = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            connection.starttls()
+        if self.username and self.password:
+            connection.login(self.username, self.password)
+        with self._lock:
+            self.connections_opened += 1
+        return connection
+
+    def acquire(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, released_at = self._idle.pop()
+
+            if time.monotonic() - released_at > self.max_idle_seconds:
+                self._close(connection)
+                continue
+            try:
+                if connection.noop()[0] == 250:
+                    return connection
+            except OSError:
+                pass
+            self._close(connection)
+
+        return self._connect()
+
+    def release(self, connection: smtplib.SMTP):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((connection, time.monotonic()))
+                return
+        self._close(connection)
+
+    def discard(self, connection: smtplib.SMTP):
+        self._close(connection)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close(connection)
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    @staticmethod
+    def _close(connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except OSError:
+            connection.close()
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+def is_connection_failure(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def retry_delay(attempts: int, base: float = EMAIL_OUTBOX_BACKOFF_SECONDS) -> float:
+    delay = min(base * (2 ** (attempts - 1)), MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class EmailOutboxWorker:
+    def __init__(
+        self,
+        session_factory,
+        pool: SMTPConnectionPool,
+        workers: int = EMAIL_OUTBOX_WORKERS,
+        batch_size: int = EMAIL_OUTBOX_BATCH_SIZE,
+        poll_interval: float = EMAIL_OUTBOX_POLL_INTERVAL,
+        max_attempts: int = EMAIL_OUTBOX_MAX_ATTEMPTS,
+        lease_seconds: float = EMAIL_OUTBOX_LEASE_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.pool = pool
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self._threads = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.stats = {"sent": 0, "retried": 0, "failed": 0, "batches": 0}
+        self.last_error = None
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"email-outbox-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self.pool.close()
+
+    def notify(self):
+        self._wakeup.set()
+
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.drain_once()
+            except Exception as e:
+                logger.exception("Email outbox batch failed")
+                self.last_error = str(e)
+                processed = 0
+
+            if processed < self.batch_size:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def claim_batch(self, db: Session) -> list[EmailOutbox]:
+        now = datetime.utcnow()
+        claim = uuid.uuid4().hex
+        lease_expired = now - timedelta(seconds=self.lease_seconds)
+
+        claimable = (
+            db.query(EmailOutbox.id)
+            .filter(
+                or_(
+                    and_(
+                        EmailOutbox.status == "pending",
+                        EmailOutbox.next_attempt_at <= now,
+                    ),
+                    and_(
+                        EmailOutbox.status == "sending",
+                        EmailOutbox.claimed_at < lease_expired,
+                    ),
+                )
+            )
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(self.batch_size)
+        )
+        if db.bind.dialect.name == "postgresql":
+            claimable = claimable.with_for_update(skip_locked=True)
+
+        ids = [row.id for row in claimable.all()]
+        if not ids:
+            db.rollback()
+            return []
+
+        db.query(EmailOutbox).filter(
+            EmailOutbox.id.in_(ids),
+            EmailOutbox.status.in_(["pending", "sending"]),
+            or_(
+                EmailOutbox.claimed_by.is_(None), EmailOutbox.claimed_at < lease_expired
+            ),
+        ).update(
+            {"status": "sending", "claimed_by": claim, "claimed_at": now},
+            synchronize_session=False,
+        )
+        db.commit()
+
+        return (
+            db.query(EmailOutbox)
+            .filter(EmailOutbox.claimed_by == claim)
+            .order_by(EmailOutbox.id)
+            .all()
+        )
+
+    def drain_once(self) -> int:
+        db = self.session_factory()
+        # Each outcome is committed on its own; keep the claimed rows loaded.
+        db.expire_on_commit = False
+        try:
+            claimed_at = time.monotonic()
+            batch = self.claim_batch(db)
+            if not batch:
+                return 0
+
+            # Stop while the lease still covers a send (connect and send may
+            # each take the SMTP timeout), so no other worker re-claims and
+            # re-sends a message this one is still working on.
+            send_budget = self.lease_seconds - 2 * self.pool.timeout
+            connection = None
+            processed = 0
+            for outbox_message in batch:
+                if time.monotonic() - claimed_at > send_budget:
+                    break
+                try:
+                    if connection is None:
+                        connection = self.pool.acquire()
+                    connection.send_message(build_message(outbox_message))
+                except Exception as e:
+                    if connection is not None and is_connection_failure(e):
+                        self.pool.discard(connection)
+                        connection = None
+                    self._mark_failed(outbox_message, e)
+                else:
+                    self._mark_sent(outbox_message)
+                db.commit()
+                processed += 1
+
+            if connection is not None:
+                self.pool.release(connection)
+
+            unsent = [outbox_message.id for outbox_message in batch[processed:]]
+            if unsent:
+                self._release_claims(db, unsent)
+
+            with self._stats_lock:
+                self.stats["batches"] += 1
+            return processed
+        finally:
+            db.close()
+
+    def _release_claims(self, db: Session, ids: list[int]):
+        db.query(EmailOutbox).filter(
+            EmailOutbox.id.in_(ids), EmailOutbox.status == "sending"
+        ).update(
+            {"status": "pending", "claimed_by": None, "claimed_at": None},
+            synchronize_session=False,
+        )
+        db.commit()
+
+    def _mark_sent(self, outbox_message: EmailOutbox):
+        outbox_message.status = "sent"
+        outbox_message.attempts += 1
+        outbox_message.sent_at = datetime.utcnow()
+        outbox_message.claimed_by = None
+        outbox_message.last_error = None
+        with self._stats_lock:
+            self.stats["sent"] += 1
+
+    def _mark_failed(self, outbox_message: EmailOutbox, error: Exception):
+        outbox_message.attempts += 1
+        outbox_message.claimed_by = None
+        outbox_message.last_error = f"{type(error).__name__}: {error}"
+        self.last_error = outbox_message.last_error
+
+        if is_permanent_failure(error) or outbox_message.attempts >= self.max_attempts:
+            outbox_message.status = "failed"
+            counter = "failed"
+        else:
+            outbox_message.status = "pending"
+            outbox_message.next_attempt_at = datetime.utcnow() + timedelta(
+                seconds=retry_delay(outbox_message.attempts)
+            )
+            counter = "retried"
+
+        logger.warning(
+            "Email %s to %s failed (attempt %s): %s",
+            outbox_message.id,
+            outbox_message.to_email,
+            outbox_message.attempts,
+            outbox_message.last_error,
+        )
+        with self._stats_lock:
+            self.stats[counter] += 1
+
+
+outbox_worker = None
+
+
+def start_outbox_worker(session_factory) -> EmailOutboxWorker:
+    global outbox_worker
+    if outbox_worker is None:
+        outbox_worker = EmailOutboxWorker(session_factory, SMTPConnectionPool())
+    outbox_worker.start()
+    return outbox_worker
+
+
+def stop_outbox_worker():
+    global outbox_worker
+    if outbox_worker is not None:
+        outbox_worker.stop()
+        outbox_worker = None
+
+
+def notify_outbox_worker():
+    if outbox_worker is not None:
+        outbox_worker.notify()
+
+
+def get_outbox_status(db: Session) -> dict:
+    counts = dict(
+        db.query(EmailOutbox.status, func.count(EmailOutbox.id))
+        .group_by(EmailOutbox.status)
+        .all()
+    )
+    oldest_pending = (
+        db.query(func.min(EmailOutbox.created_at))
+        .filter(EmailOutbox.status.in_(["pending", "sending"]))
+        .scalar()
+    )
+
+    status = {
+        "pending": counts.get("pending", 0),
+        "sending": counts.get("sending", 0),
+        "sent": counts.get("sent", 0),
+        "failed": counts.get("failed", 0),
+        "oldest_pending_seconds": (
+            (datetime.utcnow() - oldest_pending).total_seconds()
+            if oldest_pending
+            else None
+        ),
+        "worker_running": False,
+    }
+
+    if outbox_worker is not None:
+        with outbox_worker._stats_lock:
+            worker_stats = dict(outbox_worker.stats)
+        status.update(
+            {
+                "worker_running": outbox_worker.is_running(),
+                "worker_threads": outbox_worker.workers,
+                "worker_stats": worker_stats,
+                "smtp_connections_opened": outbox_worker.pool.connections_opened,
+                "smtp_idle_connections": outbox_worker.pool.idle_count(),
+                "last_error": outbox_worker.last_error,
+            }
+        )
+
+    return status
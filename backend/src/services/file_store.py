@@ -0,0 +1,277 @@
+import gzip
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config import (
+    FILE_STORE_GC_GRACE_SECONDS,
+    FILE_STORE_GC_INTERVAL,
+    UPLOAD_PRECOMPRESS,
+)
+from database.dialect import dialect_insert
+from database.models import StoredFile
+
+logger = logging.getLogger(__name__)
+
+PATH = "static/uploads"
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+MIN_COMPRESSION_SAVING = 0.1
+KINDS = ("images", "documents")
+CONTENT_NAME = re.compile(r"[0-9a-f]{64}\.\w+")
+
+
+def content_path(kind: str, digest: str, extension: str) -> str:
+    return os.path.join(PATH, kind, f"{digest}.{extension}")
+
+
+def variants_directory(file_path: str) -> str:
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(PATH, "images", "variants", stem)
+
+
+def precompress_file(file_path: str):
+    compressed_path = file_path + ".gz"
+    temporary_path = compressed_path + ".part"
+    with open(file_path, "rb") as source, gzip.open(temporary_path, "wb") as target:
+        shutil.copyfileobj(source, target, 64 * 1024)
+
+    saving = 1 - os.path.getsize(temporary_path) / max(os.path.getsize(file_path), 1)
+    if saving >= MIN_COMPRESSION_SAVING:
+        os.replace(temporary_path, compressed_path)
+    else:
+        os.remove(temporary_path)
+
+
+def find_stored_file(db: Session, kind: str, digest: str):
+    # Keyed by kind too: the same bytes saved as another kind were never
+    # validated as this one.
+    stored_file = (
+        db.query(StoredFile)
+        .filter(StoredFile.kind == kind, StoredFile.sha256 == digest)
+        .first()
+    )
+    if stored_file is None or not os.path.exists(stored_file.path):
+        return None
+    if stored_file.ref_count <= 0:
+        stored_file.updated_at = datetime.utcnow()
+    return stored_file
+
+
+def store_file(db: Session, kind: str, digest: str, extension: str, write) -> str:
+    file_path = content_path(kind, digest, extension)
+    directory = os.path.dirname(file_path)
+    os.makedirs(directory, exist_ok=True)
+
+    if not os.path.exists(file_path):
+        with tempfile.NamedTemporaryFile(
+            dir=directory, suffix=".part", delete=False
+        ) as file:
+            temporary_path = file.name
+        try:
+            write(temporary_path)
+            os.replace(temporary_path, file_path)
+            if UPLOAD_PRECOMPRESS and kind == "documents":
+                precompress_file(file_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+    else:
+        # Tells the untracked file sweep this content is in use again.
+        os.utime(file_path)
+
+    return register_file(db, kind, digest, file_path)
+
+
+def register_file(db: Session, kind: str, digest: str, file_path: str) -> str:
+    now = datetime.utcnow()
+    db.execute(
+        dialect_insert(db, StoredFile)
+        .values(
+            sha256=digest,
+            kind=kind,
+            path=file_path,
+            size=os.path.getsize(file_path),
+            ref_count=0,
+            created_at=now,
+            updated_at=now,
+        )
+        .on_conflict_do_nothing(index_elements=["kind", "sha256"])
+    )
+    return (
+        db.query(StoredFile.path)
+        .filter(StoredFile.kind == kind, StoredFile.sha256 == digest)
+        .scalar()
+    )
+
+
+def _adjust_references(db: Session, paths, delta: int):
+    counts = Counter(path for path in paths if path)
+    by_count = {}
+    for path, count in counts.items():
+        by_count.setdefault(count, []).append(path)
+
+    for count, grouped_paths in by_count.items():
+        values = {StoredFile.ref_count: StoredFile.ref_count + delta * count}
+        if delta < 0:
+            values[StoredFile.updated_at] = datetime.utcnow()
+        db.query(StoredFile).filter(StoredFile.path.in_(grouped_paths)).update(
+            values, synchronize_session=False
+        )
+
+
+def acquire_files(db: Session, paths):
+    _adjust_references(db, paths, 1)
+
+
+def release_files(db: Session, paths):
+    _adjust_references(db, paths, -1)
+
+
+def replace_file_references(db: Session, old_paths, new_paths):
+    old_paths = set(path for path in old_paths if path)
+    new_paths = set(path for path in new_paths if path)
+    acquire_files(db, new_paths - old_paths)
+    release_files(db, old_paths - new_paths)
+
+
+def collect_unreferenced_files(
+    db: Session, grace_seconds: float = FILE_STORE_GC_GRACE_SECONDS, limit=500
+) -> int:
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    candidates = (
+        db.query(StoredFile.id, StoredFile.path)
+        .filter(StoredFile.ref_count <= 0, StoredFile.updated_at < cutoff)
+        .limit(limit)
+        .all()
+    )
+
+    removed = []
+    for file_id, file_path in candidates:
+        deleted = (
+            db.query(StoredFile)
+            .filter(
+                StoredFile.id == file_id,
+                StoredFile.ref_count <= 0,
+                StoredFile.updated_at < cutoff,
+            )
+            .delete(synchronize_session=False)
+        )
+        if deleted:
+            removed.append(file_path)
+    db.commit()
+
+    for file_path in removed:
+        remove_content(file_path)
+    return len(removed)
+
+
+def remove_content(file_path: str):
+    for path in [file_path, *(file_path + suffix for _, suffix in PRECOMPRESSED)]:
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(variants_directory(file_path), ignore_errors=True)
+
+
+def _is_stale(path: str, cutoff: float) -> bool:
+    try:
+        return os.path.getmtime(path) < cutoff
+    except FileNotFoundError:
+        return False
+
+
+def collect_untracked_files(
+    db: Session, grace_seconds: float = FILE_STORE_GC_GRACE_SECONDS, limit=500
+) -> int:
+    """Delete content files that never got a stored_files row.
+
+    Files are written before the transaction that registers them commits, so a
+    failed commit (a duplicate email, say) leaves the file behind untracked.
+    Leftover temporary ``.part`` files are removed as well.
+    """
+    cutoff = time.time() - grace_seconds
+    candidates = []
+    for kind in KINDS:
+        directory = os.path.join(PATH, kind)
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".part") and _is_stale(path, cutoff):
+                os.remove(path)
+            elif CONTENT_NAME.fullmatch(name) and _is_stale(path, cutoff):
+                candidates.append(path)
+
+    removed = 0
+    for start in range(0, len(candidates), limit):
+        batch = candidates[start : start + limit]
+        tracked = set(
+            db.scalars(select(StoredFile.path).where(StoredFile.path.in_(batch)))
+        )
+        for path in batch:
+            if path not in tracked and _is_stale(path, cutoff):
+                remove_content(path)
+                removed += 1
+    return removed
+
+
+class FileCollector:
+    def __init__(self, session_factory, interval: float = FILE_STORE_GC_INTERVAL):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="file-store-gc", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(10)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            db = self.session_factory()
+            try:
+                removed = collect_unreferenced_files(db)
+                if removed:
+                    logger.info("Removed %s unreferenced uploads", removed)
+                untracked = collect_untracked_files(db)
+                if untracked:
+                    logger.info("Removed %s untracked uploads", untracked)
+            except Exception:
+                logger.exception("Upload garbage collection failed")
+                db.rollback()
+            finally:
+                db.close()
+
+
+file_collector = None
+
+
+def start_file_collector(session_factory):
+    global file_collector
+    if file_collector is None:
+        file_collector = FileCollector(session_factory)
+    file_collector.start()
+
+
+def stop_file_collector():
+    global file_collector
+    if file_collector is not None:
+        file_collector.stop()
+        file_collector = None
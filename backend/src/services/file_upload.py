@@ -1,15 +1,14 @@
 import base64
+import hashlib
 import io
 import os
-import uuid
-from PIL import Image
-from PyPDF2 import PdfReader
-from docx import Document
+from sqlalchemy.orm import Session
+from services.document_validation import classify_document, map_documents
+from services.file_store import PATH, find_stored_file, store_file
+from services.image_pipeline import pillow, schedule_variants
 
-PATH = "static/uploads"
 
-
-def save_image(image_base64: str) -> str:
+def save_image(db: Session, image_base64: str) -> str:
     if not image_base64:
         return None
     save_directory = PATH + "/images"
@@ -19,8 +18,14 @@ def save_image(image_base64: str) -> str:
         return image_base64
 
     image_data = base64.b64decode(image_base64)
+    digest = hashlib.sha256(image_data).hexdigest()
+
+    stored_file = find_stored_file(db, "images", digest)
+    if stored_file:
+        return stored_file.path
 
     image_io = io.BytesIO(image_data)
+    Image, _ = pillow()
 
     try:
         with Image.open(image_io) as img:
@@ -29,11 +34,14 @@ def save_image(image_base64: str) -> str:
             if image_format not in ["png", "jpeg"]:
                 raise ValueError("Unsupported image format")
 
-            filename = f"{uuid.uuid4()}.{image_format}"
-            file_path = os.path.join(save_directory, filename)
-
-            img.save(file_path)
-
+            file_path = store_file(
+                db,
+                "images",
+                digest,
+                image_format,
+                lambda file_path: img.save(file_path, format=img.format),
+            )
+            schedule_variants(file_path)
             return file_path
 
     except ValueError as e:
@@ -42,42 +50,73 @@ def save_image(image_base64: str) -> str:
         )
 
 
-def save_documents(document_files: list[str]) -> list[str]:
+def _decode_document(document_base64: str):
+    try:
+        document_data = base64.b64decode(document_base64)
+    except Exception as e:
+        raise ValueError(f"Failed to save document. Error: {str(e)}")
+    return document_data, hashlib.sha256(document_data).hexdigest()
+
+
+def _classify_document(document_data: bytes) -> str:
+    try:
+        return detect_document_extension(io.BytesIO(document_data))
+    except Exception as e:
+        raise ValueError(f"Failed to save document. Error: {str(e)}")
+
+
+def save_documents(db: Session, document_files: list[str]) -> list[str]:
     if not document_files:
         return []
 
     save_directory = PATH + "/documents"
     os.makedirs(save_directory, exist_ok=True)
 
-    saved_files = []
-
-    for document_base64 in document_files:
-        try:
-            document_data = base64.b64decode(document_base64)
-            document_io = io.BytesIO(document_data)
-
-            try:
-                PdfReader(document_io)
-                file_extension = "pdf"
-            except Exception:
-                try:
-                    document_io.seek(0)
-                    Document(document_io)
-                    file_extension = "docx"
-                except Exception:
-                    raise ValueError(
-                        "Unsupported file format. Only PDF and DOCX are allowed."
-                    )
-
-            filename = f"{uuid.uuid4()}.{file_extension}"
-            file_path = os.path.join(save_directory, filename)
-
+    documents = [_decode_document(document) for document in document_files]
+
+    # Hash first: documents that are already stored are not parsed again, and
+    # only the new ones are validated, together in the pool.
+    saved_paths = {}
+    new_documents = {}
+    for document_data, digest in documents:
+        if digest in saved_paths or digest in new_documents:
+            continue
+        stored_file = find_stored_file(db, "documents", digest)
+        if stored_file:
+            saved_paths[digest] = stored_file.path
+        else:
+            new_documents[digest] = document_data
+
+    extensions = map_documents(_classify_document, list(new_documents.values()))
+    for (digest, document_data), file_extension in zip(
+        new_documents.items(), extensions
+    ):
+
+        def write(file_path, document_data=document_data):
             with open(file_path, "wb") as file:
                 file.write(document_data)
 
-            saved_files.append(file_path)
+        saved_paths[digest] = store_file(db, "documents", digest, file_extension, write)
+
+    return [saved_paths[digest] for _, digest in documents]
 
-        except Exception as e:
-            raise ValueError(f"Failed to save document. Error: {str(e)}")
 
-    return saved_files
+def detect_document_extension(document) -> str:
+    if isinstance(document, str):
+        with open(document, "rb") as file:
+            return classify_document(file)
+    return classify_document(document)
+
+
+def detect_image_extension(image) -> str:
+    Image, _ = pillow()
+    try:
+        with Image.open(image) as img:
+            image_format = (img.format or "").lower()
+            img.verify()
+    except Exception as e:
+        raise ValueError(f"Cannot identify image file. {str(e)}")
+
+    if image_format not in ["png", "jpeg"]:
+        raise ValueError("Unsupported image format")
+    return image_format
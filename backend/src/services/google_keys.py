@@ -0,0 +1,189 @@
+import json
+import logging
+import re
+import threading
+import time
+import urllib.request
+
+from fastapi import HTTPException
+from jose import jwk, jwt
+from jose.exceptions import JOSEError
+
+from config import (
+    GOOGLE_CLIENT_ID,
+    GOOGLE_JWKS_FILE,
+    GOOGLE_JWKS_URL,
+    GOOGLE_KEYS_DEFAULT_MAX_AGE,
+    GOOGLE_KEYS_FETCH_TIMEOUT,
+    GOOGLE_KEYS_REFRESH_MARGIN,
+)
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+# Waits after a failed refresh, and between refreshes for unknown key ids.
+RETRY_SECONDS = 30
+
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+def cache_lifetime(headers, default: float = GOOGLE_KEYS_DEFAULT_MAX_AGE) -> float:
+    match = MAX_AGE_PATTERN.search(headers.get("Cache-Control") or "")
+    if not match:
+        return default
+    age = headers.get("Age") or "0"
+    return max(int(match.group(1)) - (int(age) if age.isdigit() else 0), 0)
+
+
+class GoogleKeyCache:
+    def __init__(
+        self,
+        url: str = GOOGLE_JWKS_URL,
+        jwks_file: str = GOOGLE_JWKS_FILE,
+        refresh_margin: float = GOOGLE_KEYS_REFRESH_MARGIN,
+        fetch_timeout: float = GOOGLE_KEYS_FETCH_TIMEOUT,
+    ):
+        self.url = url
+        self.jwks_file = jwks_file
+        self.refresh_margin = refresh_margin
+        self.fetch_timeout = fetch_timeout
+        self._keys = {}
+        self._expires_at = 0.0
+        self._fetched_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.unknown_keys = 0
+
+    def _fetch(self):
+        if self.jwks_file:
+            # Test mode: a local JWKS stand-in that never expires.
+            with open(self.jwks_file) as file:
+                return json.load(file), float("inf")
+        with urllib.request.urlopen(self.url, timeout=self.fetch_timeout) as response:
+            return json.load(response), cache_lifetime(response.headers)
+
+    def refresh(self):
+        jwks, lifetime = self._fetch()
+        keys = {
+            key["kid"]: jwk.construct(key, key.get("alg", "RS256"))
+            for key in jwks["keys"]
+        }
+        now = time.monotonic()
+        self._keys = keys
+        self._expires_at = now + lifetime
+        self._fetched_at = now
+        self.fetches += 1
+
+    def _refresh_if(self, needed) -> None:
+        with self._lock:
+            if not needed():
+                return
+            try:
+                self.refresh()
+            except Exception as error:
+                self.fetch_errors += 1
+                logger.warning("Refreshing Google signing keys failed", exc_info=True)
+                if not self._keys:
+                    raise HTTPException(
+                        status_code=503,
+                        detail="Google sign-in is unavailable, please try again.",
+                    ) from error
+                # Otherwise keep verifying with the previous keys, and let
+                # logins retry the fetch only every RETRY_SECONDS.
+                self._expires_at = time.monotonic() + RETRY_SECONDS
+
+    def get_key(self, kid: str):
+        if time.monotonic() >= self._expires_at:
+            self._refresh_if(lambda: time.monotonic() >= self._expires_at)
+        key = self._keys.get(kid)
+        if key is None:
+            # Google may have rotated in a new key; refetch, but not on every bad token.
+            self.unknown_keys += 1
+            self._refresh_if(
+                lambda: kid not in self._keys
+                and (
+                    self._fetched_at is None
+                    or time.monotonic() - self._fetched_at >= RETRY_SECONDS
+                )
+            )
+            key = self._keys.get(kid)
+        return key
+
+    def verify(self, token: str, audience: str = GOOGLE_CLIENT_ID) -> dict:
+        """Return the claims of a Google ID token, or raise ValueError."""
+        try:
+            key = self.get_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                raise ValueError("Unknown Google signing key")
+            return jwt.decode(
+                token,
+                key,
+                algorithms=["RS256"],
+                audience=audience,
+                issuer=GOOGLE_ISSUERS,
+                options={"verify_aud": audience is not None, "verify_at_hash": False},
+            )
+        except JOSEError as error:
+            raise ValueError(str(error)) from error
+
+    def start(self):
+        if self._thread is None and not self.jwks_file:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="google-keys", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(10)
+            self._thread = None
+
+    def _run(self):
+        # Refetch refresh_margin seconds before the keys expire, so logins
+        # never wait for Google.
+        delay = 0.0
+        while not self._stop.wait(delay):
+            try:
+                with self._lock:
+                    self.refresh()
+                delay = max(
+                    self._expires_at - time.monotonic() - self.refresh_margin,
+                    RETRY_SECONDS,
+                )
+            except Exception:
+                self.fetch_errors += 1
+                logger.warning("Refreshing Google signing keys failed", exc_info=True)
+                delay = RETRY_SECONDS
+
+    def stats(self) -> dict:
+        return {
+            "source": self.jwks_file or self.url,
+            "keys": sorted(self._keys),
+            "expires_in": None
+            if self._fetched_at is None or self.jwks_file
+            else max(self._expires_at - time.monotonic(), 0),
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+            "unknown_keys": self.unknown_keys,
+            "background_refresh": self._thread is not None,
+        }
+
+
+google_keys = GoogleKeyCache()
+
+
+def verify_google_token(token: str) -> dict:
+    return google_keys.verify(token)
+
+
+def start_google_key_refresher():
+    google_keys.start()
+
+
+def stop_google_key_refresher():
+    google_keys.stop()
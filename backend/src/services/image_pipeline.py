@@ -0,0 +1,163 @@
+import logging
+import os
+import re
+import tempfile
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from config import (
+    IMAGE_MAX_PIXELS,
+    IMAGE_ONDEMAND_SIZES,
+    IMAGE_VARIANT_SIZES,
+    IMAGE_WORKERS,
+)
+from services.file_store import PATH, variants_directory
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+VARIANT_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+VARIANTS_URL = "/api/images"
+IMAGE_NAME = re.compile(r"^[A-Za-z0-9-]+$")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_path(source_path: str, size: int, image_format: str) -> str:
+    return os.path.join(variants_directory(source_path), f"{size}.{image_format}")
+
+
+def variant_urls(source_path: str):
+    if not source_path:
+        return None
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return {
+        str(size): {
+            image_format: f"{VARIANTS_URL}/{stem}/{size}.{image_format}"
+            for image_format in VARIANT_FORMATS
+        }
+        for size in IMAGE_VARIANT_SIZES
+    }
+
+
+def find_source_image(name: str):
+    if not IMAGE_NAME.match(name):
+        return None
+    for extension in ("jpeg", "png"):
+        source_path = os.path.join(PATH, "images", f"{name}.{extension}")
+        if os.path.exists(source_path):
+            return source_path
+    return None
+
+
+def pillow():
+    # Imported on first use, so processes that never handle images skip Pillow.
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+    return Image, ImageOps
+
+
+def open_image(source_path: str, max_size: int) -> "Image.Image":
+    Image, ImageOps = pillow()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", Image.DecompressionBombWarning)
+            img = Image.open(source_path)
+            if img.format == "JPEG":
+                img.draft("RGB", (max_size, max_size))
+            img.load()
+    except FileNotFoundError:
+        raise
+    except (
+        Image.DecompressionBombError,
+        Image.DecompressionBombWarning,
+        OSError,
+    ) as e:
+        # Sources stored before the upload checks may be oversized or broken.
+        raise ValueError(f"Cannot process image: {e}") from e
+
+    img = ImageOps.exif_transpose(img)
+    img.info = {}
+    return img
+
+
+def save_variant(img: "Image.Image", target_path: str, image_format: str):
+    if image_format == "jpeg" and img.mode != "RGB":
+        img = img.convert("RGB")
+    elif image_format == "webp" and img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+
+    directory = os.path.dirname(target_path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=directory, suffix=".part", delete=False
+    ) as file:
+        temporary_path = file.name
+    try:
+        img.save(temporary_path, format=VARIANT_FORMATS[image_format], quality=85)
+        os.replace(temporary_path, target_path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+def generate_variants(source_path: str, sizes=None, formats=None) -> list[str]:
+    sizes = sorted(sizes or IMAGE_VARIANT_SIZES, reverse=True)
+    formats = formats or list(VARIANT_FORMATS)
+
+    Image, _ = pillow()
+    img = open_image(source_path, sizes[0])
+    generated = []
+    for size in sizes:
+        img.thumbnail((size, size), Image.LANCZOS, reducing_gap=2.0)
+        for image_format in formats:
+            target_path = variant_path(source_path, size, image_format)
+            if not os.path.exists(target_path):
+                save_variant(img, target_path, image_format)
+            generated.append(target_path)
+    return generated
+
+
+def get_variant(source_path: str, size: int, image_format: str) -> str:
+    if size not in IMAGE_ONDEMAND_SIZES and size not in IMAGE_VARIANT_SIZES:
+        raise ValueError(f"Unsupported image size {size}")
+    if image_format not in VARIANT_FORMATS:
+        raise ValueError(f"Unsupported image format {image_format}")
+
+    target_path = variant_path(source_path, size, image_format)
+    if not os.path.exists(target_path):
+        generate_variants(source_path, [size], [image_format])
+    return target_path
+
+
+def _generate_in_background(source_path: str):
+    try:
+        generate_variants(source_path)
+    except Exception:
+        logger.exception("Generating variants for %s failed", source_path)
+
+
+def schedule_variants(source_path: str):
+    global _executor
+    if not source_path:
+        return
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=IMAGE_WORKERS, thread_name_prefix="image-variants"
+            )
+        _executor.submit(_generate_in_background, source_path)
+
+
+def shutdown_image_workers():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
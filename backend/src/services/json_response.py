@@ -0,0 +1,14 @@
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+def dump_json(content) -> bytes:
+    return orjson.dumps(content)
+
+
+class JSONBytesResponse(ORJSONResponse):
+    # Listing pages are rendered once (and cached) as bytes, which are sent as is.
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dump_json(content)
@@ -0,0 +1,115 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query, Session
+
+
+def encode_cursor(values: dict) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def is_number(value, types) -> bool:
+    return isinstance(value, types) and not isinstance(value, bool)
+
+
+def estimate_count(db: Session, query: Query) -> int:
+    compiled = query.order_by(None).statement.compile(dialect=db.bind.dialect)
+    plan = (
+        db.connection()
+        .exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params)
+        .scalar()
+    )
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginate(
+    db: Session,
+    query: Query,
+    key_column,
+    page: int = 1,
+    limit: int = 10,
+    cursor: str = None,
+    include_total: bool = True,
+    estimate_total: bool = False,
+    rank=None,
+) -> dict:
+    if rank is None:
+        ordered = query.order_by(key_column)
+    else:
+        ordered = query.add_columns(rank.label("rank")).order_by(
+            rank.desc(), key_column
+        )
+
+    if cursor:
+        values = decode_cursor(cursor)
+        last_key = values.get(key_column.key)
+        # Cursors come from clients; anything else would reach the database.
+        if not is_number(last_key, int) or (
+            rank is not None and not is_number(values.get("rank"), (int, float))
+        ):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if rank is None:
+            page_query = ordered.filter(key_column > last_key)
+        else:
+            page_query = ordered.filter(
+                or_(
+                    rank < values["rank"],
+                    and_(rank == values["rank"], key_column > last_key),
+                )
+            )
+    else:
+        page_query = ordered.offset((page - 1) * limit)
+
+    rows = page_query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    # Column projections keep the trailing rank column; builders read by name.
+    if rank is None or len(query.column_descriptions) > 1:
+        items = rows
+    else:
+        items = [row[0] for row in rows]
+
+    next_cursor = None
+    if has_more:
+        values = {key_column.key: getattr(items[-1], key_column.key)}
+        if rank is not None:
+            values["rank"] = rows[-1].rank
+        next_cursor = encode_cursor(values)
+
+    total_count = None
+    total_pages = None
+    total_is_estimate = False
+    if include_total:
+        total_is_estimate = estimate_total and db.bind.dialect.name == "postgresql"
+        if total_is_estimate:
+            total_count = estimate_count(db, query)
+        else:
+            total_count = query.order_by(None).count()
+        total_pages = (total_count + limit - 1) // limit
+
+    return {
+        "total_count": total_count,
+        "total_pages": total_pages,
+        "total_is_estimate": total_is_estimate,
+        "page": None if cursor else page,
+        "page_size": limit,
+        "next_cursor": next_cursor,
+        "items": items,
+    }
@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+
+from config import (
+    PASSWORD_HASH_QUEUE_SIZE,
+    PASSWORD_HASH_TIMEOUT,
+    PASSWORD_HASH_WORKERS,
+)
+
+
+def _hash(password: str) -> str:
+    return bcrypt.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return bcrypt.verify(password, hashed_password)
+
+
+def busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, please try again.",
+        headers={"Retry-After": "1"},
+    )
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        queue_size: int = PASSWORD_HASH_QUEUE_SIZE,
+        timeout: float = PASSWORD_HASH_TIMEOUT,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self._lock = threading.Lock()
+        self._executor = None
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _reset_executor(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, counter: str):
+        # Called from many threadpool threads at once.
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise busy()
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(function, *args)
+        except (BrokenProcessPool, RuntimeError):
+            self._slots.release()
+            self._reset_executor(executor)
+            raise busy()
+
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._count("timed_out")
+            raise busy()
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            raise busy()
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._run(_verify, password, hashed_password)
+
+    def hash_many(self, passwords: list[str]) -> list[str]:
+        # Bulk work waits for free slots instead of being rejected, but never
+        # holds more than one slot per worker so interactive requests can still
+        # queue behind it.
+        in_flight = threading.BoundedSemaphore(self.workers)
+
+        def release(_):
+            self._slots.release()
+            in_flight.release()
+
+        executor = self._get_executor()
+        futures = []
+        try:
+            for password in passwords:
+                # Waits for this import's own hashes, then for a shared slot;
+                # gives up like a timed out hash instead of hanging the thread.
+                if not in_flight.acquire(timeout=self.timeout):
+                    self._count("timed_out")
+                    raise busy()
+                if not self._slots.acquire(timeout=self.timeout):
+                    in_flight.release()
+                    self._count("rejected")
+                    raise busy()
+                try:
+                    future = executor.submit(_hash, password)
+                except BaseException:
+                    release(None)
+                    raise
+                future.add_done_callback(release)
+                futures.append(future)
+            return [future.result(timeout=self.timeout) for future in futures]
+        except FutureTimeoutError:
+            self._count("timed_out")
+            raise busy()
+        except (BrokenProcessPool, RuntimeError):
+            self._reset_executor(executor)
+            raise busy()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+
+password_hasher = PasswordHasher()
+
+
+def hash_password(password: str) -> str:
+    return password_hasher.hash(password)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    return password_hasher.hash_many(passwords)
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return password_hasher.verify(password, hashed_password)
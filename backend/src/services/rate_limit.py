@@ -0,0 +1,240 @@
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+from config import (
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_EMAIL_BURST,
+    RATE_LIMIT_EMAIL_PER_MINUTE,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_IP_BURST,
+    RATE_LIMIT_IP_PER_MINUTE,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_URL,
+)
+
+logger = logging.getLogger(__name__)
+
+# Each of these costs a bcrypt operation, register also queues an email.
+RATE_LIMITED_PATHS = ("/api/authenticate/login", "/api/authenticate/register")
+
+
+def refill(tokens: float, elapsed: float, capacity: int, rate: float) -> float:
+    return min(capacity, tokens + max(elapsed, 0) * rate)
+
+
+def take_token(tokens: float, rate: float):
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBucketStore:
+    blocking = False
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        """Take one token and return 0, or the seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens, retry_after = take_token(
+                refill(tokens, now - updated, capacity, rate), rate
+            )
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"backend": "memory", "keys": len(self._buckets)}
+
+
+class RedisBucketStore:
+    # Each take is a network round-trip.
+    blocking = True
+
+    def __init__(self, url: str = RATE_LIMIT_URL, client=None):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        # WATCH/MULTI keeps the read-modify-write atomic across workers.
+        def update(pipe):
+            seconds, microseconds = pipe.time()
+            now = seconds + microseconds / 1_000_000
+            tokens, updated = pipe.hmget(key, "tokens", "updated")
+            if tokens is None:
+                tokens, updated = capacity, now
+            tokens, retry_after = take_token(
+                refill(float(tokens), now - float(updated), capacity, rate), rate
+            )
+            pipe.multi()
+            pipe.hset(key, mapping={"tokens": tokens, "updated": now})
+            pipe.expire(key, math.ceil(capacity / rate) + 1)
+            return retry_after
+
+        return self.client.transaction(update, key, value_from_callable=True)
+
+    def info(self) -> dict:
+        return {"backend": "redis"}
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        store,
+        ip_burst: int = RATE_LIMIT_IP_BURST,
+        ip_per_minute: float = RATE_LIMIT_IP_PER_MINUTE,
+        email_burst: int = RATE_LIMIT_EMAIL_BURST,
+        email_per_minute: float = RATE_LIMIT_EMAIL_PER_MINUTE,
+    ):
+        self.store = store
+        self.limits = {
+            "ip": (ip_burst, ip_per_minute / 60),
+            "email": (email_burst, email_per_minute / 60),
+        }
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.throttled = {"ip": 0, "email": 0}
+        self.backend_errors = 0
+
+    def check(self, kind: str, value: str) -> float:
+        capacity, rate = self.limits[kind]
+        digest = hashlib.sha256(value.encode()).hexdigest()[:32]
+        try:
+            retry_after = self.store.take(f"ratelimit:{kind}:{digest}", capacity, rate)
+        except Exception:
+            # Fail open: an unavailable store must not lock everyone out.
+            logger.warning("Rate limit store failed", exc_info=True)
+            with self._lock:
+                self.backend_errors += 1
+            return 0.0
+        if retry_after:
+            with self._lock:
+                self.throttled[kind] += 1
+        return retry_after
+
+    async def check_async(self, kind: str, value: str) -> float:
+        # Keep network stores off the event loop.
+        if self.store.blocking:
+            return await run_in_threadpool(self.check, kind, value)
+        return self.check(kind, value)
+
+    def record_allowed(self):
+        with self._lock:
+            self.allowed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "allowed": self.allowed,
+                "throttled": dict(self.throttled),
+                "backend_errors": self.backend_errors,
+                "limits": {
+                    kind: {"burst": capacity, "per_minute": rate * 60}
+                    for kind, (capacity, rate) in self.limits.items()
+                },
+            }
+        stats.update(self.store.info())
+        return stats
+
+
+def create_rate_limiter():
+    if not RATE_LIMIT_ENABLED:
+        return None
+    if RATE_LIMIT_BACKEND == "redis":
+        return RateLimiter(RedisBucketStore())
+    return RateLimiter(MemoryBucketStore())
+
+
+rate_limiter = create_rate_limiter()
+
+
+def rate_limit_stats() -> dict:
+    if rate_limiter is None:
+        return {"enabled": False}
+    return {"enabled": True, **rate_limiter.stats()}
+
+
+def request_email(body: bytes):
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    email = payload.get("email") if isinstance(payload, dict) else None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, limiter=None):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limiter or rate_limiter
+        if (
+            limiter is None
+            or scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in RATE_LIMITED_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        retry_after = await limiter.check_async(
+            "ip", client[0] if client else "unknown"
+        )
+        if retry_after:
+            await self._reject(scope, receive, send, retry_after)
+            return
+
+        # The body is small JSON that FastAPI buffers anyway; read it here to
+        # find the email and replay it to the app.
+        messages = []
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request" or not message.get("more_body"):
+                break
+        body = b"".join(message.get("body", b"") for message in messages)
+
+        email = request_email(body)
+        if email:
+            retry_after = await limiter.check_async("email", email)
+            if retry_after:
+                await self._reject(scope, receive, send, retry_after)
+                return
+        limiter.record_allowed()
+
+        async def replay():
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        await self.app(scope, replay, send)
+
+    @staticmethod
+    async def _reject(scope, receive, send, retry_after: float):
+        response = JSONResponse(
+            {"detail": "Too many requests, try again later"},
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+        await response(scope, receive, send)
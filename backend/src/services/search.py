@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Query, Session
+
+NGRAM_SIZE = 3
+SIMILARITY_THRESHOLD = 0.3
+MAX_FUZZY_MATCHES = 1000
+INDEX_MAX_AGE_SECONDS = 30
+
+
+def ngrams(value: str, size: int = NGRAM_SIZE) -> set[str]:
+    value = f"  {value.lower()} "
+    return {value[i : i + size] for i in range(len(value) - size + 1)}
+
+
+def substring_ngrams(term: str, size: int = NGRAM_SIZE) -> set[str]:
+    term = term.lower()
+    return {term[i : i + size] for i in range(len(term) - size + 1)}
+
+
+def similarity(left: set[str], right: set[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+class NgramIndex:
+    def __init__(self, size: int = NGRAM_SIZE):
+        self.size = size
+        self.postings = defaultdict(set)
+        self.grams = {}
+        self.values = {}
+        self.built_at = time.monotonic()
+
+    def build(self, rows):
+        for row_id, value in rows:
+            if not value:
+                continue
+            grams = ngrams(value, self.size)
+            self.grams[row_id] = grams
+            self.values[row_id] = value.lower()
+            for gram in grams:
+                self.postings[gram].add(row_id)
+        return self
+
+    def candidates(self, term: str):
+        grams = substring_ngrams(term, self.size)
+        if not grams:
+            return None
+
+        postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    def contains(self, term: str) -> set:
+        term = term.lower()
+        ids = self.candidates(term)
+        if ids is None:
+            ids = self.values.keys()
+        return {row_id for row_id in ids if term in self.values[row_id]}
+
+    def similar(self, term: str, threshold: float = SIMILARITY_THRESHOLD) -> dict:
+        grams = ngrams(term, self.size)
+        overlap = defaultdict(int)
+        for gram in grams:
+            for row_id in self.postings.get(gram, ()):
+                overlap[row_id] += 1
+
+        scores = {}
+        for row_id, shared in overlap.items():
+            score = shared / (len(grams) + len(self.grams[row_id]) - shared)
+            if score >= threshold:
+                scores[row_id] = score
+        return scores
+
+
+_indexes = {}
+_rebuilding = set()
+_indexes_lock = threading.Lock()
+logger = logging.getLogger(__name__)
+
+
+def build_ngram_index(db: Session, column) -> NgramIndex:
+    key = (column.class_.__tablename__, column.key)
+    index = NgramIndex().build(db.query(column.class_.id, column).all())
+    with _indexes_lock:
+        _indexes[key] = index
+    return index
+
+
+def _rebuild(bind, column, key):
+    try:
+        with Session(bind=bind) as db:
+            build_ngram_index(db, column)
+    except Exception:
+        logger.warning("Rebuilding the search index %s failed", key, exc_info=True)
+    finally:
+        with _indexes_lock:
+            _rebuilding.discard(key)
+
+
+def get_ngram_index(db: Session, column):
+    # Returns the current index, possibly stale, or None before the first
+    # build; missing or stale indexes are rebuilt in a background thread so
+    # requests never scan the table.
+    key = (column.class_.__tablename__, column.key)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        fresh = (
+            index is not None
+            and time.monotonic() - index.built_at < INDEX_MAX_AGE_SECONDS
+        )
+        if fresh or key in _rebuilding:
+            return index
+        _rebuilding.add(key)
+    threading.Thread(
+        target=_rebuild,
+        args=(db.get_bind(), column, key),
+        name="search-index",
+        daemon=True,
+    ).start()
+    return index
+
+
+def invalidate_search_indexes(*table_names: str):
+    # Stale indexes keep answering fuzzy searches until the rebuild is done.
+    with _indexes_lock:
+        for key, index in _indexes.items():
+            if not table_names or key[0] in table_names:
+                index.built_at = float("-inf")
+
+
+def apply_text_search(db: Session, query: Query, column, term: str, fuzzy=False):
+    substring = column.ilike(f"%{term}%")
+    if db.bind.dialect.name == "postgresql":
+        if not fuzzy:
+            return query.filter(substring), None
+        rank = func.similarity(column, term)
+        return query.filter(or_(substring, column.op("%")(term))), rank
+
+    # The in-process index may lag behind writes of other connections and
+    # workers, so it only adds typo matches; substring matches come from SQL.
+    index = get_ngram_index(db, column) if fuzzy else None
+    if index is None:
+        return query.filter(substring), None
+
+    primary_key = column.class_.id
+    scores = index.similar(term)
+    term_grams = ngrams(term)
+    for row_id in index.contains(term):
+        if row_id not in scores:
+            scores[row_id] = similarity(term_grams, index.grams[row_id])
+    best = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    best = dict(best[:MAX_FUZZY_MATCHES])
+    if not best:
+        return query.filter(substring), None
+
+    rank = case(best, value=primary_key, else_=0.0)
+    return query.filter(or_(primary_key.in_(best), substring)), rank
+
+
+def combine_ranks(ranks):
+    ranks = [rank for rank in ranks if rank is not None]
+    if not ranks:
+        return None
+    combined = ranks[0]
+    for rank in ranks[1:]:
+        combined = combined + rank
+    return combined
@@ -4,8 +4,17 @@ from jose import JWTError, jwt
 from fastapi import Depends, HTTPException
 from database.session import get_db
 from database.models import User
+from database.async_session import get_async_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from config import SECRET_KEY, ALGORITHM
+from services.auth_cache import (
+    cache_payload,
+    cache_user,
+    get_cached_payload,
+    get_cached_user,
+)
 from fastapi.security import OAuth2PasswordBearer
 
 
@@ -25,36 +34,75 @@ def create_access_token(
 
 
 def verify_token(token: str) -> dict:
+    payload = get_cached_payload(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
 
+    cache_payload(token, payload)
+    return payload
+
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
+def _token_identity(token: str):
+    payload = verify_token(token)
+    if payload is None:
+        raise HTTPException(
+            status_code=401, detail="Invalid authentication credentials."
+        )
+
+    user_id: int = payload.get("sub")
+    role: str = payload.get("role")
+    if user_id is None or role is None:
+        raise HTTPException(
+            status_code=401, detail="Invalid authentication credentials."
+        )
+    return user_id, role
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
 ):
     try:
-        payload = verify_token(token)
-        if payload is None:
-            raise HTTPException(
-                status_code=401, detail="Invalid authentication credentials."
-            )
+        user_id, role = _token_identity(token)
 
-        user_id: int = payload.get("sub")
-        role: str = payload.get("role")
-        if user_id is None or role is None:
-            raise HTTPException(
-                status_code=401, detail="Invalid authentication credentials."
+        user = get_cached_user(user_id)
+        if user is None:
+            user = (
+                db.query(User)
+                .filter(User.email == user_id, User.deleted_at.is_(None))
+                .first()
             )
+            if user is None:
+                raise HTTPException(status_code=401, detail="User not found.")
+            cache_user(user)
+
+        user.role_id = role
+        return user
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Could not validate credentials.")
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        user_id, role = _token_identity(token)
 
-        user = db.query(User).filter(User.email == user_id).first()
+        user = get_cached_user(user_id)
         if user is None:
-            raise HTTPException(status_code=401, detail="User not found.")
+            user = await db.scalar(
+                select(User).where(User.email == user_id, User.deleted_at.is_(None))
+            )
+            if user is None:
+                raise HTTPException(status_code=401, detail="User not found.")
+            cache_user(user)
 
         user.role_id = role
         return user
@@ -0,0 +1,155 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import SQL_INSTRUMENTATION_ENABLED, SQL_REPEATED_STATEMENT_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+_request_stats = ContextVar("sql_request_stats", default=None)
+
+
+class SQLInstrumentationSettings:
+    def __init__(
+        self,
+        enabled: bool = SQL_INSTRUMENTATION_ENABLED,
+        repeated_statement_threshold: int = SQL_REPEATED_STATEMENT_THRESHOLD,
+    ):
+        self._lock = threading.Lock()
+        self.enabled = enabled
+        self.repeated_statement_threshold = repeated_statement_threshold
+        self.requests = 0
+        self.statements = 0
+        self.repeated_statement_requests = 0
+
+    def update(self, enabled: bool = None, repeated_statement_threshold: int = None):
+        with self._lock:
+            if enabled is not None:
+                self.enabled = enabled
+            if repeated_statement_threshold is not None:
+                self.repeated_statement_threshold = repeated_statement_threshold
+
+    def record(self, stats: "RequestQueryStats"):
+        with self._lock:
+            self.requests += 1
+            self.statements += stats.count
+            if stats.repeated(self.repeated_statement_threshold):
+                self.repeated_statement_requests += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "enabled": self.enabled,
+                "repeated_statement_threshold": self.repeated_statement_threshold,
+                "requests": self.requests,
+                "statements": self.statements,
+                "repeated_statement_requests": self.repeated_statement_requests,
+            }
+
+
+# Per process: under gunicorn every worker has its own copy, so a change through
+# the metrics endpoint only reaches the worker that served it.
+sql_instrumentation = SQLInstrumentationSettings()
+
+
+class RequestQueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list:
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    starts = conn.info.get("query_start")
+    if stats is not None and starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    starts = exception_context.connection and exception_context.connection.info.get(
+        "query_start"
+    )
+    if starts:
+        starts.pop()
+
+
+class SQLInstrumentationMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not sql_instrumentation.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = (time.perf_counter() - start) * 1000
+                header = (
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+                    f"app;dur={total:.1f}"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", header.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            self._log(scope, stats, time.perf_counter() - start)
+
+    @staticmethod
+    def _log(scope, stats: RequestQueryStats, duration: float):
+        sql_instrumentation.record(stats)
+        repeated = stats.repeated(sql_instrumentation.repeated_statement_threshold)
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "queries": stats.count,
+            "db_ms": round(stats.duration * 1000, 2),
+            "total_ms": round(duration * 1000, 2),
+        }
+        if repeated:
+            record["repeated_statements"] = [
+                {"statement": statement, "count": count}
+                for statement, count in repeated
+            ]
+            logger.warning("sql_stats %s", json.dumps(record))
+        else:
+            logger.info("sql_stats %s", json.dumps(record))
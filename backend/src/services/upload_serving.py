@@ -0,0 +1,195 @@
+import os
+import re
+import stat
+from email.utils import formatdate
+from mimetypes import guess_type
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from services.file_store import PATH, PRECOMPRESSED
+
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+UPLOAD_KINDS = ("documents", "images")
+UPLOAD_NAME = re.compile(r"^[A-Za-z0-9-]+\.(pdf|docx|png|jpeg)$")
+CONTENT_HASH = re.compile(r"^[0-9a-f]{64}$")
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def upload_path(kind: str, filename: str):
+    if kind not in UPLOAD_KINDS or not UPLOAD_NAME.match(filename):
+        return None
+    return os.path.join(PATH, kind, filename)
+
+
+def accepted_encodings(header: str) -> set[str]:
+    encodings = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        encodings.add(name.strip().lower())
+    return encodings
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def parse_range(header: str, size: int):
+    match = RANGE.match(header.replace(" ", ""))
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = min(int(end), size)
+        return (size - length, size - 1) if length else ()
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return ()
+    return start, end
+
+
+class UploadResponse(Response):
+    def __init__(self, file_path: str, scope: Scope):
+        super().__init__()
+        # The headers, including the length, are set by _prepare once the file
+        # is stat'ed off the event loop.
+        del self.headers["content-length"]
+        self.file_path = file_path
+        self.scope = scope
+        self.offset = 0
+        self.count = None
+        self.send_header_only = scope["method"] == "HEAD"
+
+    def _request_header(self, name: bytes) -> str:
+        for key, value in self.scope["headers"]:
+            if key == name:
+                return value.decode("latin-1")
+        return ""
+
+    def _select_representation(self):
+        encodings = accepted_encodings(self._request_header(b"accept-encoding"))
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding in encodings:
+                try:
+                    return (
+                        self.file_path + suffix,
+                        encoding,
+                        os.stat(self.file_path + suffix),
+                    )
+                except FileNotFoundError:
+                    continue
+        return self.file_path, None, os.stat(self.file_path)
+
+    def _prepare(self):
+        path, encoding, stat_result = self._select_representation()
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise FileNotFoundError(path)
+        self.path = path
+        size = stat_result.st_size
+
+        name = os.path.basename(self.file_path)
+        stem = os.path.splitext(name)[0]
+        if CONTENT_HASH.match(stem):
+            etag = stem
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            etag = f"{int(stat_result.st_mtime)}-{stat_result.st_size}"
+            cache_control = REVALIDATE_CACHE_CONTROL
+        etag = f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+
+        self.headers["etag"] = etag
+        self.headers["cache-control"] = cache_control
+        self.headers["last-modified"] = formatdate(stat_result.st_mtime, usegmt=True)
+        self.headers["vary"] = "Accept-Encoding"
+        self.headers["content-type"] = guess_type(name)[0] or "application/octet-stream"
+        if encoding:
+            self.headers["content-encoding"] = encoding
+        else:
+            self.headers["accept-ranges"] = "bytes"
+
+        if_none_match = self._request_header(b"if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            self.status_code = 304
+            self.send_header_only = True
+            return
+
+        range_header = self._request_header(b"range")
+        if_range = self._request_header(b"if-range")
+        if range_header and not encoding and (not if_range or if_range == etag):
+            byte_range = parse_range(range_header, size)
+            if byte_range == ():
+                self.status_code = 416
+                self.headers["content-range"] = f"bytes */{size}"
+                self.headers["content-length"] = "0"
+                self.send_header_only = True
+                return
+            if byte_range is not None:
+                start, end = byte_range
+                self.status_code = 206
+                self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+                self.offset = start
+                size = end - start + 1
+
+        self.count = size
+        self.headers["content-length"] = str(size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await anyio.to_thread.run_sync(self._prepare)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions") or {}
+        whole_file = self.offset == 0 and self.status_code == 200
+        if whole_file and "http.response.pathsend" in extensions:
+            await send(
+                {"type": "http.response.pathsend", "path": os.path.abspath(self.path)}
+            )
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            if "http.response.zerocopysend" in extensions:
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": file.wrapped,
+                        "offset": self.offset,
+                        "count": self.count,
+                    }
+                )
+                return
+
+            await file.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": remaining > 0,
+                    }
+                )
+            if remaining > 0 or not self.count:
+                await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import tempfile
+
+from fastapi import HTTPException
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+from config import UPLOAD_MAX_DOCUMENT_BYTES, UPLOAD_MAX_FILES, UPLOAD_MAX_IMAGE_BYTES
+from sqlalchemy.orm import Session
+from services.file_store import PATH, find_stored_file, store_file
+from services.file_upload import detect_document_extension, detect_image_extension
+from services.image_pipeline import schedule_variants
+
+UPLOAD_FIELDS = {
+    "cv_files": ("documents", UPLOAD_MAX_DOCUMENT_BYTES, detect_document_extension),
+    "profile_picture": ("images", UPLOAD_MAX_IMAGE_BYTES, detect_image_extension),
+    "photo": ("images", UPLOAD_MAX_IMAGE_BYTES, detect_image_extension),
+}
+
+
+class StreamingUpload:
+    def __init__(self, field: str):
+        if field not in UPLOAD_FIELDS:
+            raise HTTPException(status_code=400, detail=f"Unknown upload field {field}")
+        self.field = field
+        self.directory, self.max_bytes, self.detect_extension = UPLOAD_FIELDS[field]
+        self.save_directory = os.path.join(PATH, self.directory)
+        os.makedirs(self.save_directory, exist_ok=True)
+        self.file = tempfile.NamedTemporaryFile(
+            dir=self.save_directory, suffix=".part", delete=False
+        )
+        self.hasher = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"{self.field} exceeds {self.max_bytes} bytes",
+            )
+        self.hasher.update(chunk)
+        self.file.write(chunk)
+
+    def finish(self, db: Session) -> dict:
+        self.file.close()
+        digest = self.hasher.hexdigest()
+        result = {"field": self.field, "sha256": digest, "size": self.size}
+
+        stored_file = find_stored_file(db, self.directory, digest)
+        if stored_file:
+            self.abort()
+            return {**result, "path": stored_file.path, "deduplicated": True}
+
+        try:
+            extension = self.detect_extension(self.file.name)
+        except ValueError as e:
+            self.abort()
+            raise HTTPException(status_code=400, detail=str(e))
+
+        file_path = store_file(
+            db,
+            self.directory,
+            digest,
+            extension,
+            lambda target_path: os.replace(self.file.name, target_path),
+        )
+        if self.directory == "images":
+            schedule_variants(file_path)
+        return {**result, "path": file_path, "deduplicated": False}
+
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.file.name):
+            os.remove(self.file.name)
+
+
+class UploadReceiver:
+    def __init__(self, content_type: str):
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise HTTPException(status_code=400, detail="Missing multipart boundary")
+
+        self.parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self.on_part_begin,
+                "on_part_data": self.on_part_data,
+                "on_part_end": self.on_part_end,
+                "on_header_field": self.on_header_field,
+                "on_header_value": self.on_header_value,
+                "on_header_end": self.on_header_end,
+                "on_headers_finished": self.on_headers_finished,
+            },
+        )
+        self.headers = {}
+        self.header_field = b""
+        self.header_value = b""
+        self.current = None
+        self.pending = []
+        self.uploads = []
+
+    def on_part_begin(self):
+        self.headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self.header_value += data[start:end]
+
+    def on_header_end(self):
+        self.headers[self.header_field.lower()] = self.header_value
+        self.header_field = b""
+        self.header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self.headers.get(b"content-disposition", b""))
+        if b"filename" not in options:
+            self.current = None
+            return
+        if len(self.uploads) >= UPLOAD_MAX_FILES:
+            raise HTTPException(
+                status_code=413, detail=f"At most {UPLOAD_MAX_FILES} files per upload"
+            )
+        self.current = StreamingUpload(options.get(b"name", b"").decode("latin-1"))
+        self.uploads.append(self.current)
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self.current is not None:
+            self.pending.append((self.current, data[start:end]))
+
+    def on_part_end(self):
+        self.current = None
+
+    def _flush(self):
+        pending, self.pending = self.pending, []
+        for upload, chunk in pending:
+            upload.write(chunk)
+
+    async def receive(self, stream, db: Session) -> list[dict]:
+        saved = []
+        try:
+            async for chunk in stream:
+                self.parser.write(chunk)
+                if self.pending:
+                    await run_in_threadpool(self._flush)
+            self.parser.finalize()
+            for upload in self.uploads:
+                saved.append(await run_in_threadpool(upload.finish, db))
+                await run_in_threadpool(db.commit)
+            return saved
+        except MultipartParseError as e:
+            self._discard(saved)
+            raise HTTPException(status_code=400, detail=f"Invalid multipart body. {e}")
+        except BaseException:
+            self._discard(saved)
+            raise
+
+    def _discard(self, saved: list[dict]):
+        for upload in self.uploads:
+            upload.abort()
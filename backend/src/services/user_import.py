@@ -0,0 +1,247 @@
+import codecs
+import csv
+import json
+import logging
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from config import USER_IMPORT_BATCH_SIZE
+from database.dialect import dialect_insert
+from database.models import Role, User
+from schemas.users import UserCreate
+from services.cache import USERS_LISTING, invalidate_listings
+from services.password_hashing import hash_passwords
+from services.search import invalidate_search_indexes
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def import_format(content_type: str, requested: str = None) -> str:
+    if requested:
+        if requested not in ("csv", "ndjson"):
+            raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+        return requested
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=415, detail="Expected text/csv or application/x-ndjson"
+        )
+    return IMPORT_FORMATS[media_type]
+
+
+def read_rows(file, file_format: str):
+    lines = codecs.getreader("utf-8-sig")(file)
+    if file_format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield (
+                reader.line_num,
+                {key: value for key, value in row.items() if key and value != ""},
+            )
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        if not isinstance(row, dict):
+            yield line_number, ValueError("Expected a JSON object")
+            continue
+        yield line_number, row
+
+
+def parse_row(row) -> UserCreate:
+    if isinstance(row, Exception):
+        raise row
+    user_create = UserCreate(**row)
+    if user_create.photo:
+        raise ValueError("photo is not supported in bulk import")
+    return user_create
+
+
+def _error(line: int, email, detail: str) -> dict:
+    return {"type": "error", "line": line, "email": email, "detail": detail}
+
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def import_chunk(db, chunk: list) -> tuple[int, list[dict]]:
+    errors = []
+    candidates = []
+    seen = set()
+    for line, row in chunk:
+        email = row.get("email") if isinstance(row, dict) else None
+        try:
+            user_create = parse_row(row)
+        except ValidationError as e:
+            errors.append(_error(line, email, _validation_detail(e)))
+            continue
+        except (TypeError, ValueError) as e:
+            errors.append(_error(line, email, str(e)))
+            continue
+
+        email = user_create.email.strip()
+        if email in seen:
+            errors.append(_error(line, email, "Duplicate email in import"))
+            continue
+        seen.add(email)
+        candidates.append((line, email, user_create))
+
+    if not candidates:
+        return 0, errors
+
+    existing = set(
+        db.scalars(
+            select(User.email).where(
+                User.email.in_([email for _, email, _ in candidates])
+            )
+        )
+    )
+    role_ids = set(
+        db.scalars(
+            select(Role.id).where(
+                Role.id.in_({user_create.role_id for _, _, user_create in candidates})
+            )
+        )
+    )
+    new_users = []
+    for line, email, user_create in candidates:
+        if email in existing:
+            errors.append(_error(line, email, "Email already registered"))
+        elif user_create.role_id not in role_ids:
+            errors.append(_error(line, email, "Unknown role_id"))
+        else:
+            new_users.append((line, email, user_create))
+    if not new_users:
+        return 0, errors
+
+    try:
+        hashed_passwords = hash_passwords([user.password for _, _, user in new_users])
+    except HTTPException as e:
+        return 0, errors + [
+            _error(line, email, e.detail) for line, email, _ in new_users
+        ]
+    rows = [
+        {
+            "email": email,
+            "password": hashed_password,
+            "full_name": user_create.full_name,
+            "role_id": user_create.role_id,
+            "is_verified": True,
+        }
+        for (_, email, user_create), hashed_password in zip(new_users, hashed_passwords)
+    ]
+
+    statement = (
+        dialect_insert(db, User.__table__)
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(User.email)
+    )
+    try:
+        inserted = set(db.scalars(statement, rows))
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        logger.warning("User import chunk failed, retrying row by row", exc_info=True)
+        inserted, row_errors = _insert_rows(db, statement, new_users, rows)
+        errors.extend(row_errors)
+    else:
+        row_errors = []
+
+    failed_emails = {error["email"] for error in row_errors}
+    for line, email, _ in new_users:
+        if email not in inserted and email not in failed_emails:
+            errors.append(_error(line, email, "Email already registered"))
+    return len(inserted), errors
+
+
+def _insert_rows(db, statement, new_users: list, rows: list) -> tuple[set, list]:
+    # One rejected row rolls back a multi-row INSERT, so the failed chunk is
+    # inserted row by row to report the error on the row that caused it.
+    inserted = set()
+    errors = []
+    for (line, email, _), row in zip(new_users, rows):
+        try:
+            inserted.update(db.scalars(statement, [row]))
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            errors.append(_error(line, email, f"Database error: {type(e).__name__}"))
+    return inserted, errors
+
+
+def import_users(session_factory, file, file_format: str):
+    db = session_factory()
+    processed = created = failed = 0
+    try:
+        chunk = []
+        rows = read_rows(file, file_format)
+        while True:
+            try:
+                item = next(rows, None)
+            except (csv.Error, UnicodeDecodeError) as e:
+                yield (
+                    json.dumps(_error(processed + len(chunk) + 1, None, str(e))) + "\n"
+                )
+                failed += 1
+                item = None
+
+            if item is not None:
+                chunk.append(item)
+            if chunk and (item is None or len(chunk) >= USER_IMPORT_BATCH_SIZE):
+                chunk_created, errors = import_chunk(db, chunk)
+                processed += len(chunk)
+                created += chunk_created
+                failed += len(errors)
+                for error in sorted(errors, key=lambda error: error["line"]):
+                    yield json.dumps(error) + "\n"
+                yield (
+                    json.dumps(
+                        {
+                            "type": "progress",
+                            "processed": processed,
+                            "created": created,
+                            "failed": failed,
+                        }
+                    )
+                    + "\n"
+                )
+                chunk = []
+            if item is None:
+                break
+    finally:
+        db.close()
+        file.close()
+        if created:
+            invalidate_search_indexes(User.__tablename__)
+            invalidate_listings(USERS_LISTING)
+
+    yield (
+        json.dumps(
+            {
+                "type": "summary",
+                "processed": processed,
+                "created": created,
+                "failed": failed,
+            }
+        )
+        + "\n"
+    )
@@ -1,45 +1,254 @@
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
 from sqlalchemy.orm import Session
-from database.models import User, JobApplicant
+from config import USER_PURGE_BATCH_SIZE, USER_PURGE_INTERVAL
+from database.models import ApplicantDocument, User, JobApplicant
 from fastapi import status
-from passlib.hash import bcrypt
+from services.password_hashing import hash_password
 from services.file_upload import save_image
+from services.file_store import release_files, replace_file_references
+from services.auth_cache import invalidate_user
+from services.pagination import paginate
+from services.search import apply_text_search, invalidate_search_indexes
+from services.image_pipeline import variant_urls
+from services.cache import (
+    APPLICANTS_LISTING,
+    USERS_LISTING,
+    cached_listing,
+    invalidate_listings,
+)
 
+logger = logging.getLogger(__name__)
 
-def get_all_unfinished_users(db: Session, page, limit, full_name):
-    query = db.query(User).filter(
-        User.role_id == 2, User.id.notin_(db.query(JobApplicant.user_id))
-    )
-
-    if full_name:
-        query = query.filter(User.full_name.ilike(f"%{full_name}%"))
 
-    total_count = query.count()
-    total_pages = (total_count + limit - 1) // limit
+USER_LISTING_COLUMNS = (User.id, User.full_name, User.email, User.photo)
 
-    unfinished_users = query.offset((page - 1) * limit).limit(limit).all()
 
+def user_row(row) -> dict:
     return {
-        "total_count": total_count,
-        "total_pages": total_pages,
+        "id": row.id,
+        "full_name": row.full_name,
+        "email": row.email,
+        "photo": row.photo,
+        "photo_variants": variant_urls(row.photo),
+    }
+
+
+def get_all_unfinished_users(
+    db: Session,
+    page,
+    limit,
+    full_name,
+    cursor=None,
+    include_total=True,
+    estimate_total=False,
+    fuzzy=False,
+):
+    filters = {
         "page": page,
-        "page_size": limit,
-        "items": unfinished_users,
+        "limit": limit,
+        "full_name": full_name,
+        "cursor": cursor,
+        "include_total": include_total,
+        "estimate_total": estimate_total,
+        "fuzzy": fuzzy,
     }
+    return cached_listing(
+        USERS_LISTING, filters, lambda: query_unfinished_users(db, **filters)
+    )
 
 
-def delete_user(db: Session, user_id: int):
-    user = db.query(User).filter(User.id == user_id).first()
+def query_unfinished_users(
+    db: Session,
+    page,
+    limit,
+    full_name,
+    cursor=None,
+    include_total=True,
+    estimate_total=False,
+    fuzzy=False,
+):
+    query = db.query(*USER_LISTING_COLUMNS).filter(
+        User.role_id == 2,
+        User.deleted_at.is_(None),
+        User.id.notin_(db.query(JobApplicant.user_id)),
+    )
 
-    if user.job_applicant:
-        db.query(JobApplicant).filter(JobApplicant.user_id == user.id).delete()
-        db.commit()
+    rank = None
+    if full_name:
+        query, rank = apply_text_search(db, query, User.full_name, full_name, fuzzy)
 
-    db.query(User).filter(User.id == user_id).delete()
+    result = paginate(
+        db,
+        query,
+        User.id,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        estimate_total=estimate_total,
+        rank=rank,
+    )
+    result["items"] = [user_row(row) for row in result["items"]]
+    return result
+
+
+def purge_users(db: Session, user_ids: list[int]) -> list[str]:
+    users = db.execute(
+        select(User.email, User.photo).where(User.id.in_(user_ids))
+    ).all()
+    if not users:
+        return []
+    applicant_ids = select(JobApplicant.id).where(JobApplicant.user_id.in_(user_ids))
+    pictures = db.scalars(
+        select(JobApplicant.profile_picture).where(JobApplicant.user_id.in_(user_ids))
+    ).all()
+    documents = db.scalars(
+        select(ApplicantDocument.path).where(
+            ApplicantDocument.applicant_id.in_(applicant_ids)
+        )
+    ).all()
+    release_files(db, [*(user.photo for user in users), *pictures, *documents])
+
+    # SQLite does not enforce the ON DELETE CASCADE, so delete them explicitly.
+    db.execute(
+        delete(ApplicantDocument)
+        .where(ApplicantDocument.applicant_id.in_(applicant_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        delete(JobApplicant)
+        .where(JobApplicant.user_id.in_(user_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        delete(User)
+        .where(User.id.in_(user_ids))
+        .execution_options(synchronize_session=False)
+    )
+    return [user.email for user in users]
+
+
+def invalidate_deleted_users(emails: list[str]):
+    for email in emails:
+        invalidate_user(email)
+    invalidate_search_indexes()
+    invalidate_listings(APPLICANTS_LISTING, USERS_LISTING)
+
+
+def delete_users(db: Session, user_ids: list[int]) -> int:
+    emails = purge_users(db, user_ids)
     db.commit()
+    if emails:
+        invalidate_deleted_users(emails)
+    return len(emails)
+
 
+def soft_delete_users(db: Session, user_ids: list[int]) -> int:
+    emails = db.scalars(
+        update(User)
+        .where(User.id.in_(user_ids), User.deleted_at.is_(None))
+        .values(deleted_at=datetime.utcnow())
+        .returning(User.email)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    if emails:
+        invalidate_deleted_users(emails)
+        notify_user_purger()
+    return len(emails)
+
+
+def delete_user(db: Session, user_id: int):
+    if not delete_users(db, [user_id]):
+        return None
     return status.HTTP_204_NO_CONTENT
 
 
+def purge_deleted_users(db: Session, batch_size: int = USER_PURGE_BATCH_SIZE) -> int:
+    user_ids = db.scalars(
+        select(User.id)
+        .where(User.deleted_at.isnot(None))
+        .order_by(User.deleted_at)
+        .limit(batch_size)
+    ).all()
+    if not user_ids:
+        return 0
+    purge_users(db, user_ids)
+    db.commit()
+    invalidate_search_indexes()
+    return len(user_ids)
+
+
+class UserPurger:
+    def __init__(self, session_factory, interval: float = USER_PURGE_INTERVAL):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="user-purger", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(10)
+            self._thread = None
+
+    def notify(self):
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                purged = purge_deleted_users(db)
+                if purged:
+                    logger.info("Purged %s deleted users", purged)
+            except Exception:
+                logger.exception("Purging deleted users failed")
+                db.rollback()
+                purged = 0
+            finally:
+                db.close()
+
+            if not purged:
+                self._wakeup.wait(self.interval)
+                self._wakeup.clear()
+
+
+user_purger = None
+
+
+def start_user_purger(session_factory):
+    global user_purger
+    if user_purger is None:
+        user_purger = UserPurger(session_factory)
+    user_purger.start()
+
+
+def stop_user_purger():
+    global user_purger
+    if user_purger is not None:
+        user_purger.stop()
+        user_purger = None
+
+
+def notify_user_purger():
+    if user_purger is not None:
+        user_purger.notify()
+
+
 def update_user_data(db, current_user, payload):
     user = db.query(User).filter(User.id == current_user.id).first()
 
@@ -47,11 +256,16 @@ def update_user_data(db, current_user, payload):
         user.full_name = payload.full_name
 
     if payload.password:
-        user.password = bcrypt.hash(payload.password)
+        user.password = hash_password(payload.password)
 
     if payload.photo:
-        user.photo = save_image(payload.photo)
+        old_photo = user.photo
+        user.photo = save_image(db, payload.photo)
+        replace_file_references(db, [old_photo], [user.photo])
 
     db.commit()
+    invalidate_user(user.email)
+    invalidate_search_indexes(User.__tablename__)
+    invalidate_listings(APPLICANTS_LISTING, USERS_LISTING)
 
     return user
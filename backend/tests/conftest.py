@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+# Tests create and drop tables, so never fall back to the app's DATABASE_URL.
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="amplitudo-tests-"), "test.db"
+)
+os.environ.setdefault("EMAIL_OUTBOX_ENABLED", "False")
+os.environ.setdefault("EMAIL_USER", "noreply@example.com")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "False")
+
+sys.path.insert(0, os.path.abspath(SRC_DIR))
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import config
+from conftest import SRC_DIR
+from database.async_session import dispose_async_engine
+from database.db import Base
+from database.models import ApplicantDocument, JobApplicant, Role, User
+from database.session import SessionLocal, get_engine
+from main import create_app
+from services import cache
+from services.security import create_access_token
+
+pytest.importorskip("aiosqlite")
+
+CV_PATH = "static/uploads/documents/" + "a" * 64 + ".pdf"
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # StaticFiles needs the static directory next to the app.
+    monkeypatch.chdir(SRC_DIR)
+    engine = get_engine()
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add_all([Role(id=1, name="admin"), Role(id=2, name="user")])
+        db.add_all(
+            [
+                User(id=1, email="admin@example.com", role_id=1, is_verified=True),
+                User(id=2, email="ana@example.com", full_name="Ana", role_id=2),
+            ]
+        )
+        db.add(
+            JobApplicant(
+                id=1,
+                full_name="Ana Petrovic",
+                birth_date=date(1990, 1, 1),
+                city="Podgorica",
+                country="Montenegro",
+                gender="female",
+                education="MSc",
+                user_id=2,
+            )
+        )
+        db.add(
+            ApplicantDocument(
+                applicant_id=1,
+                path=CV_PATH,
+                position=0,
+                uploaded_at=datetime(2024, 1, 1),
+            )
+        )
+        db.commit()
+    cache.invalidate_listings(cache.APPLICANTS_LISTING, cache.USERS_LISTING)
+
+    settings = {name: getattr(config, name) for name in dir(config) if name.isupper()}
+    settings["DB_ASYNC_MODE"] = True
+    return create_app(SimpleNamespace(**settings))
+
+
+def get(app, path: str, email: str, role: int, **params):
+    token = create_access_token({"sub": email, "role": role})
+
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                return await client.get(
+                    path, params=params, headers={"Authorization": f"Bearer {token}"}
+                )
+        finally:
+            # The aiosqlite connections belong to this event loop.
+            await dispose_async_engine()
+
+    return asyncio.run(request())
+
+
+def test_async_listing_returns_applicants_with_documents(app):
+    response = get(app, "/api/application-form/", "admin@example.com", 1, city="Podgor")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_count"] == 1
+    [applicant] = body["items"]
+    assert applicant["full_name"] == "Ana Petrovic"
+    assert applicant["cv_files"] == [CV_PATH]
+    assert applicant["user"]["email"] == "ana@example.com"
+
+
+def test_async_listing_keeps_cache_calls_off_the_event_loop(app, monkeypatch):
+    threads = []
+    lookup = cache.listing_cache.lookup
+
+    def recording_lookup(*args):
+        threads.append(threading.current_thread())
+        return lookup(*args)
+
+    monkeypatch.setattr(cache.listing_cache, "lookup", recording_lookup)
+    hits = cache.listing_cache.hits
+
+    first = get(app, "/api/application-form/", "admin@example.com", 1)
+    second = get(app, "/api/application-form/", "admin@example.com", 1)
+
+    assert first.content == second.content
+    assert cache.listing_cache.hits == hits + 1
+    assert threads and threading.main_thread() not in threads
+
+
+def test_async_listing_requires_admin(app):
+    response = get(app, "/api/application-form/", "ana@example.com", 2)
+
+    assert response.status_code == 403
+
+
+def test_async_single_application(app):
+    response = get(
+        app, "/api/application-form/single-application", "ana@example.com", 2
+    )
+
+    assert response.status_code == 200
+    assert response.json()["cv_files"] == [CV_PATH]
+
+
+def test_async_current_user(app):
+    response = get(app, "/api/users/user", "ana@example.com", 2)
+
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Ana"
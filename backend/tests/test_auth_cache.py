@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.db import Base
+from database.models import Role, User
+from routers.authentication import verify_email
+from services import auth_cache, users
+from services.auth_cache import TTLCache
+from services.security import create_email_verification_token
+
+EMAIL = "ana@example.com"
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(auth_cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(users, "hash_password", lambda password: "hashed")
+    auth_cache.token_cache.clear()
+    auth_cache.user_cache.clear()
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(Role(id=2, name="user"))
+        db.add(User(id=1, email=EMAIL, full_name="Ana", role_id=2))
+        db.commit()
+        auth_cache.cache_user(db.get(User, 1))
+        yield db
+
+
+def test_token_payload_expires_at_exp(clock):
+    auth_cache.token_cache.clear()
+    payload = {"sub": EMAIL, "role": 2, "exp": clock.now + 30}
+    auth_cache.cache_payload("token", payload)
+
+    clock.now += 29
+    assert auth_cache.get_cached_payload("token") == payload
+    clock.now += 1
+    assert auth_cache.get_cached_payload("token") is None
+
+
+def test_payload_without_exp_is_not_cached():
+    auth_cache.token_cache.clear()
+
+    auth_cache.cache_payload("token", {"sub": EMAIL, "role": 2})
+
+    assert auth_cache.get_cached_payload("token") is None
+
+
+def test_ttl_caps_the_expiry(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    cache.set("key", "value", expires_at=clock.now + 3600)
+
+    clock.now += 59
+    assert cache.get("key") == "value"
+    clock.now += 1
+    assert cache.get("key") is None
+
+
+def test_evicts_the_least_recently_used_entry():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_update_user_data_invalidates_the_user(db):
+    payload = SimpleNamespace(full_name="Ana Petrovic", password="secret", photo=None)
+    assert auth_cache.get_cached_user(EMAIL).full_name == "Ana"
+
+    users.update_user_data(db, SimpleNamespace(id=1), payload)
+
+    assert auth_cache.get_cached_user(EMAIL) is None
+
+
+@pytest.mark.parametrize("delete", [users.delete_users, users.soft_delete_users])
+def test_deleting_invalidates_the_user(db, delete):
+    assert auth_cache.get_cached_user(EMAIL) is not None
+
+    assert delete(db, [1]) == 1
+
+    assert auth_cache.get_cached_user(EMAIL) is None
+
+
+def test_verifying_the_email_invalidates_the_user(db):
+    assert not auth_cache.get_cached_user(EMAIL).is_verified
+
+    verify_email(create_email_verification_token(EMAIL), db)
+
+    assert auth_cache.get_cached_user(EMAIL) is None
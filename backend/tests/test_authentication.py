@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.db import Base
+from database.models import Role, User
+from schemas.users import UserCreate
+from services import authentication
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(authentication, "hash_password", lambda password: "hashed")
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(Role(id=2, name="user"))
+        db.add(User(email="ana@example.com", role_id=2))
+        db.add(User(email="gone@example.com", role_id=2, deleted_at=datetime.utcnow()))
+        db.commit()
+        yield db
+
+
+@pytest.mark.parametrize(
+    "create", [authentication.create_user, authentication.create_user_by_admin]
+)
+@pytest.mark.parametrize(
+    "email, status_code", [("ana@example.com", 400), ("gone@example.com", 409)]
+)
+def test_rejects_taken_emails(db, create, email, status_code):
+    with pytest.raises(HTTPException) as error:
+        create(db, UserCreate(email=email, password="secret"))
+
+    assert error.value.status_code == status_code
+
+
+def test_registers_a_new_email(db):
+    user = authentication.create_user(
+        db, UserCreate(email="new@example.com", password="secret")
+    )
+
+    assert user.id is not None
+    assert not user.is_verified
@@ -0,0 +1,62 @@
+import pytest
+
+from services.cache import ListingCache, MemoryCache, RedisCache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class BrokenBackend:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("cache down")
+
+        return fail
+
+
+def test_redis_cache_keeps_subsecond_ttl():
+    cache = RedisCache(client=fakeredis.FakeRedis())
+
+    cache.set("listing:users:0:page", b"[]", ttl=0.5)
+
+    assert cache.get("listing:users:0:page") == b"[]"
+    assert 0 < cache.client.pttl("listing:users:0:page") <= 500
+
+
+def test_redis_cache_info_counts_only_listing_pages():
+    client = fakeredis.FakeRedis()
+    client.set("ratelimit:ip:abc", b"x" * 100)
+    cache = ListingCache(RedisCache(client=client))
+
+    body = cache.get_or_compute("users", {"page": 1}, lambda: {"items": []})
+    cache.invalidate("applicants")
+    stats = cache.stats()
+
+    assert stats["entries"] == 1
+    assert stats["memory_bytes"] == len(body)
+
+
+def test_listing_cache_fails_open():
+    cache = ListingCache(BrokenBackend())
+
+    body = cache.get_or_compute("users", {"page": 1}, lambda: {"items": [1]})
+    cache.invalidate("users", "applicants")
+
+    assert body == b'{"items":[1]}'
+    assert cache.backend_errors == 3
+
+
+def test_memory_cache_hits_until_invalidated():
+    cache = ListingCache(MemoryCache())
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"items": len(calls)}
+
+    cache.get_or_compute("users", {"page": 1}, compute)
+    cache.get_or_compute("users", {"page": 1}, compute)
+    cache.invalidate("users")
+    cache.get_or_compute("users", {"page": 1}, compute)
+
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 1
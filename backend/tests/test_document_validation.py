@@ -0,0 +1,61 @@
+import io
+import zipfile
+
+import pytest
+
+from services import document_validation
+from services.document_validation import classify_document
+from services.file_upload import _classify_document
+
+
+def pdf() -> bytes:
+    body = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog >>\nendobj\n"
+    xref = len(body)
+    return (
+        body
+        + b"xref\n0 2\n0000000000 65535 f \n0000000009 00000 n \n"
+        + b"trailer\n<< /Size 2 /Root 1 0 R >>\n"
+        + b"startxref\n%d\n%%%%EOF\n" % xref
+    )
+
+
+def docx(content_type: bytes = document_validation.DOCX_MAIN_CONTENT_TYPE) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(
+            "[Content_Types].xml", b'<Override ContentType="%s"/>' % content_type
+        )
+        archive.writestr("word/document.xml", b"<w:document/>")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("data, extension", [(pdf(), "pdf"), (docx(), "docx")])
+def test_classifies_valid_documents(data, extension):
+    assert classify_document(io.BytesIO(data)) == extension
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param(pdf()[:60], id="truncated pdf"),
+        pytest.param(b"PK\x03\x04" + b"\x00" * 200, id="docx that is not a zip"),
+        pytest.param(docx(b"application/zip"), id="zip that is not a docx"),
+        pytest.param(b"GIF89a" + b"\x00" * 200, id="wrong magic"),
+        pytest.param(b"", id="empty"),
+    ],
+)
+def test_rejects_invalid_documents(data):
+    with pytest.raises(ValueError):
+        classify_document(io.BytesIO(data))
+
+
+def test_validates_several_documents_in_processes():
+    try:
+        assert document_validation.map_documents(
+            _classify_document, [pdf(), docx(), pdf()]
+        ) == ["pdf", "docx", "pdf"]
+
+        with pytest.raises(ValueError, match="Failed to save document"):
+            document_validation.map_documents(_classify_document, [pdf(), b"%PDF-"])
+    finally:
+        document_validation.shutdown_document_workers()
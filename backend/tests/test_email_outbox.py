@@ -0,0 +1,194 @@
+import socketserver
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.models import EmailOutbox
+from services.email_outbox import EmailOutboxWorker, SMTPConnectionPool, enqueue_email
+
+# RCPT replies by recipient; everyone else is accepted.
+RECIPIENT_REPLIES = {
+    b"refused@example.com": b"550 No such user\r\n",
+    b"busy@example.com": b"451 Try again later\r\n",
+}
+
+
+class SMTPStubHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        with self.server.lock:
+            self.server.connections += 1
+        self.wfile.write(b"220 stub ESMTP\r\n")
+        recipients = []
+        in_data = False
+        for line in self.rfile:
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    with self.server.lock:
+                        self.server.delivered.extend(recipients)
+                    recipients = []
+                    self.wfile.write(b"250 OK\r\n")
+                continue
+            command = line[:4].upper()
+            if command == b"RCPT":
+                recipient = line.split(b"<", 1)[1].split(b">", 1)[0]
+                reply = RECIPIENT_REPLIES.get(recipient, b"250 OK\r\n")
+                if reply.startswith(b"250"):
+                    recipients.append(recipient.decode())
+                self.wfile.write(reply)
+            elif command == b"DATA":
+                in_data = True
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPStubHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.delivered = []
+
+
+@pytest.fixture
+def smtp():
+    server = SMTPStub()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    EmailOutbox.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def worker(smtp, session_factory):
+    pool = SMTPConnectionPool(
+        host="127.0.0.1",
+        port=smtp.server_address[1],
+        username="",
+        password="",
+        starttls=False,
+        timeout=5,
+    )
+    worker = EmailOutboxWorker(session_factory, pool, max_attempts=2)
+    yield worker
+    pool.close()
+
+
+def enqueue(session_factory, *recipients):
+    with session_factory() as db:
+        for recipient in recipients:
+            enqueue_email(db, recipient, "Verify", "Hello")
+        db.commit()
+
+
+def messages(session_factory) -> dict:
+    with session_factory() as db:
+        return {row.to_email: row for row in db.query(EmailOutbox).all()}
+
+
+def test_sends_a_batch_over_one_connection(worker, smtp, session_factory):
+    enqueue(session_factory, "a@example.com", "b@example.com", "c@example.com")
+
+    assert worker.drain_once() == 3
+
+    assert smtp.delivered == ["a@example.com", "b@example.com", "c@example.com"]
+    assert smtp.connections == 1
+    assert all(row.status == "sent" for row in messages(session_factory).values())
+
+    enqueue(session_factory, "d@example.com")
+    worker.drain_once()
+    assert smtp.connections == 1
+    assert worker.pool.connections_opened == 1
+
+
+def test_retries_temporary_and_fails_permanent_errors(worker, smtp, session_factory):
+    enqueue(session_factory, "busy@example.com", "refused@example.com")
+
+    worker.drain_once()
+    rows = messages(session_factory)
+
+    busy = rows["busy@example.com"]
+    assert busy.status == "pending"
+    assert busy.attempts == 1
+    assert busy.next_attempt_at > datetime.utcnow()
+    assert busy.claimed_by is None
+    assert rows["refused@example.com"].status == "failed"
+    assert worker.stats["retried"] == 1
+    assert worker.stats["failed"] == 1
+
+
+def test_fails_after_max_attempts(worker, smtp, session_factory):
+    enqueue(session_factory, "busy@example.com")
+    worker.drain_once()
+    with session_factory() as db:
+        db.query(EmailOutbox).update({"next_attempt_at": datetime.utcnow()})
+        db.commit()
+
+    worker.drain_once()
+
+    row = messages(session_factory)["busy@example.com"]
+    assert row.status == "failed"
+    assert row.attempts == 2
+
+
+def test_claims_only_expired_leases(worker, smtp, session_factory):
+    enqueue(session_factory, "stale@example.com", "claimed@example.com")
+    now = datetime.utcnow()
+    with session_factory() as db:
+        for email, claimed_at in (
+            ("stale@example.com", now - timedelta(seconds=worker.lease_seconds + 1)),
+            ("claimed@example.com", now),
+        ):
+            db.query(EmailOutbox).filter(EmailOutbox.to_email == email).update(
+                {"status": "sending", "claimed_by": "other", "claimed_at": claimed_at}
+            )
+        db.commit()
+
+    assert worker.drain_once() == 1
+
+    assert smtp.delivered == ["stale@example.com"]
+    assert messages(session_factory)["claimed@example.com"].status == "sending"
+
+
+def test_hands_back_the_batch_when_the_lease_runs_out(smtp, session_factory):
+    pool = SMTPConnectionPool(
+        host="127.0.0.1",
+        port=smtp.server_address[1],
+        username="",
+        password="",
+        starttls=False,
+        timeout=5,
+    )
+    # The lease cannot even cover one send, so nothing is sent twice.
+    worker = EmailOutboxWorker(session_factory, pool, lease_seconds=5)
+    enqueue(session_factory, "a@example.com")
+
+    assert worker.drain_once() == 0
+
+    row = messages(session_factory)["a@example.com"]
+    assert row.status == "pending"
+    assert row.claimed_by is None
+    assert smtp.delivered == []
+    pool.close()
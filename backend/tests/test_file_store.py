@@ -0,0 +1,75 @@
+import os
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.models import StoredFile
+from services import file_store
+
+OLD = time.time() - 2 * 3600
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_store, "PATH", str(tmp_path))
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    StoredFile.__table__.create(engine)
+    with sessionmaker(bind=engine)() as db:
+        yield db
+
+
+def write(path: str, mtime: float = OLD) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(b"content")
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_collects_untracked_files_after_the_grace_period(db):
+    tracked = write(file_store.content_path("images", "a" * 64, "png"))
+    untracked = write(file_store.content_path("images", "b" * 64, "png"))
+    compressed = write(file_store.content_path("documents", "c" * 64, "pdf"))
+    write(compressed + ".gz")
+    fresh = write(file_store.content_path("documents", "d" * 64, "pdf"), time.time())
+    legacy = write(os.path.join(file_store.PATH, "images", "photo-1234.png"))
+    partial = write(os.path.join(file_store.PATH, "documents", "tmpab12.part"))
+    now = datetime.utcnow()
+    db.add(
+        StoredFile(
+            sha256="a" * 64,
+            kind="images",
+            path=tracked,
+            size=7,
+            ref_count=1,
+            created_at=now,
+            updated_at=now,
+        )
+    )
+    db.commit()
+
+    assert file_store.collect_untracked_files(db, grace_seconds=3600) == 2
+
+    assert os.path.exists(tracked)
+    assert os.path.exists(fresh)
+    assert os.path.exists(legacy)
+    for path in (untracked, compressed, compressed + ".gz", partial):
+        assert not os.path.exists(path)
+
+
+def test_storing_existing_content_renews_it(db):
+    path = write(file_store.content_path("images", "e" * 64, "png"))
+
+    file_store.store_file(db, "images", "e" * 64, "png", lambda _: None)
+    db.rollback()
+
+    assert file_store.collect_untracked_files(db, grace_seconds=3600) == 0
+    assert os.path.exists(path)
@@ -0,0 +1,154 @@
+import json
+import time
+
+import pytest
+import rsa
+from jose import jwk, jwt
+
+from services import google_keys
+from services.google_keys import GoogleKeyCache, cache_lifetime
+
+CLIENT_ID = "client"
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def signing_key(kid: str):
+    _, private_key = rsa.newkeys(1024)
+    pem = private_key.save_pkcs1()
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    return pem, {**public, "kid": kid, "use": "sig"}
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return {kid: signing_key(kid) for kid in ("old", "new")}
+
+
+def token(keys, kid: str, audience: str = CLIENT_ID) -> str:
+    now = int(time.time())
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": audience,
+        "sub": "1",
+        "email": "ana@example.com",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return jwt.encode(claims, keys[kid][0], algorithm="RS256", headers={"kid": kid})
+
+
+def jwks(keys, *kids) -> dict:
+    return {"keys": [keys[kid][1] for kid in kids]}
+
+
+class FakeGoogle:
+    def __init__(self, jwks: dict, lifetime: float):
+        self.jwks = jwks
+        self.lifetime = lifetime
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.jwks, self.lifetime
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(google_keys.time, "monotonic", clock)
+    return clock
+
+
+def test_cache_lifetime_honors_max_age_and_age():
+    headers = {"Cache-Control": "public, max-age=21600, must-revalidate", "Age": "600"}
+
+    assert cache_lifetime(headers) == 21000
+    assert cache_lifetime({"Cache-Control": "no-cache"}, default=60) == 60
+
+
+def test_verifies_with_a_local_jwks_file(keys, tmp_path):
+    path = tmp_path / "jwks.json"
+    path.write_text(json.dumps(jwks(keys, "old")))
+    cache = GoogleKeyCache(jwks_file=str(path))
+
+    claims = cache.verify(token(keys, "old"), audience=CLIENT_ID)
+
+    assert claims["email"] == "ana@example.com"
+    with pytest.raises(ValueError):
+        cache.verify(token(keys, "old", audience="someone-else"), audience=CLIENT_ID)
+    assert cache.fetches == 1
+    cache.start()
+    assert cache.stats()["background_refresh"] is False
+
+
+def test_keeps_keys_for_their_max_age(keys, clock):
+    cache = GoogleKeyCache(url="unused")
+    cache._fetch = google = FakeGoogle(jwks(keys, "old"), lifetime=600)
+
+    cache.verify(token(keys, "old"), audience=CLIENT_ID)
+    clock.now += 599
+    cache.verify(token(keys, "old"), audience=CLIENT_ID)
+    assert google.calls == 1
+
+    clock.now += 1
+    cache.verify(token(keys, "old"), audience=CLIENT_ID)
+    assert google.calls == 2
+
+
+def test_refetches_once_for_an_unknown_key_id(keys, clock):
+    cache = GoogleKeyCache(url="unused")
+    cache._fetch = google = FakeGoogle(jwks(keys, "old"), lifetime=3600)
+    cache.verify(token(keys, "old"), audience=CLIENT_ID)
+
+    # Google rotated in a new key before the cached keys expired.
+    clock.now += google_keys.RETRY_SECONDS
+    google.jwks = jwks(keys, "old", "new")
+    assert cache.verify(token(keys, "new"), audience=CLIENT_ID)["sub"] == "1"
+    assert google.calls == 2
+
+    # Unknown key ids do not refetch again right away.
+    with pytest.raises(ValueError, match="Unknown Google signing key"):
+        cache.verify(jwt.encode({}, keys["old"][0], "RS256", headers={"kid": "x"}))
+    assert google.calls == 2
+    assert cache.unknown_keys == 2
+
+
+def test_keeps_previous_keys_when_google_is_down(keys, clock):
+    cache = GoogleKeyCache(url="unused")
+    cache._fetch = FakeGoogle(jwks(keys, "old"), lifetime=60)
+    cache.verify(token(keys, "old"), audience=CLIENT_ID)
+
+    def unreachable():
+        raise OSError("unreachable")
+
+    cache._fetch = unreachable
+    clock.now += 60
+
+    assert cache.verify(token(keys, "old"), audience=CLIENT_ID)["sub"] == "1"
+    assert cache.fetch_errors == 1
+
+
+def test_background_refresher_refetches_before_expiry(keys, monkeypatch):
+    monkeypatch.setattr(google_keys, "RETRY_SECONDS", 0.01)
+    cache = GoogleKeyCache(url="unused", refresh_margin=0.04)
+    cache._fetch = google = FakeGoogle(jwks(keys, "old"), lifetime=0.05)
+
+    cache.start()
+    try:
+        deadline = time.monotonic() + 5
+        while google.calls < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert cache.stats()["background_refresh"] is True
+    finally:
+        cache.stop()
+
+    assert google.calls >= 3
+    assert cache.stats()["keys"] == ["old"]
+    assert cache.stats()["background_refresh"] is False
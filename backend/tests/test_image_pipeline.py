@@ -0,0 +1,29 @@
+import pytest
+from PIL import Image
+
+from services import image_pipeline
+from services.image_pipeline import IMAGE_VARIANT_SIZES, get_variant
+
+
+def test_unreadable_source_is_a_value_error(tmp_path):
+    source = tmp_path / ("a" * 64 + ".png")
+    source.write_bytes(b"not an image")
+
+    with pytest.raises(ValueError):
+        get_variant(str(source), IMAGE_VARIANT_SIZES[0], "webp")
+
+
+def test_oversized_source_is_a_value_error(tmp_path, monkeypatch):
+    source = tmp_path / ("b" * 64 + ".png")
+    Image.new("RGB", (64, 64)).save(source)
+    pillow = image_pipeline.pillow
+
+    def small_limit():
+        image, image_ops = pillow()
+        monkeypatch.setattr(image, "MAX_IMAGE_PIXELS", 100)
+        return image, image_ops
+
+    monkeypatch.setattr(image_pipeline, "pillow", small_limit)
+
+    with pytest.raises(ValueError):
+        get_variant(str(source), IMAGE_VARIANT_SIZES[0], "webp")
@@ -0,0 +1,39 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from services.pagination import encode_cursor, paginate
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([Item(id=index) for index in range(1, 6)])
+        session.commit()
+        yield session
+
+
+def test_cursor_continues_after_last_key(db):
+    first = paginate(db, db.query(Item), Item.id, limit=2)
+    second = paginate(db, db.query(Item), Item.id, limit=2, cursor=first["next_cursor"])
+
+    assert [item.id for item in second["items"]] == [3, 4]
+
+
+@pytest.mark.parametrize("last_key", ["x", {}, [], True, None, 1.5])
+def test_malformed_cursor_is_rejected(db, last_key):
+    with pytest.raises(HTTPException) as error:
+        paginate(db, db.query(Item), Item.id, cursor=encode_cursor({"id": last_key}))
+
+    assert error.value.status_code == 400
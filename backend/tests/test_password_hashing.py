@@ -0,0 +1,27 @@
+import pytest
+from fastapi import HTTPException
+
+from services.password_hashing import PasswordHasher
+
+
+def test_saturated_hasher_rejects_with_retry_after():
+    hasher = PasswordHasher(workers=1, queue_size=0)
+    hasher._slots.acquire()
+
+    with pytest.raises(HTTPException) as error:
+        hasher.hash("secret")
+
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_hash_many_gives_up_when_no_slot_frees():
+    hasher = PasswordHasher(workers=1, queue_size=0, timeout=0.05)
+    hasher._slots.acquire()
+
+    with pytest.raises(HTTPException) as error:
+        hasher.hash_many(["secret"])
+
+    assert error.value.status_code == 503
+    assert hasher.stats()["rejected"] == 1
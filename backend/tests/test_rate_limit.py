@@ -0,0 +1,52 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from starlette.responses import PlainTextResponse
+
+from services.rate_limit import RateLimiter, RateLimitMiddleware, RedisBucketStore
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def test_redis_bucket_store_throttles_after_burst():
+    store = RedisBucketStore(client=fakeredis.FakeRedis())
+
+    results = [store.take("ratelimit:ip:test", 2, 1 / 60) for _ in range(3)]
+
+    assert results[:2] == [0.0, 0.0]
+    assert 0 < results[2] <= 60
+
+
+def test_middleware_takes_redis_tokens_off_the_event_loop():
+    store = RedisBucketStore(client=fakeredis.FakeRedis())
+    threads = []
+    take = store.take
+
+    def recording_take(*args):
+        threads.append(threading.current_thread())
+        return take(*args)
+
+    store.take = recording_take
+    limiter = RateLimiter(store, ip_burst=1, email_burst=5)
+    app = RateLimitMiddleware(PlainTextResponse("ok"), limiter=limiter)
+
+    async def login():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            return [
+                await client.post(
+                    "/api/authenticate/login", json={"email": "ana@example.com"}
+                )
+                for _ in range(2)
+            ]
+
+    first, second = asyncio.run(login())
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert "Retry-After" in second.headers
+    assert threads and threading.main_thread() not in threads
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from conftest import SRC_DIR
+from database.db import Base
+from database.models import Role, User
+from database.session import SessionLocal, get_engine
+from main import create_app
+from services.security import create_access_token
+from services.sql_instrumentation import (
+    SQLInstrumentationMiddleware,
+    sql_instrumentation,
+)
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    # The settings are process-wide; restore them after each test.
+    monkeypatch.setattr(sql_instrumentation, "enabled", True)
+    monkeypatch.setattr(sql_instrumentation, "repeated_statement_threshold", 3)
+
+
+@pytest.fixture
+def app():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    app = FastAPI()
+    app.add_middleware(SQLInstrumentationMiddleware)
+
+    @app.get("/queries/{count}")
+    def run_queries(count: int):
+        with engine.connect() as connection:
+            for _ in range(count):
+                connection.execute(text("SELECT 1"))
+        return {"count": count}
+
+    return app
+
+
+def request(app, method: str, path: str, **kwargs) -> httpx.Response:
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            return await client.request(method, path, **kwargs)
+
+    return asyncio.run(send())
+
+
+def test_server_timing_counts_the_queries(app):
+    response = request(app, "GET", "/queries/2")
+
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert 'desc="2 queries"' in timing
+    assert ", app;dur=" in timing
+
+
+def test_warns_about_repeated_statements(app, caplog):
+    caplog.set_level(logging.INFO, logger="services.sql_instrumentation")
+    requests = sql_instrumentation.repeated_statement_requests
+
+    request(app, "GET", "/queries/2")
+    request(app, "GET", "/queries/3")
+
+    first, second = caplog.records
+    assert first.levelno == logging.INFO
+    assert second.levelno == logging.WARNING
+    assert '"statement": "SELECT 1", "count": 3' in second.getMessage()
+    assert sql_instrumentation.repeated_statement_requests == requests + 1
+
+
+def test_disabled_adds_no_header(app):
+    sql_instrumentation.update(enabled=False)
+
+    response = request(app, "GET", "/queries/1")
+
+    assert "server-timing" not in response.headers
+
+
+def test_admins_toggle_it_at_runtime(monkeypatch):
+    monkeypatch.chdir(SRC_DIR)
+    engine = get_engine()
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add(Role(id=1, name="admin"))
+        db.add(User(id=1, email="admin@example.com", role_id=1, is_verified=True))
+        db.commit()
+    token = create_access_token({"sub": "admin@example.com", "role": 1})
+    headers = {"Authorization": f"Bearer {token}"}
+    app = create_app()
+
+    response = request(
+        app,
+        "PUT",
+        "/api/metrics/sql-instrumentation",
+        json={"enabled": False, "repeated_statement_threshold": 5},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["enabled"] is False
+    assert response.json()["repeated_statement_threshold"] == 5
+    # The request that switched it off was still measured.
+    assert "server-timing" in response.headers
+    response = request(app, "GET", "/api/metrics/sql-instrumentation", headers=headers)
+    assert response.json()["enabled"] is False
+    assert "server-timing" not in response.headers
+
+    response = request(
+        app,
+        "PUT",
+        "/api/metrics/sql-instrumentation",
+        json={"repeated_statement_threshold": 1},
+        headers=headers,
+    )
+    assert response.status_code == 422
@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.db import Base
+from database.models import Role, User
+from services import user_import
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(
+        user_import,
+        "hash_passwords",
+        lambda passwords: [f"hashed-{password}" for password in passwords],
+    )
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TRIGGER reject_user BEFORE INSERT ON users "
+                "WHEN NEW.email = 'rejected@example.com' "
+                "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+            )
+        )
+    with sessionmaker(bind=engine)() as db:
+        db.add(Role(id=2, name="user"))
+        db.add(User(email="taken@example.com", role_id=2))
+        db.commit()
+        yield db
+
+
+def row(email: str, **fields) -> dict:
+    return {"email": email, "password": "secret", **fields}
+
+
+def test_reports_errors_per_row(db):
+    chunk = [
+        (2, row("ana@example.com")),
+        (3, row("taken@example.com")),
+        (4, row("ghost@example.com", role_id=99)),
+        (5, row("ana@example.com")),
+        (6, {"email": "nopassword@example.com"}),
+    ]
+
+    created, errors = user_import.import_chunk(db, chunk)
+
+    assert created == 1
+    assert {error["line"]: error["detail"] for error in errors} == {
+        3: "Email already registered",
+        4: "Unknown role_id",
+        5: "Duplicate email in import",
+        6: "password: field required",
+    }
+
+
+def test_retries_a_rejected_chunk_row_by_row(db):
+    chunk = [
+        (2, row("ana@example.com")),
+        (3, row("rejected@example.com")),
+        (4, row("bob@example.com")),
+    ]
+
+    created, errors = user_import.import_chunk(db, chunk)
+
+    assert created == 2
+    assert [(error["line"], error["detail"]) for error in errors] == [
+        (3, "Database error: IntegrityError")
+    ]
+    assert set(db.scalars(select(User.email))) == {
+        "taken@example.com",
+        "ana@example.com",
+        "bob@example.com",
+    }